@@ -52,7 +52,11 @@ from pypet.shareddata import (
     make_shared_result,
 )
 from pypet.slots import HasSlots
-from pypet.storageservice import HDF5StorageService, LazyStorageService
+from pypet.storageservice import (
+    HDF5StorageService,
+    LazyStorageService,
+    ShardedStorageServiceView,
+)
 from pypet.trajectory import Trajectory, load_trajectory
 from pypet.utils.decorators import manual_run
 from pypet.utils.explore import cartesian_product, find_unique_points
@@ -67,6 +71,7 @@ __all__ = [
     MultiprocContext.__name__,
     HDF5StorageService.__name__,
     LazyStorageService.__name__,
+    ShardedStorageServiceView.__name__,
     ParameterGroup.__name__,
     DerivedParameterGroup.__name__,
     ConfigGroup.__name__,
@@ -183,10 +183,20 @@ class Annotations(HasSlots):
 
 
 class WithAnnotations(HasLogger):
-    __slots__ = ("_annotations",)
+    __slots__ = ("_annotations_",)
 
     def __init__(self):
-        self._annotations = Annotations()  # The annotation object to handle annotations
+        self._annotations_ = None  # The annotation object is only created if needed
+
+    @property
+    def _annotations(self):
+        if self._annotations_ is None:
+            self._annotations_ = Annotations()
+        return self._annotations_
+
+    @_annotations.setter
+    def _annotations(self, annotations):
+        self._annotations_ = annotations
 
     @property
     def v_annotations(self):
@@ -17,16 +17,20 @@ try:
     import __main__ as main
 except ImportError:
     main = None  # We can end up here in an interactive IPython console
+import bisect
 import datetime
 import hashlib
 import inspect
 import logging
 import multiprocessing as multip
 import os
+import queue
 import shutil
 import sys
 import time
 import traceback
+from multiprocessing import resource_tracker
+from multiprocessing.reduction import ForkingPickler
 
 try:
     from sumatra.programs import PythonExecutable
@@ -64,11 +68,17 @@ try:
 except ImportError:
     zmq = None
 
+import pandas as pd
+
 import pypet.pypetconstants as pypetconstants
 from pypet._version import __version__ as VERSION
 from pypet.parameter import Parameter
 from pypet.pypetlogging import HasLogger, LoggingManager, simple_logging_config
-from pypet.storageservice import HDF5StorageService, LazyStorageService
+from pypet.storageservice import (
+    HDF5StorageService,
+    LazyStorageService,
+    ShardedStorageServiceView,
+)
 from pypet.trajectory import Trajectory
 from pypet.utils.configparsing import parse_config
 from pypet.utils.decorators import kwargs_api_change, prefix_naming
@@ -80,19 +90,28 @@ from pypet.utils.mpwrappers import (
     LockerClient,
     LockerServer,
     LockWrapper,
+    MultiprocWrapper,
     PipeStorageServiceSender,
     PipeStorageServiceWriter,
     QueueStorageServiceSender,
     QueueStorageServiceWriter,
     QueuingClient,
     QueuingServer,
+    ReadWriteLock,
     ReferenceStore,
     ReferenceWrapper,
+    ShardedStorageServiceWrapper,
+    StorageMetrics,
     TimeOutLockerServer,
 )
+from pypet.utils.resultsequence import ResultSequence
+from pypet.utils.resumejournal import ResumeJournal
 from pypet.utils.siginthandling import sigint_handling
 from pypet.utils.storagefactory import storage_factory
 
+RESUME_JOURNAL = "environment.journal"
+"""Name of the journal file in the resume folder of a trajectory"""
+
 
 def _pool_single_run(kwargs):
     """Starts a pool single run and passes the storage service"""
@@ -105,6 +124,11 @@ def _pool_single_run(kwargs):
     return _sigint_handling_single_run(kwargs)
 
 
+def _streaming_pool_single_run(pickled_kwargs):
+    """Starts a pool single run from keyword arguments pickled by the main process"""
+    return _pool_single_run(ForkingPickler.loads(pickled_kwargs))
+
+
 def _frozen_pool_single_run(kwargs):
     """Single run wrapper for the frozen pool, makes a single run and passes kwargs"""
     idx = kwargs.pop("idx")
@@ -301,8 +325,9 @@ def _single_run(kwargs):
     :return:
 
         Results computed by the user's job function which are not stored into the trajectory.
-        Returns a nested tuple of run index and result and run information:
-        ``((traj.v_idx, result), run_information_dict)``
+        Returns a nested tuple of run index and result, run information, and
+        storage metrics of the run (``None`` if the storage service is not wrapped):
+        ``((traj.v_idx, result), run_information_dict, storage_metrics_dict)``
 
     """
     pypet_root_logger = logging.getLogger("pypet")
@@ -323,6 +348,10 @@ def _single_run(kwargs):
         "\n=========================================\n" % (idx, total_runs)
     )
 
+    # Metrics are collected per run, we discard the ones inherited from a parent process
+    if isinstance(traj.v_storage_service, MultiprocWrapper):
+        traj.v_storage_service.pop_metrics()
+
     # Measure start time
     traj.f_start_run(turn_into_run=True)
 
@@ -333,16 +362,28 @@ def _single_run(kwargs):
     if automatic_storing:
         traj.f_store()
 
-    # Add the index to the result and the run information
+    # Wait until everything sent to a storage process has been received
+    traj.f_wait_for_async_stores()
+    storage_metrics = None
+    if isinstance(traj.v_storage_service, MultiprocWrapper):
+        traj.v_storage_service.flush()
+        storage_metrics = traj.v_storage_service.pop_metrics()
+
+    # Add the index to the result, the run information, and the storage metrics
     if wrap_mode == pypetconstants.WRAP_MODE_LOCAL:
         result = (
             (traj.v_idx, result),
             traj.f_get_run_information(traj.v_idx, copy=False),
+            storage_metrics,
             traj.v_storage_service.references,
         )
         traj.v_storage_service.free_references()
     else:
-        result = ((traj.v_idx, result), traj.f_get_run_information(traj.v_idx, copy=False))
+        result = (
+            (traj.v_idx, result),
+            traj.f_get_run_information(traj.v_idx, copy=False),
+            storage_metrics,
+        )
 
     # Measure time of finishing
     traj.f_finalize_run(store_meta_data=False, clean_up=clean_up_after_run)
@@ -362,16 +403,68 @@ def _wrap_handling(kwargs):
     # Main job, make the listener to the queue start receiving message for writing to disk.
     handler = kwargs["handler"]
     graceful_exit = kwargs["graceful_exit"]
+    metrics_conn = kwargs.get("metrics_conn")
     # import cProfile as profile
     # profiler = profile.Profile()
     # profiler.enable()
     if graceful_exit:
         sigint_handling.start()
-    handler.run()
+    try:
+        handler.run()
+    finally:
+        if metrics_conn is not None:
+            # Return the storage metrics of the handler to the main process
+            metrics_conn.send(handler.metrics.to_dict())
+            metrics_conn.close()
     # profiler.disable()
     # profiler.dump_stats('./queue.profile2')
 
 
+class _SamplerDriver:
+    """Streaming post-processing that connects an ask/tell sampler to the trajectory.
+
+    Every batch proposed by the sampler is added to the trajectory as a contiguous
+    range of runs. As soon as all runs of a batch are finished their results are
+    told to the sampler, which is asked for new batches afterwards.
+
+    """
+
+    def __init__(self, sampler):
+        self._sampler = sampler
+        self._starts = []  # Index of the first run of every batch in flight, ascending
+        self._batches = {}  # Maps the first run index to the end index and the results
+
+    @property
+    def in_flight(self):
+        """Number of batches whose runs are not finished"""
+        return len(self._starts)
+
+    def ask(self, traj):
+        """Expands the trajectory by all batches the sampler proposes"""
+        while True:
+            batch = self._sampler.ask()
+            if not batch:
+                break
+            start = len(traj) if traj.f_get_explored_parameters(copy=False) else 0
+            traj.f_expand(batch)
+            self._starts.append(start)
+            self._batches[start] = (len(traj), [])
+
+    def __call__(self, traj, result):
+        pos = bisect.bisect_right(self._starts, result[0]) - 1
+        if pos < 0:
+            return  # The run was explored before the sampler and belongs to no batch
+        start = self._starts[pos]
+        end, batch_results = self._batches[start]
+        batch_results.append(result)
+        if len(batch_results) == end - start:
+            del self._starts[pos]
+            del self._batches[start]
+            batch_results.sort(key=lambda x: x[0])
+            self._sampler.tell(batch_results)
+            self.ask(traj)
+
+
 @prefix_naming
 class Environment(HasLogger):
     """The environment to run a parameter exploration.
@@ -617,7 +710,7 @@ class Environment(HasLogger):
 
          :const:`~pypet.pypetconstants.WRAP_MODE_PIPE`: ('PIPE)
 
-            Experimental mode based on a single pipe. Is faster than ``'QUEUE'`` wrapping
+            Experimental mode based on one pipe per process. Is faster than ``'QUEUE'`` wrapping
             but data corruption may occur, does not work under Windows
             (since it relies on forking).
 
@@ -645,6 +738,13 @@ class Environment(HasLogger):
             Sharing is established by running a queue server that
             distributes locks to the individual processes.
 
+        :const:`~pypet.pypetconstant.WRAP_MODE_SHARDED` ('SHARDED')
+
+            Every process stores data into its own shard file, one per core.
+            Processes do not wait for each other and there is no single writer.
+            After the runs the shards are merged into the main HDF5 file.
+            Data of the runs can only be loaded after merging.
+
          If you don't want wrapping at all use
          :const:`~pypet.pypetconstants.WRAP_MODE_NONE` ('NONE')
 
@@ -680,6 +780,26 @@ class Environment(HasLogger):
         Usually, there is no need to set this parameter since the Python garbage collection
         works quite nicely and schedules collection automatically.
 
+    :param shared_memory_threshold:
+
+        In case of ``'QUEUE'`` or ``'PIPE'`` wrapping, numpy arrays with at least
+        this many bytes are placed into shared memory instead of being pickled and sent
+        to the queue or pipe process. This avoids copying large results
+        several times before they are written to disk.
+        Leave ``None`` (default) to send all data over the queue or pipe.
+
+    :param storage_metrics:
+
+        In case of multiprocessing with any wrap mode, storage metrics like the time spent
+        waiting for locks, the bytes serialized, or the duration of every store
+        are always collected and a summary is logged at the end of the experiment.
+        If ``True``, the metrics are also added to the trajectory as result
+        ``storage_metrics.<environment name>``. It contains the data frame ``runs``
+        with one row of metrics per run index and the data frame ``summary``
+        with the totals of all runs (``'workers'``) and of the
+        queue or pipe process (``'writer'``),
+        see also :class:`~pypet.utils.mpwrappers.StorageMetrics`.
+
     :param clean_up_runs:
 
         In case of single core processing, whether all results under groups named `run_XXXXXXXX`
@@ -690,6 +810,16 @@ class Environment(HasLogger):
         Moreover, if set to ``True`` after post-processing it is checked if there is still data
         under `run_XXXXXXXX` and this data is removed if the trajectory is expanded.
 
+    :param result_memory_limit:
+
+        Maximum number of bytes of the values returned by your run function that are kept
+        in memory. The returned values are pickled as soon as they arrive and all values
+        beyond this limit are written to a temporary file. Then the results of
+        :func:`~pypet.environment.Environment.run` (and those passed to post-processing)
+        are a :class:`~pypet.utils.resultsequence.ResultSequence` ordered by run index,
+        which unpickles the values on demand.
+        Leave ``None`` (default) to keep all values in a plain list.
+
     :param immediate_postproc:
 
         If you use post- and multiprocessing, you can immediately start analysing the data
@@ -731,8 +861,9 @@ class Environment(HasLogger):
         you can resume your trajectory after the last single run that was still
         successfully stored via your storage service.
 
-        The environment will create several `.ecnt` and `.rcnt` files in a folder that you specify
-        (see below).
+        The environment will create a journal file in a folder that you specify
+        (see below). The journal contains a snapshot of the trajectory and is appended
+        with the result of every finished single run.
         Using this data you can resume crashed trajectories.
 
         In order to resume trajectories use :func:`~pypet.environment.Environment.resume`.
@@ -757,6 +888,17 @@ class Environment(HasLogger):
 
         If true, *pypet* will delete the resume files after a successful simulation.
 
+    :param resume_snapshot:
+
+        If the resume files should contain a snapshot of the whole trajectory.
+        If ``False``, only your run function and its arguments are kept in the resume files.
+        Instead, the trajectory is stored to disk before the first run, and finished runs
+        are marked as completed in the `runs` overview table of the HDF5 file in groups,
+        at least every second. To resume, the trajectory is loaded from the HDF5 file and
+        all runs that are not marked as completed are executed again.
+        This avoids writing a potentially huge snapshot at the start of an experiment.
+        Custom wildcard functions are not restored, though.
+
     :param storage_service:
 
         Pass a given storage service or a class constructor (default ``HDF5StorageService``)
@@ -1055,11 +1197,15 @@ class Environment(HasLogger):
         queue_maxsize=-1,
         port=None,
         gc_interval=None,
+        shared_memory_threshold=None,
+        storage_metrics=False,
         clean_up_runs=True,
+        result_memory_limit=None,
         immediate_postproc=False,
         resumable=False,
         resume_folder=None,
         delete_resume=True,
+        resume_snapshot=True,
         storage_service=HDF5StorageService,
         git_repository=None,
         git_message="",
@@ -1238,6 +1384,11 @@ class Environment(HasLogger):
         self._postproc_args = ()
         self._postproc_kwargs = {}
         self._immediate_postproc = immediate_postproc
+        self._stream_postproc = None
+        self._stream_postproc_args = ()
+        self._stream_postproc_kwargs = {}
+        self._expanded_by_stream_postproc = False
+        self._stream_expansion_pending = False
         self._user_pipeline = False
 
         self._git_repository = git_repository
@@ -1348,6 +1499,12 @@ class Environment(HasLogger):
         self._resume_folder = resume_folder
         self._resume_path = resume_path
         self._delete_resume = delete_resume
+        self._resume_snapshot = resume_snapshot
+        self._resume_journal = None
+        self._resumed_records = []
+        self._completed_runs = []  # Run information of runs to mark as completed on disk
+        self._completed_runs_timestamp = 0.0
+        self._main_storage_service = None  # Storage service usable by the main process
 
         # Check multiproc
         self._multiproc = multiproc
@@ -1369,11 +1526,16 @@ class Environment(HasLogger):
         self._use_scoop = use_scoop
         self._freeze_input = freeze_input
         self._gc_interval = gc_interval
+        self._shared_memory_threshold = shared_memory_threshold
+        self._storage_metrics = storage_metrics
+        self._run_metrics = {}  # Storage metrics of every run by index
+        self._summary_metrics = {}  # Storage metrics of workers and writer
         self._multiproc_wrapper = None  # The wrapper Service
 
         self._do_single_runs = do_single_runs
         self._automatic_storing = automatic_storing
         self._clean_up_runs = clean_up_runs
+        self._result_memory_limit = result_memory_limit
 
         if wrap_mode == pypetconstants.WRAP_MODE_NETLOCK and not isinstance(port, str):
             url = port_to_tcp(port)
@@ -1569,6 +1731,27 @@ class Environment(HasLogger):
                         comment="Intervals with which ``gc.collect()`` is called.",
                     ).f_lock()
 
+                if self._shared_memory_threshold is not None and (
+                    self._wrap_mode == pypetconstants.WRAP_MODE_QUEUE
+                    or self._wrap_mode == pypetconstants.WRAP_MODE_PIPE
+                ):
+                    config_name = f"environment.{self.name}.shared_memory_threshold"
+                    self._traj.f_add_config(
+                        Parameter,
+                        config_name,
+                        self._shared_memory_threshold,
+                        comment="Minimum size in bytes of arrays sent via shared memory.",
+                    ).f_lock()
+
+                if self._storage_metrics:
+                    config_name = f"environment.{self.name}.storage_metrics"
+                    self._traj.f_add_config(
+                        Parameter,
+                        config_name,
+                        self._storage_metrics,
+                        comment="Whether storage metrics of all runs are added as result.",
+                    ).f_lock()
+
             config_name = f"environment.{self._name}.clean_up_runs"
             self._traj.f_add_config(
                 Parameter,
@@ -1581,6 +1764,15 @@ class Environment(HasLogger):
                 "doing.",
             ).f_lock()
 
+            if self._result_memory_limit is not None:
+                config_name = f"environment.{self._name}.result_memory_limit"
+                self._traj.f_add_config(
+                    Parameter,
+                    config_name,
+                    self._result_memory_limit,
+                    comment="Maximum size in bytes of returned results kept in memory.",
+                ).f_lock()
+
             config_name = f"environment.{self._name}.resumable"
             self._traj.f_add_config(
                 Parameter,
@@ -1591,6 +1783,14 @@ class Environment(HasLogger):
                 "handled by `dill`.",
             ).f_lock()
 
+            config_name = f"environment.{self._name}.resume_snapshot"
+            self._traj.f_add_config(
+                Parameter,
+                config_name,
+                self._resume_snapshot,
+                comment="Whether or not resume files contain a snapshot of the trajectory.",
+            ).f_lock()
+
             config_name = f"environment.{self._name}.graceful_exit"
             self._traj.f_add_config(
                 Parameter,
@@ -1699,6 +1899,10 @@ class Environment(HasLogger):
             is the actual result. In case of multiprocessing these are not necessarily
             ordered according to their run index, but ordered according to their finishing time.
 
+            If you set ``result_memory_limit``, a
+            :class:`~pypet.utils.resultsequence.ResultSequence` ordered by run index
+            is returned instead, which loads the results on demand.
+
             Does not contain results stored in the trajectory!
             In order to access these simply interact with the trajectory object,
             potentially after calling`~pypet.trajectory.Trajectory.f_update_skeleton`
@@ -1819,6 +2023,44 @@ class Environment(HasLogger):
         self._postproc_args = args
         self._postproc_kwargs = kwargs
 
+    def add_streaming_postprocessing(self, postproc, *args, **kwargs):
+        """Adds a streaming post processing function.
+
+        In contrast to :func:`~pypet.environment.Environment.add_postprocessing`,
+        the environment calls this function for every single result as soon as it arrives
+        via ``postproc(traj, result, *args, **kwargs)``, where `result` is the tuple
+        of the run index and the value returned by your run function.
+        The function is executed by the main process, so results arrive in the order
+        the runs finish, which is not necessarily the order of the run indices.
+
+        As before, the function can expand the trajectory by calling `f_expand` or
+        by returning a dictionary. The new runs are started right away, even if
+        other runs are still being computed. Thus, if you use multiprocessing,
+        adaptive searches can start their next candidates without waiting for all runs
+        of the current generation to finish.
+
+        Streaming post-processing can be combined with the normal post-processing,
+        which is still called after all runs have been completed.
+        It can neither be combined with `run_map` nor SCOOP nor a pool with frozen input.
+        The function is not called again for results recovered when resuming a trajectory.
+
+        :param postproc:
+
+            The streaming post processing function
+
+        :param args:
+
+            Additional arguments passed to the post-processing function
+
+        :param kwargs:
+
+            Additional keyword arguments passed to the postprocessing function
+
+        """
+        self._stream_postproc = postproc
+        self._stream_postproc_args = args
+        self._stream_postproc_kwargs = kwargs
+
     def pipeline(self, pipeline):
         """You can make *pypet* supervise your whole experiment by defining a pipeline.
 
@@ -1889,6 +2131,10 @@ class Environment(HasLogger):
             is the actual result. In case of multiprocessing these are not necessarily
             ordered according to their run index, but ordered according to their finishing time.
 
+            If you set ``result_memory_limit``, a
+            :class:`~pypet.utils.resultsequence.ResultSequence` ordered by run index
+            is returned instead, which loads the results on demand.
+
             Does not contain results stored in the trajectory!
             In order to access these simply interact with the trajectory object,
             potentially after calling :func:`~pypet.trajectory.Trajectory.f_update_skeleton`
@@ -1930,6 +2176,10 @@ class Environment(HasLogger):
             Returns a LIST OF TUPLES, where first entry is the run idx and second entry
             is the actual result. They are always ordered according to the run index.
 
+            If you set ``result_memory_limit``, a
+            :class:`~pypet.utils.resultsequence.ResultSequence` ordered by run index
+            is returned instead, which loads the results on demand.
+
             Does not contain results stored in the trajectory!
             In order to access these simply interact with the trajectory object,
             potentially after calling`~pypet.trajectory.Trajectory.f_update_skeleton`
@@ -1968,33 +2218,138 @@ class Environment(HasLogger):
         self._map_arguments = True
         return self._execute_runs(pipeline)
 
+    def run_sampler(self, sampler, runfunc, *args, **kwargs):
+        """Runs an adaptive search driven by an ask/tell `sampler`.
+
+        The sampler proposes batches of parameter space points and receives the
+        results of the batches once they are evaluated. It needs two methods:
+
+        * ``sampler.ask()`` returns the next batch as an exploration dictionary,
+          i.e. a dictionary mapping all explored parameters to lists of new values, as
+          passed to :func:`~pypet.trajectory.Trajectory.f_explore`. It is called
+          repeatedly until it returns ``None`` (or an empty dictionary), for instance,
+          because the sampler needs to wait for results. Thus, by returning several batches
+          the sampler keeps several generations in flight.
+
+        * ``sampler.tell(results)`` receives the results of a batch as soon as all
+          its runs are finished, i.e. a list of tuples of run indices and values returned
+          by `runfunc` in the order of the points of the batch. Afterwards,
+          the sampler is asked for new batches again.
+
+        The first batches are used to explore the trajectory, if it has not been
+        explored yet. All further batches expand it and are executed by your processes
+        or pool right away, even if the runs of previous batches are not finished, yet.
+        Runs explored before are executed as well, but their results are not told
+        to the sampler.
+        The search ends as soon as all batches are finished and
+        the sampler does not propose any new one.
+
+        For instance, a sampler that evaluates 10 generations of an evolutionary algorithm
+        and keeps two of them in flight:
+
+        .. code-block:: python
+
+            class MySampler:
+                def __init__(self):
+                    self.generation = 0
+                    self.in_flight = 0
+
+                def ask(self):
+                    if self.in_flight < 2 and self.generation < 10:
+                        self.generation += 1
+                        self.in_flight += 1
+                        return {'x': [...], 'y': [...]}  # new offspring
+
+                def tell(self, results):
+                    self.in_flight -= 1
+                    # update the population with the fitnesses in results
+
+            env.run_sampler(MySampler(), myjobfunc)
+
+        The sampler is called by the main process via streaming post-processing,
+        see :func:`~pypet.environment.Environment.add_streaming_postprocessing`.
+        Accordingly, it cannot be combined with another streaming post-processing function,
+        SCOOP, a pool with frozen input, or resumable experiments.
+
+        :param sampler: Object with the methods ``ask()`` and ``tell(results)``
+
+        :param runfunc: The function that evaluates a single point
+
+        :param args: Additional arguments (not the ones in the trajectory) passed to `runfunc`
+
+        :param kwargs: Additional keyword arguments passed to `runfunc`
+
+        :return:
+
+            List of the individual results returned by `runfunc` as
+            for :func:`~pypet.environment.Environment.run`
+
+        """
+        if self._stream_postproc is not None:
+            raise ValueError(
+                "You cannot use a sampler in combination with streaming post-processing."
+            )
+        if self._resumable:
+            raise ValueError("You cannot use a sampler in combination with continuing option.")
+
+        driver = _SamplerDriver(sampler)
+
+        def pipeline(traj):
+            driver.ask(traj)
+            if driver.in_flight == 0:
+                raise ValueError("Your sampler did not propose any points.")
+            return (
+                (runfunc, args, kwargs),
+                (self._postproc, self._postproc_args, self._postproc_kwargs),
+            )
+
+        self._user_pipeline = False
+        self._map_arguments = False
+        self._stream_postproc = driver
+        try:
+            return self._execute_runs(pipeline)
+        finally:
+            self._stream_postproc = None
+
     def _trigger_resume_snapshot(self):
         """Makes the trajectory continuable in case the user wants that"""
         dump_dict = {}
-        dump_filename = os.path.join(self._resume_path, "environment.ecnt")
 
-        # Store the trajectory before the first runs
         prev_full_copy = self._traj.v_full_copy
         dump_dict["full_copy"] = prev_full_copy
-        self._traj.v_full_copy = True
-        prev_storage_service = self._traj.v_storage_service
-        self._traj.v_storage_service = self._storage_service
-        dump_dict["trajectory"] = self._traj
         dump_dict["args"] = self._args
         dump_dict["kwargs"] = self._kwargs
         dump_dict["runfunc"] = self._runfunc
         dump_dict["postproc"] = self._postproc
         dump_dict["postproc_args"] = self._postproc_args
         dump_dict["postproc_kwargs"] = self._postproc_kwargs
+        dump_dict["stream_postproc"] = self._stream_postproc
+        dump_dict["stream_postproc_args"] = self._stream_postproc_args
+        dump_dict["stream_postproc_kwargs"] = self._stream_postproc_kwargs
         dump_dict["start_timestamp"] = self._start_timestamp
 
-        dump_file = open(dump_filename, "wb")
-        dill.dump(dump_dict, dump_file, protocol=2)
-        dump_file.flush()
-        dump_file.close()
+        prev_storage_service = self._traj.v_storage_service
+        if self._resume_snapshot:
+            # Store the trajectory before the first runs, otherwise
+            # it is loaded from the storage service when resuming
+            self._traj.v_full_copy = True
+            self._traj.v_storage_service = self._storage_service
+            dump_dict["trajectory"] = self._traj
+        try:
+            environment_record = dill.dumps(
+                ("environment", dump_dict), protocol=pypetconstants.PICKLE_PROTOCOL
+            )
+        finally:
+            self._traj.v_full_copy = prev_full_copy
+            self._traj.v_storage_service = prev_storage_service
 
-        self._traj.v_full_copy = prev_full_copy
-        self._traj.v_storage_service = prev_storage_service
+        # The journal is rewritten with the new snapshot, records of previous
+        # results are copied as they are without pickling them again.
+        # This is the only compaction, afterwards every appended record is the result
+        # of a distinct run that is needed for resuming, so there is nothing to drop.
+        self._resume_journal = ResumeJournal(os.path.join(self._resume_path, RESUME_JOURNAL))
+        self._resume_journal.compact([environment_record] + self._resumed_records)
+        self._resumed_records = []
 
     def _prepare_sumatra(self):
         """Prepares a sumatra record"""
@@ -2092,11 +2447,26 @@ class Environment(HasLogger):
             )
 
         self._resume_path = os.path.join(self._resume_folder, self._trajectory_name)
-        cnt_filename = os.path.join(self._resume_path, "environment.ecnt")
-        cnt_file = open(cnt_filename, "rb")
-        resume_dict = dill.load(cnt_file)
-        cnt_file.close()
-        traj = resume_dict["trajectory"]
+        resume_dict = None
+        result_list = []
+        journal = ResumeJournal(os.path.join(self._resume_path, RESUME_JOURNAL))
+        for data in journal.replay():
+            kind, record = dill.loads(data)
+            if kind == "environment":
+                resume_dict = record
+            else:
+                result_list.append(record)
+                self._resumed_records.append(data)
+        if resume_dict is None:
+            raise RuntimeError(
+                f"Cannot resume, there is no valid resume journal in `{self._resume_path}`."
+            )
+        if "trajectory" in resume_dict:
+            traj = resume_dict["trajectory"]
+            self._resume_snapshot = True
+        else:
+            traj = self._load_resumed_trajectory()
+            self._resume_snapshot = False
 
         # We need to update the information about the trajectory name
         config_name = f"config.environment.{self.name}.trajectory.name"
@@ -2130,6 +2500,10 @@ class Environment(HasLogger):
         self._postproc_args = resume_dict["postproc_args"]
         # Postproc Kwargs
         self._postproc_kwargs = resume_dict["postproc_kwargs"]
+        # Streaming postproc function and its arguments
+        self._stream_postproc = resume_dict["stream_postproc"]
+        self._stream_postproc_args = resume_dict["stream_postproc_args"]
+        self._stream_postproc_kwargs = resume_dict["stream_postproc_kwargs"]
 
         # Unpack the trajectory
         self._traj.v_full_copy = resume_dict["full_copy"]
@@ -2142,26 +2516,23 @@ class Environment(HasLogger):
         )
 
         # Now we have to reconstruct previous results
-        result_list = []
-        full_filename_list = []
-        for filename in os.listdir(self._resume_path):
-            _, ext = os.path.splitext(filename)
-
-            if ext != ".rcnt":
-                continue
-
-            full_filename = os.path.join(self._resume_path, filename)
-            cnt_file = open(full_filename, "rb")
-            result_list.append(dill.load(cnt_file))
-            cnt_file.close()
-            full_filename_list.append(full_filename)
-
-        new_result_list = []
-        for result_tuple in result_list:
-            run_information = result_tuple[1]
-            self._traj._update_run_information(run_information)
-            new_result_list.append(result_tuple[0])
-        result_sort(new_result_list)
+        new_result_list = self._make_result_list()
+        if self._resume_snapshot:
+            for result_tuple in result_list:
+                run_information = result_tuple[1]
+                self._traj._update_run_information(run_information)
+                new_result_list.append(result_tuple[0])
+        else:
+            # The `runs` overview table decides which runs are completed,
+            # results of all other runs are discarded because these runs are repeated
+            resumed_records = self._resumed_records
+            self._resumed_records = []
+            for result_tuple, data in zip(result_list, resumed_records):
+                if self._traj._is_completed(result_tuple[1]["idx"]):
+                    new_result_list.append(result_tuple[0])
+                    self._resumed_records.append(data)
+        if isinstance(new_result_list, list):
+            result_sort(new_result_list)
 
         # Add a config parameter signalling that an experiment was resumed, and how many of them
         config_name = f"environment.{self.name}.resumed"
@@ -2174,6 +2545,34 @@ class Environment(HasLogger):
 
         return new_result_list
 
+    def _load_resumed_trajectory(self):
+        """Loads the trajectory to resume from the storage service instead of a snapshot"""
+        traj = Trajectory(
+            self._trajectory_name,
+            dynamic_imports=self._traj._dynamic_imports,
+            storage_service=self._storage_service,
+        )
+        traj.f_load(
+            load_parameters=pypetconstants.LOAD_DATA,
+            load_derived_parameters=pypetconstants.LOAD_SKELETON,
+            load_results=pypetconstants.LOAD_SKELETON,
+            load_other_data=pypetconstants.LOAD_SKELETON,
+        )
+
+        # Data of previous single runs is not needed, all other data is loaded
+        # to restore the trajectory as it was before the first run
+        for group in list(traj._run_parent_groups.values()):
+            for name in list(group._children.keys()):
+                if (
+                    name.startswith(pypetconstants.RUN_NAME)
+                    and name != pypetconstants.RUN_NAME_DUMMY
+                ):
+                    group.f_remove_child(name, recursive=True)
+        empty_leaves = [leaf for leaf in traj.f_iter_leaves(with_links=False) if leaf.f_is_empty()]
+        if empty_leaves:
+            traj.f_load_items(empty_leaves)
+        return traj
+
     def _prepare_runs(self, pipeline):
         """Prepares the running of an experiment
 
@@ -2272,8 +2671,19 @@ class Environment(HasLogger):
         )
         self._traj._prepare_experiment()
 
-        self._logger.info("Initialising the storage for the trajectory.")
-        self._traj.f_store(only_init=True)
+        if self._resumable and not self._resume_snapshot:
+            # Resuming relies on the data stored to disk instead of a snapshot
+            self._logger.info("Storing the trajectory before the runs to allow resuming.")
+            self._traj.f_store()
+        else:
+            self._logger.info("Initialising the storage for the trajectory.")
+            self._traj.f_store(only_init=True)
+
+    def _make_result_list(self):
+        """Returns an empty list or a `ResultSequence` for the results of the single runs"""
+        if self._result_memory_limit is None:
+            return []
+        return ResultSequence(self._result_memory_limit)
 
     def _show_progress(self, n, total_runs):
         """Displays a progressbar"""
@@ -2317,9 +2727,14 @@ class Environment(HasLogger):
         return result_dict
 
     def _make_index_iterator(self, start_run_idx):
-        """Returns an iterator over the run indices that are not completed"""
-        total_runs = len(self._traj)
-        for n in range(start_run_idx, total_runs):
+        """Returns an iterator over the run indices that are not completed.
+
+        The length of the trajectory is checked anew for every run, so runs added
+        by the streaming post-processing are iterated as well.
+
+        """
+        n = start_run_idx
+        while n < len(self._traj):
             self._current_idx = n + 1
             if self._stop_iteration:
                 self._logger.debug("I am stopping new run iterations now!")
@@ -2329,6 +2744,7 @@ class Environment(HasLogger):
                 yield n
             else:
                 self._logger.debug("Run `%d` has already been completed, I am skipping it." % n)
+            n += 1
 
     def _make_iterator(self, start_run_idx, copy_data=False, **kwargs):
         """Returns an iterator over all runs and yields the keyword arguments"""
@@ -2443,6 +2859,54 @@ class Environment(HasLogger):
 
         return repeat, start_run_idx, new_runs
 
+    def _execute_stream_postproc(self, result):
+        """Passes a single result to the streaming post-processing function
+
+        :param result: Tuple of run index and result
+
+        """
+        old_traj_length = len(self._traj)
+        # The trajectory's storage service may be a wrapper that
+        # only works in the single runs or no service at all in case of a pool
+        prev_storage_service = self._traj._storage_service
+        self._traj._storage_service = self._main_storage_service
+        try:
+            expand_dict = self._stream_postproc(
+                self._traj, result, *self._stream_postproc_args, **self._stream_postproc_kwargs
+            )
+            if expand_dict:
+                self._traj.f_expand(expand_dict)
+
+            new_runs = len(self._traj) - old_traj_length
+            if new_runs:
+                self._logger.debug(
+                    "STREAMING POSTPROCESSING expanded the trajectory and "
+                    "added %d new runs" % new_runs
+                )
+                if self._resumable and not self._expanded_by_stream_postproc:
+                    self._logger.warning(
+                        "Continuing a trajectory AND expanding it during runtime is "
+                        "NOT supported properly, there is no guarantee that this "
+                        "works!"
+                    )
+                # Storing the meta data is deferred, because it is slow and only
+                # needed to mark the new runs as completed when resuming
+                self._stream_expansion_pending = True
+                self._expanded_by_stream_postproc = True
+        finally:
+            self._traj._storage_service = prev_storage_service
+
+    def _store_stream_expansion(self):
+        """Stores the meta data of runs added by the streaming post-processing"""
+        if self._stream_expansion_pending:
+            prev_storage_service = self._traj._storage_service
+            self._traj._storage_service = self._main_storage_service
+            try:
+                self._traj.f_store(only_init=True)
+            finally:
+                self._traj._storage_service = prev_storage_service
+            self._stream_expansion_pending = False
+
     def _estimate_cpu_utilization(self):
         """Estimates the cpu utilization within the last 500ms"""
         now = time.time()
@@ -2495,11 +2959,24 @@ class Environment(HasLogger):
                 "You cannot use `run_map` or `pipeline_map` in combination with continuing option."
             )
 
+        if self._stream_postproc is not None:
+            if self._map_arguments:
+                raise ValueError(
+                    "You cannot use `run_map` or `pipeline_map` in combination with "
+                    "streaming post-processing."
+                )
+            if self._multiproc and self._use_scoop:
+                raise ValueError("You cannot use streaming post-processing with scoop.")
+            if self._multiproc and self._use_pool and self._freeze_input:
+                raise ValueError(
+                    "You cannot use streaming post-processing with a pool that has frozen input."
+                )
+
         if self._sumatra_project is not None:
             self._prepare_sumatra()
 
         if pipeline is not None:
-            results = []
+            results = self._make_result_list()
             self._prepare_runs(pipeline)
         else:
             results = self._prepare_resume()
@@ -2513,6 +2990,9 @@ class Environment(HasLogger):
             finally:
                 self._traj._run_by_environment = False
                 self._stop_iteration = False
+                if self._resume_journal is not None:
+                    self._resume_journal.close()
+                    self._resume_journal = None
                 if self._graceful_exit:
                     sigint_handling.finalize()
 
@@ -2657,6 +3137,9 @@ class Environment(HasLogger):
 
         self._storage_service = self._traj.v_storage_service
         self._multiproc_wrapper = None
+        self._main_storage_service = self._storage_service
+        self._expanded_by_stream_postproc = False
+        self._stream_expansion_pending = False
 
         if self._resumable:
             self._trigger_resume_snapshot()
@@ -2696,7 +3179,8 @@ class Environment(HasLogger):
                     "POSTPROCESSING expanded the trajectory and added %d new runs" % new_runs
                 )
 
-        # Do some finalization
+        # Do some finalization, this also marks all remaining runs as completed on disk
+        self._completed_runs = []
         self._traj._finalize(store_meta_data=True)
 
         self._logger.info(
@@ -2707,9 +3191,13 @@ class Environment(HasLogger):
 
         if self._resumable and self._delete_resume:
             # We remove all resume files if the simulation was successfully completed
+            self._resume_journal.close()
             shutil.rmtree(self._resume_path)
 
-        if expanded_by_postproc:
+        if self._storage_metrics and self._run_metrics:
+            self._add_storage_metrics()
+
+        if expanded_by_postproc or self._expanded_by_stream_postproc:
             config_name = f"environment.{self.name}.postproc_expand"
             if not self._traj.f_contains("config." + config_name):
                 self._traj.f_add_config(
@@ -2719,6 +3207,22 @@ class Environment(HasLogger):
                     comment="Added if trajectory was expanded by postprocessing.",
                 )
 
+    def _add_storage_metrics(self):
+        """Adds the storage metrics of all runs and their summary as a result"""
+        runs = pd.DataFrame.from_dict(self._run_metrics, orient="index").sort_index().fillna(0)
+        summary = pd.DataFrame.from_dict(
+            {source: metrics.to_dict() for source, metrics in self._summary_metrics.items()},
+            orient="index",
+        ).fillna(0)
+        self._traj.f_add_result(
+            f"storage_metrics.{self.name}",
+            runs=runs,
+            summary=summary,
+            comment="Storage metrics of every run and of the writer process.",
+        )
+        self._run_metrics = {}
+        self._summary_metrics = {}
+
     def _get_results_from_queue(self, result_queue, results, n, total_runs):
         """Extract all available results from the queue and returns the increased n"""
         # Get all results from the result queue
@@ -2734,12 +3238,20 @@ class Environment(HasLogger):
             result = result[1]  # If SIGINT result is a nested tuple
         if result is not None:
             if self._wrap_mode == pypetconstants.WRAP_MODE_LOCAL:
-                self._multiproc_wrapper.store_references(result[2])
+                self._multiproc_wrapper.store_references(result[3])
+            if result[2]:
+                if self._multiproc_wrapper is not None:
+                    self._multiproc_wrapper.add_run_metrics(result[2])
+                if self._storage_metrics:
+                    self._run_metrics[result[0][0]] = result[2]
             self._traj._update_run_information(result[1])
             results.append(result[0])
             if self._resumable:
                 # [0:2] to not store references
                 self._trigger_result_snapshot(result[0:2])
+            if self._stream_postproc is not None:
+                self._execute_stream_postproc(result[0])
+                total_runs = len(self._traj)
         self._show_progress(n, total_runs)
         n += 1
         return n
@@ -2750,22 +3262,75 @@ class Environment(HasLogger):
         :param result: Currently computed result
 
         """
-        timestamp = result[1]["finish_timestamp"]
-        timestamp_str = repr(timestamp).replace(".", "_")
-        filename = f"result_{timestamp_str}"
-        extension = ".ncnt"
-        dump_filename = os.path.join(self._resume_path, filename + extension)
-
-        dump_file = open(dump_filename, "wb")
-        dill.dump(result, dump_file, protocol=2)
-        dump_file.flush()
-        dump_file.close()
-
-        # We rename the file to be certain that the trajectory did not crash during taking
-        # the snapshot!
-        extension = ".rcnt"
-        rename_filename = os.path.join(self._resume_path, filename + extension)
-        shutil.move(dump_filename, rename_filename)
+        self._resume_journal.append(
+            dill.dumps(("result", result), protocol=pypetconstants.PICKLE_PROTOCOL)
+        )
+
+        if not self._resume_snapshot:
+            # Runs are marked as completed on disk in groups, because opening the file
+            # for every single run is expensive. Runs that are not marked yet are simply
+            # repeated when resuming.
+            self._completed_runs.append(result[1])
+            if (
+                len(self._completed_runs) >= 100
+                or time.time() - self._completed_runs_timestamp >= 1.0
+            ):
+                self._store_completed_runs()
+
+    def _store_completed_runs(self):
+        """Marks runs as completed in the `runs` overview table"""
+        if self._completed_runs:
+            # The results of marked runs must not get lost from the journal
+            self._resume_journal.sync()
+            self._store_stream_expansion()
+            self._main_storage_service.store(
+                pypetconstants.RUN_INFORMATION,
+                self._completed_runs,
+                trajectory_name=self._traj.v_name,
+            )
+        self._completed_runs = []
+        self._completed_runs_timestamp = time.time()
+
+    def _execute_streaming_pool(self, mpool, iterator, results, n):
+        """Feeds the runs one by one into the pool and returns the increased n.
+
+        In contrast to `imap`, runs added by the streaming post-processing are
+        started right away while the pool is still busy with the previous ones.
+        Tasks are pickled by the main process, because the trajectory may change
+        while the pool sends the tasks to its workers.
+
+        """
+        start_result_length = len(results)
+        result_queue = queue.Queue()
+        max_pending = 2 * self._ncores  # Keeps the workers busy in between results
+        pending = 0
+        while True:
+            while pending < max_pending:
+                try:
+                    task = next(iterator)
+                except StopIteration:
+                    if self._stop_iteration or self._current_idx >= len(self._traj):
+                        break
+                    # The trajectory was expanded after all previous runs have been started
+                    iterator = self._make_iterator(self._current_idx)
+                    continue
+                mpool.apply_async(
+                    _streaming_pool_single_run,
+                    (bytes(ForkingPickler.dumps(task)),),
+                    callback=result_queue.put,
+                    error_callback=result_queue.put,
+                )
+                pending += 1
+            if pending == 0:
+                break
+            result = result_queue.get()
+            pending -= 1
+            if isinstance(result, BaseException):
+                raise result
+            n = self._check_result_and_store_references(result, results, n, len(self._traj))
+        if isinstance(results, list):
+            result_sort(results, start_result_length)
+        return n
 
     def _execute_multiprocessing(self, start_run_idx, results):
         """Performs multiprocessing and signals expansion by postproc"""
@@ -2777,7 +3342,9 @@ class Environment(HasLogger):
             self._logger.info("I assume that your storage service is multiprocessing safe.")
         else:
             use_manager = (
-                self._wrap_mode == pypetconstants.WRAP_MODE_QUEUE or self._immediate_postproc
+                self._wrap_mode == pypetconstants.WRAP_MODE_QUEUE
+                or self._immediate_postproc
+                or self._stream_postproc is not None
             )
 
             self._multiproc_wrapper = MultiprocContext(
@@ -2789,6 +3356,9 @@ class Environment(HasLogger):
                 lock=None,
                 queue=None,
                 queue_maxsize=self._queue_maxsize,
+                npipes=self._ncores + 1,
+                nshards=self._ncores,
+                shared_memory_threshold=self._shared_memory_threshold,
                 port=self._url,
                 timeout=self._timeout,
                 gc_interval=self._gc_interval,
@@ -2798,6 +3368,9 @@ class Environment(HasLogger):
             )
 
             self._multiproc_wrapper.start()
+            if self._wrap_mode != pypetconstants.WRAP_MODE_LOCAL:
+                # The main process needs to acquire the locks of the storage as well
+                self._main_storage_service = self._traj.v_storage_service
         try:
             if self._use_pool:
                 self._logger.info("Starting Pool with %d processes" % self._ncores)
@@ -2832,12 +3405,17 @@ class Environment(HasLogger):
                     mpool = multip.Pool(
                         self._ncores, initializer=initializer, initargs=(init_kwargs,)
                     )
-                    pool_results = mpool.imap(target, iterator)
 
                     # Signal start of progress calculation
                     self._show_progress(n - 1, total_runs)
-                    for result in pool_results:
-                        n = self._check_result_and_store_references(result, results, n, total_runs)
+                    if self._stream_postproc is None:
+                        pool_results = mpool.imap(target, iterator)
+                        for result in pool_results:
+                            n = self._check_result_and_store_references(
+                                result, results, n, total_runs
+                            )
+                    else:
+                        n = self._execute_streaming_pool(mpool, iterator, results, n)
 
                     # Everything is done
                     mpool.close()
@@ -2896,7 +3474,7 @@ class Environment(HasLogger):
             else:
                 # If we spawn a single process for each run, we need an additional queue
                 # for the results of `runfunc`
-                if self._immediate_postproc:
+                if self._immediate_postproc or self._stream_postproc is not None:
                     maxsize = 0
                 else:
                     maxsize = total_runs
@@ -3043,17 +3621,34 @@ class Environment(HasLogger):
                     # Get all results from the result queue
                     n = self._get_results_from_queue(result_queue, results, n, total_runs)
 
+                    if (
+                        not keep_running
+                        and not self._stop_iteration
+                        and self._current_idx < len(self._traj)
+                    ):
+                        # The streaming post-processing expanded the trajectory
+                        # after all previous runs have been started
+                        keep_running = True
+                        iterator = self._make_iterator(self._current_idx, result_queue=result_queue)
+
                 # Finally get all results from the result queue once more and finalize the queue
                 self._get_results_from_queue(result_queue, results, n, total_runs)
                 result_queue.close()
                 result_queue.join_thread()
                 del result_queue
 
-                result_sort(results, start_result_length)
+                if isinstance(results, list):
+                    result_sort(results, start_result_length)
         finally:
             # Finalize the wrapper
+            self._main_storage_service = self._storage_service
             if self._multiproc_wrapper is not None:
                 self._multiproc_wrapper.finalize()
+                if self._storage_metrics:
+                    for source, metrics in self._multiproc_wrapper.storage_metrics.items():
+                        if source not in self._summary_metrics:
+                            self._summary_metrics[source] = StorageMetrics()
+                        self._summary_metrics[source].update(metrics)
                 self._multiproc_wrapper = None
 
         return expanded_by_postproc
@@ -3100,7 +3695,7 @@ class MultiprocContext(HasLogger):
 
          :const:`~pypet.pypetconstants.WRAP_MODE_PIPE`: ('PIPE)
 
-            Experimental mode based on a single pipe. Is faster than ``'QUEUE'`` wrapping
+            Experimental mode based on one pipe per process. Is faster than ``'QUEUE'`` wrapping
             but data corruption may occur, does not work under Windows
             (since it relies on forking).
 
@@ -3115,6 +3710,14 @@ class MultiprocContext(HasLogger):
             whatsoever, because there are references kept for all data
             that is supposed to be stored.
 
+         :const:`~pypet.pypetconstants.WRAP_MODE_SHARDED` ('SHARDED')
+
+            Every process stores its data into its own shard file with a regular
+            HDF5 storage service, so processes do not wait for each other.
+            The shards are merged into the main file when the context is finalized.
+            Data stored into shards cannot be loaded before merging.
+            Requires an :class:`~pypet.storageservice.HDF5StorageService`.
+
     :param full_copy:
 
         In case the trajectory gets pickled (sending over a queue or a pool of processors)
@@ -3147,6 +3750,8 @@ class MultiprocContext(HasLogger):
 
         You can pass a multiprocessing lock here, if you already have instantiated one.
         Leave ``None`` if you want the wrapper to create one in case of ``'LOCK'`` wrapping.
+        The created lock is a :class:`~pypet.utils.mpwrappers.ReadWriteLock`, so
+        several processes can load data at the same time.
 
     :param queue:
 
@@ -3157,6 +3762,43 @@ class MultiprocContext(HasLogger):
 
         Maximum size of queue if created new. 0 means infinite.
 
+    :param npipes:
+
+        Number of pipes in case of ``'PIPE'`` wrapping. Every process claims its own
+        pipe, so processes do not need to wait for each other as long as
+        there are at least as many pipes as processes (including the main process).
+        Leave ``None`` for one pipe per CPU plus one for the main process.
+        Ignored if you passed a pipe via ``queue``.
+
+    :param pipe_buffer_bytes:
+
+        Maximum number of bytes (of pickled data) the pipe process buffers
+        before it stops reading from the pipes in case of ``'PIPE'`` wrapping.
+        Processes sending data have to wait until the buffer is stored.
+        ``0`` means infinite.
+
+    :param shared_memory_threshold:
+
+        In case of ``'QUEUE'`` or ``'PIPE'`` wrapping, numpy arrays with at least this
+        many bytes are placed into shared memory blocks. Only small descriptors
+        are sent over the queue or pipe and the data is stored directly from
+        the shared memory. Leave ``None`` to send all data over the queue or pipe.
+
+    :param nshards:
+
+        Number of shard files in case of ``'SHARDED'`` wrapping. Every process claims
+        its own shard, so processes do not need to wait for each other as long as
+        there are at least as many shards as processes. Leave ``None`` for one shard per CPU.
+        The shards are placed into a folder next to the HDF5 file,
+        see :class:`~pypet.storageservice.ShardedStorageServiceView`.
+
+    :param consolidate_shards:
+
+        If the shards should be merged into the HDF5 file and deleted afterwards when
+        the context is finalized. If ``False``, the shards are kept and can be read via a
+        :class:`~pypet.storageservice.ShardedStorageServiceView` or merged
+        later on via :func:`~pypet.environment.MultiprocContext.consolidate`.
+
     :param port:
 
         Port to be used by lock server in case of ``'NETLOCK'`` wrapping.
@@ -3214,6 +3856,11 @@ class MultiprocContext(HasLogger):
         lock=None,
         queue=None,
         queue_maxsize=0,
+        npipes=None,
+        pipe_buffer_bytes=100000000,
+        shared_memory_threshold=None,
+        nshards=None,
+        consolidate_shards=True,
         port=None,
         timeout=None,
         gc_interval=None,
@@ -3236,11 +3883,22 @@ class MultiprocContext(HasLogger):
         self._queue = queue
         self._queue_maxsize = queue_maxsize
         self._pipe = queue
-        self._max_buffer_size = queue_maxsize
+        self._pipes = None
+        self._npipes = npipes
+        self._pipe_buffer_bytes = pipe_buffer_bytes
+        self._shared_memory_threshold = shared_memory_threshold
+        self._nshards = nshards
+        self._consolidate_shards = consolidate_shards
+        self._shard_filenames = None
+        self._sharded_wrapper = None
         self._lock = lock
         self._lock_process = None
         self._port = port
         self._timeout = timeout
+        self._reference_store = None
+        self._metrics_pipe = None
+        self._worker_metrics = StorageMetrics()
+        self._writer_metrics = StorageMetrics()
         self._use_manager = use_manager
         self._logging_manager = None
         self._gc_interval = gc_interval
@@ -3287,6 +3945,38 @@ class MultiprocContext(HasLogger):
     def pipe_wrapper(self):
         return self._pipe_wrapper
 
+    @property
+    def sharded_wrapper(self):
+        return self._sharded_wrapper
+
+    @property
+    def shard_filenames(self):
+        """Names of the shard files in case of ``'SHARDED'`` wrapping"""
+        return self._shard_filenames
+
+    @property
+    def storage_metrics(self):
+        """Dictionary with the storage metrics of all runs (``'workers'``) and of the
+        queue or pipe process (``'writer'``).
+
+        Metrics of the writer are available after
+        :func:`~pypet.environment.MultiprocContext.finalize`.
+
+        """
+        return {"workers": self._worker_metrics.to_dict(), "writer": self._writer_metrics.to_dict()}
+
+    def add_run_metrics(self, metrics):
+        """Adds storage metrics of a single run to the totals of all workers.
+
+        :param metrics:
+
+            Dictionary returned by ``pop_metrics()`` of the trajectory's storage service
+            within a single run.
+
+        """
+        if metrics:
+            self._worker_metrics.update(metrics)
+
     def __enter__(self):
         self.start()
         return self
@@ -3333,10 +4023,12 @@ class MultiprocContext(HasLogger):
             self._prepare_netlock()
         elif self._wrap_mode == pypetconstants.WRAP_MODE_NETQUEUE:
             self._prepare_netqueue()
+        elif self._wrap_mode == pypetconstants.WRAP_MODE_SHARDED:
+            self._prepare_sharded()
         else:
             raise RuntimeError(
                 "The mutliprocessing mode %s, your choice is "
-                "not supported, use %s`, `%s`, %s, `%s`, or `%s`."
+                "not supported, use %s`, `%s`, %s, `%s`, `%s`, `%s`, or `%s`."
                 % (
                     self._wrap_mode,
                     pypetconstants.WRAP_MODE_QUEUE,
@@ -3344,6 +4036,8 @@ class MultiprocContext(HasLogger):
                     pypetconstants.WRAP_MODE_PIPE,
                     pypetconstants.WRAP_MODE_LOCAL,
                     pypetconstants.WRAP_MODE_NETLOCK,
+                    pypetconstants.WRAP_MODE_NETQUEUE,
+                    pypetconstants.WRAP_MODE_SHARDED,
                 )
             )
 
@@ -3403,9 +4097,9 @@ class MultiprocContext(HasLogger):
                 if self._manager is None:
                     self._manager = multip.Manager()
                 # We need a lock that is shared by all processes.
-                self._lock = self._manager.Lock()
+                self._lock = ReadWriteLock(self._manager)
             else:
-                self._lock = multip.Lock()
+                self._lock = ReadWriteLock()
 
         # Wrap around the storage service to allow the placement of locks around
         # the storage procedure.
@@ -3413,20 +4107,139 @@ class MultiprocContext(HasLogger):
         self._traj.v_storage_service = lock_wrapper
         self._lock_wrapper = lock_wrapper
 
+    def _prepare_sharded(self):
+        """Replaces the trajectory's service with a wrapper storing into one shard per process.
+
+        Every shard is an HDF5 file initialised with the trajectory's meta data.
+
+        """
+        filename = getattr(self._storage_service, "filename", None)
+        if filename is None:
+            raise ValueError("`SHARDED` wrapping requires an HDF5 storage service with a file.")
+
+        nshards = self._nshards
+        if nshards is None:
+            nshards = multip.cpu_count()
+        racedirs(ShardedStorageServiceView.get_shard_folder(filename))
+        self._shard_filenames = [
+            ShardedStorageServiceView.get_shard_filename(filename, self._traj.v_name, idx)
+            for idx in range(nshards)
+        ]
+
+        self._logger.info("Initialising %d shard(s) of the trajectory!" % nshards)
+        shard_services = []
+        for shard_filename in self._shard_filenames:
+            if os.path.isfile(shard_filename):
+                # Left over from an aborted experiment
+                os.remove(shard_filename)
+            shard_service = HDF5StorageService(filename=shard_filename)
+            shard_service.store(
+                pypetconstants.TRAJECTORY,
+                self._traj,
+                trajectory_name=self._traj.v_name,
+                only_init=True,
+            )
+            shard_services.append(shard_service)
+
+        if self._lock is None:
+            if self._use_manager:
+                if self._manager is None:
+                    self._manager = multip.Manager()
+                self._lock = self._manager.Lock()
+                shard_locks = [self._manager.Lock() for _ in shard_services]
+            else:
+                self._lock = multip.Lock()
+                shard_locks = [multip.Lock() for _ in shard_services]
+        else:
+            shard_locks = [self._lock] * nshards
+
+        self._sharded_wrapper = ShardedStorageServiceWrapper(
+            self._storage_service, shard_services, self._lock, shard_locks, multip.Value("i", 0)
+        )
+        self._traj.v_storage_service = self._sharded_wrapper
+
+    def consolidate(self):
+        """Merges the shards into the HDF5 file and deletes them in case of ``'SHARDED'`` wrapping.
+
+        Automatically called by :func:`~pypet.environment.MultiprocContext.finalize`
+        if ``consolidate_shards=True``.
+
+        """
+        if not self._shard_filenames:
+            return
+        self._logger.info("Merging %d shard(s) of the trajectory." % len(self._shard_filenames))
+        self._storage_service.store(
+            pypetconstants.MERGE_SHARDS,
+            None,
+            trajectory_name=self._traj.v_name,
+            shard_filenames=self._shard_filenames,
+            delete_shards=True,
+        )
+        shard_folder = os.path.dirname(self._shard_filenames[0])
+        if not os.listdir(shard_folder):
+            os.rmdir(shard_folder)
+        self._shard_filenames = None
+
+    def _prepare_shared_memory(self):
+        """Starts the resource tracker before forking.
+
+        Thus, all processes share the same tracker and shared memory blocks of
+        finished processes are not removed before the writer has stored them.
+
+        """
+        if self._shared_memory_threshold is not None:
+            resource_tracker.ensure_running()
+
+    def _prepare_metrics_pipe(self):
+        """Creates a pipe for the storage metrics of the writer and returns its sending end"""
+        self._metrics_pipe = multip.Pipe(False)
+        return self._metrics_pipe[1]
+
+    def _receive_writer_metrics(self):
+        """Receives the storage metrics sent by the writer after it has finished"""
+        if self._metrics_pipe is None:
+            return
+        receiver, sender = self._metrics_pipe
+        if receiver.poll():
+            self._writer_metrics.update(receiver.recv())
+        receiver.close()
+        sender.close()
+        self._metrics_pipe = None
+
+    def _log_metrics(self):
+        """Logs a summary of the storage metrics"""
+        if self._worker_metrics.counters:
+            self._logger.info("Storage metrics of all runs:\n%s" % self._worker_metrics.summary())
+        if self._writer_metrics.counters:
+            self._logger.info("Storage metrics of the writer:\n%s" % self._writer_metrics.summary())
+
     def _prepare_pipe(self):
-        """Replaces the trajectory's service with a queue sender and starts the queue process."""
-        if self._pipe is None:
-            self._pipe = multip.Pipe(True)
+        """Replaces the trajectory's service with a pipe sender and starts the pipe process."""
+        self._prepare_shared_memory()
+        if self._pipe is not None:
+            self._pipes = [self._pipe]
+        else:
+            npipes = self._npipes
+            if npipes is None:
+                npipes = multip.cpu_count() + 1
+            # One pipe per process, the writer reads from the first end
+            self._pipes = [multip.Pipe(False) for _ in range(npipes)]
+            self._pipe = self._pipes[0]
         if self._lock is None:
-            self._lock = multip.Lock()
+            locks = [multip.Lock() for _ in self._pipes]
+        else:
+            locks = [self._lock] * len(self._pipes)
 
-        self._logger.info("Starting the Storage Pipe!")
-        # Wrap a queue writer around the storage service
+        self._logger.info("Starting the Storage Pipe with %d pipe(s)!" % len(self._pipes))
+        # Wrap a pipe writer around the storage service
         pipe_handler = PipeStorageServiceWriter(
-            self._storage_service, self._pipe[0], max_buffer_size=self._max_buffer_size
+            self._storage_service,
+            [pipe[0] for pipe in self._pipes],
+            max_buffer_bytes=self._pipe_buffer_bytes,
+            gc_interval=self._gc_interval,
         )
 
-        # Start the queue process
+        # Start the pipe process
         self._pipe_process = multip.Process(
             name="PipeProcess",
             target=_wrap_handling,
@@ -3435,21 +4248,28 @@ class MultiprocContext(HasLogger):
                     handler=pipe_handler,
                     logging_manager=self._logging_manager,
                     graceful_exit=self._graceful_exit,
+                    metrics_conn=self._prepare_metrics_pipe(),
                 ),
             ),
         )
         self._pipe_process.start()
 
         # Replace the storage service of the trajectory by a sender.
-        # The sender will put all data onto the pipe.
+        # The sender will put all data onto the pipe claimed by the current process.
         # The writer from above will receive the data from
-        # the pipe and hand it over to
+        # the pipes and hand it over to
         # the storage service
-        self._pipe_wrapper = PipeStorageServiceSender(self._pipe[1], self._lock)
+        self._pipe_wrapper = PipeStorageServiceSender(
+            [pipe[1] for pipe in self._pipes],
+            locks,
+            multip.Value("i", 0),
+            shared_memory_threshold=self._shared_memory_threshold,
+        )
         self._traj.v_storage_service = self._pipe_wrapper
 
     def _prepare_queue(self):
         """Replaces the trajectory's service with a queue sender and starts the queue process."""
+        self._prepare_shared_memory()
         if self._queue is None:
             if self._use_manager:
                 if self._manager is None:
@@ -3473,6 +4293,7 @@ class MultiprocContext(HasLogger):
                     handler=queue_handler,
                     logging_manager=self._logging_manager,
                     graceful_exit=self._graceful_exit,
+                    metrics_conn=self._prepare_metrics_pipe(),
                 ),
             ),
         )
@@ -3483,7 +4304,9 @@ class MultiprocContext(HasLogger):
         # The writer from above will receive the data from
         # the queue and hand it over to
         # the storage service
-        self._queue_wrapper = QueueStorageServiceSender(self._queue)
+        self._queue_wrapper = QueueStorageServiceSender(
+            self._queue, shared_memory_threshold=self._shared_memory_threshold
+        )
         self._traj.v_storage_service = self._queue_wrapper
 
     def _prepare_netqueue(self):
@@ -3516,6 +4339,7 @@ class MultiprocContext(HasLogger):
                     handler=queuing_server_handler,
                     logging_manager=self._logging_manager,
                     graceful_exit=self._graceful_exit,
+                    metrics_conn=self._prepare_metrics_pipe(),
                 ),
             ),
         )
@@ -3538,6 +4362,10 @@ class MultiprocContext(HasLogger):
         Automatically called when used as context manager.
 
         """
+        wrapped = isinstance(self._traj._storage_service, MultiprocWrapper)
+        if wrapped:
+            # Data stored by the main process counts as well
+            self._worker_metrics.update(self._traj._storage_service.pop_metrics())
         if self._wrap_mode == pypetconstants.WRAP_MODE_QUEUE and self._queue_process is not None:
             self._logger.info(
                 "The Storage Queue will no longer accept new data. "
@@ -3565,11 +4393,11 @@ class MultiprocContext(HasLogger):
                 "There still might be some data in the pipe that "
                 "needs to be stored."
             )
-            self._traj.v_storage_service.conn = self._pipe[1]
-            self._traj.v_storage_service.send_done()
+            self._pipe_wrapper.send_done()
             self._pipe_process.join()
-            self._pipe[1].close()
-            self._pipe[0].close()
+            for pipe in self._pipes:
+                pipe[1].close()
+                pipe[0].close()
         elif self._wrap_mode == pypetconstants.WRAP_MODE_NETLOCK and self._lock_process is not None:
             self._lock.send_done()
             self._lock.finalize()
@@ -3580,6 +4408,14 @@ class MultiprocContext(HasLogger):
             self._queue.send_done()
             self._queue.finalize()
             self._queue_process.join()
+        elif self._wrap_mode == pypetconstants.WRAP_MODE_SHARDED and self._consolidate_shards:
+            self.consolidate()
+
+        self._receive_writer_metrics()
+        if self._reference_store is not None:
+            self._writer_metrics.update(self._reference_store.metrics.pop())
+        if wrapped:
+            self._log_metrics()
 
         if self._manager is not None:
             self._manager.shutdown()
@@ -3593,8 +4429,10 @@ class MultiprocContext(HasLogger):
         self._lock_process = None
         self._reference_wrapper = None
         self._pipe = None
+        self._pipes = None
         self._pipe_process = None
         self._pipe_wrapper = None
+        self._sharded_wrapper = None
         self._logging_manager = None
 
         self._traj._storage_service = self._storage_service
@@ -49,6 +49,7 @@ import inspect
 import itertools as itools
 import keyword
 import re
+import sys
 import warnings
 from collections import deque
 
@@ -303,7 +304,9 @@ class NNTreeNode(WithAnnotations):
         """Renames the tree node"""
         self._full_name = full_name
         if full_name:
-            self._name = full_name.rsplit(".", 1)[-1]
+            # Short names are repeated throughout the tree (e.g. in every run), so all
+            # nodes share a single copy of each name
+            self._name = sys.intern(full_name.rsplit(".", 1)[-1])
 
     def _set_details(self, depth, branch, run_branch):
         """Sets some details for internal handling."""
@@ -502,6 +505,15 @@ class NaturalNamingInterface(HasLogger):
         # This dictionary is used for fast search in case a trajectory is told to behave like
         # a particular run (by setting the v_crun property).
         self._nodes_and_leaves_runs_sorted = {}
+
+        # Index of all nodes and leaves hanging below a particular group. Keys are tuples of
+        # the full name of the group, the (short) name of the node, and the depth of the node
+        # relative to the group. Values are the full name of the node if there is only a single
+        # one or the number of nodes otherwise. Direct children are not indexed since they can be
+        # found in the `_children` of the group. This index is used for searches that would
+        # otherwise need a tree traversal.
+        self._descendants_index = {}
+        self._max_depth_indexed = 0
         self._links_count = {}  # Dictionary of how often a link exists
 
         # Context Manager to disable logging for auto-loading
@@ -512,6 +524,11 @@ class NaturalNamingInterface(HasLogger):
         self._not_admissible_names = set(dir(self)) | set(dir(self._root_instance))
         self._python_keywords = set(keyword.kwlist)
 
+        # Set of names that have already passed the name check and are no shortcuts.
+        # These (as well as the names of runs) are not checked nor translated again
+        # if used for adding new items.
+        self._admissible_names = set()
+
     def _map_type_to_dict(self, type_name):
         """Maps a an instance type representation string (e.g. 'RESULT')
         to the corresponding dictionary in root.
@@ -731,19 +748,13 @@ class NaturalNamingInterface(HasLogger):
 
         def _delete_from_children(node, child_name):
             del node._children[child_name]
-            if child_name in node._groups:
-                del node._groups[child_name]
-            elif child_name in node._leaves:
-                del node._leaves[child_name]
-            else:
-                raise RuntimeError("You shall not pass!")
 
         def _remove_subtree_inner(node, predicate):
 
             if not predicate(node):
                 return False
             elif node.v_is_group:
-                for name_ in itools.chain(list(node._leaves.keys()), list(node._groups.keys())):
+                for name_ in [x for x in node._children if x not in node._links]:
                     child_ = node._children[name_]
                     child_deleted = _remove_subtree_inner(child_, predicate)
                     if child_deleted:
@@ -860,6 +871,20 @@ class NaturalNamingInterface(HasLogger):
             if len(self._nodes_and_leaves_runs_sorted[name]) == 0:
                 del self._nodes_and_leaves_runs_sorted[name]
 
+        location = full_name.rpartition(".")[0]
+        for relative_depth in range(2, full_name.count(".") + 2):
+            location = location.rpartition(".")[0]
+            index_key = (location, name, relative_depth)
+            entry = self._descendants_index[index_key]
+            if isinstance(entry, str):
+                del self._descendants_index[index_key]
+            elif entry > 2:
+                self._descendants_index[index_key] = entry - 1
+            else:
+                # Only a single node is left, so we need to find out which one
+                remaining = next(self._iter_descendants(location, name, relative_depth))
+                self._descendants_index[index_key] = remaining
+
     def _remove_node_or_leaf(self, instance, recursive=False):
         """Removes a single node from the tree.
 
@@ -922,12 +947,6 @@ class NaturalNamingInterface(HasLogger):
 
             if self._remove_along_branch(child, split_name, recursive=recursive):
                 del actual_node._children[name]
-                if name in actual_node._groups:
-                    del actual_node._groups[name]
-                elif name in actual_node._leaves:
-                    del actual_node._leaves[name]
-                else:
-                    raise RuntimeError("You shall not pass!")
                 del child
                 return False
 
@@ -1199,8 +1218,12 @@ class NaturalNamingInterface(HasLogger):
 
         split_names = name.split(".")
         if check_naming:
+            run_information = self._root_instance._run_information
             for idx, name in enumerate(split_names):
-                translated_shortcut, name = self._translate_shortcut(name)
+                if name in self._admissible_names or name in run_information:
+                    translated_shortcut = False
+                else:
+                    translated_shortcut, name = self._translate_shortcut(name)
                 replaced, name = self._replace_wildcards(name)
                 if translated_shortcut or replaced:
                     split_names[idx] = name
@@ -1271,6 +1294,34 @@ class NaturalNamingInterface(HasLogger):
             else:
                 self._nodes_and_leaves_runs_sorted[name][run_name][full_name] = new_node
 
+        # Register the node with all its ancestors except the direct parent
+        depth = full_name.count(".") + 1
+        if depth > self._max_depth_indexed:
+            self._max_depth_indexed = depth
+        location = full_name.rpartition(".")[0]
+        for relative_depth in range(2, depth + 1):
+            location = location.rpartition(".")[0]
+            index_key = (location, name, relative_depth)
+            entry = self._descendants_index.get(index_key)
+            if entry is None:
+                self._descendants_index[index_key] = full_name
+            elif isinstance(entry, str):
+                self._descendants_index[index_key] = 2
+            else:
+                self._descendants_index[index_key] = entry + 1
+
+    def _iter_descendants(self, location, name, relative_depth):
+        """Iterates over the full names of nodes called `name` at a given depth below `location`"""
+        if location:
+            prefix = location + "."
+            depth = location.count(".") + 1 + relative_depth
+        else:
+            prefix = ""
+            depth = relative_depth
+        for full_name, node in self._nodes_and_leaves.get(name, {}).items():
+            if node._depth == depth and full_name.startswith(prefix):
+                yield full_name
+
     def _add_to_tree(
         self,
         start_node,
@@ -1464,8 +1515,12 @@ class NaturalNamingInterface(HasLogger):
                 "this is a reserved keyword,"
             )
 
+        run_information = self._root_instance._run_information
         for split_name in split_names:
-            if len(split_name) == 0:
+            if split_name in self._admissible_names or split_name in run_information:
+                continue
+
+            elif len(split_name) == 0:
                 faulty_names = (
                     f"{faulty_names} `{split_name}` contains no characters, please use at least 1,"
                 )
@@ -1473,7 +1528,7 @@ class NaturalNamingInterface(HasLogger):
             elif split_name.startswith("_"):
                 faulty_names = f"{faulty_names} `{split_name}` starts with a leading underscore,"
 
-            elif re.match(CHECK_REGEXP, split_name) is None:
+            elif CHECK_REGEXP.match(split_name) is None:
                 faulty_names = (
                     f"{faulty_names} `{split_name}` contains non-admissible characters "
                     "(use only [A-Za-z0-9_-]),"
@@ -1503,6 +1558,10 @@ class NaturalNamingInterface(HasLogger):
                     category=SyntaxWarning,
                 )
 
+            elif not self._translate_shortcut(split_name)[0]:
+                # Remember the name to skip checks and translation next time
+                self._admissible_names.add(split_name)
+
         name = split_names[-1]
         if len(name) >= pypetconstants.HDF5_STRCOL_MAX_NAME_LENGTH:
             faulty_names = (
@@ -1594,8 +1653,7 @@ class NaturalNamingInterface(HasLogger):
         instance._nn_interface = self
         self._root_instance._all_groups[instance.v_full_name] = instance
         self._add_to_nodes_and_leaves(instance)
-        parent_node._children[name] = instance
-        parent_node._groups[name] = instance
+        parent_node._children[instance._name] = instance
 
         return instance
 
@@ -1671,8 +1729,7 @@ class NaturalNamingInterface(HasLogger):
 
         where_dict[full_name] = instance
         self._add_to_nodes_and_leaves(instance)
-        parent_node._children[name] = instance
-        parent_node._leaves[name] = instance
+        parent_node._children[instance._name] = instance
 
         if full_name in self._root_instance._explored_parameters:
             instance._explored = True  # Mark this parameter as explored.
@@ -1879,8 +1936,8 @@ class NaturalNamingInterface(HasLogger):
         if with_links:
             iterator = ((cdp1, x[0], x[1]) for x in node._children.items())
         else:
-            leaves = ((cdp1, x[0], x[1]) for x in node._leaves.items())
-            groups = ((cdp1, y[0], y[1]) for y in node._groups.items())
+            leaves = ((cdp1, x[0], x[1]) for x in node._iter_leaves())
+            groups = ((cdp1, y[0], y[1]) for y in node._iter_groups())
             iterator = itools.chain(groups, leaves)
         return iterator
 
@@ -2038,6 +2095,103 @@ class NaturalNamingInterface(HasLogger):
         if result_node is not None:
             return result_node, result_node.v_depth
 
+    def _indexed_search(self, node, key, max_depth):
+        """Searches for a node below `node` using the index of descendants.
+
+        Finds the same node as a breadth first search ignoring links would,
+        but only needs a few dictionary look-ups regardless of the size of the tree.
+
+        :param node:
+
+            Parent node to start from
+
+        :param key:
+
+            Name of node to find
+
+        :param max_depth:
+
+            Maximum depth relative to `node`
+
+        :return: The found node and its depth relative to `node` or `None` and infinity
+
+        :raises:
+
+            NotUniqueNodeError:
+
+                If several nodes match the key criterion within the same depth
+
+        """
+        location = node.v_full_name
+        entry, depth = self._index_lookup(location, key, max_depth)
+        if isinstance(entry, str):
+            return self._nodes_and_leaves[key][entry], depth
+        elif entry is not None:
+            first, second = itools.islice(self._iter_descendants(location, key, depth), 2)
+            raise pex.NotUniqueNodeError(
+                f"Node `{key}` has been found more than once within "
+                f"the same depth {node.v_depth + depth}. "
+                f"Full name of first occurrence is `{first}` and of "
+                f"second `{second}`"
+            )
+        return None, float("inf")
+
+    def _index_lookup(self, location, key, max_depth):
+        """Returns the first entry of the index of descendants below `location` and its depth.
+
+        Direct children are not indexed, hence, the look-up starts at depth 2.
+        If nothing is found, `None` and infinity are returned.
+
+        """
+        location_depth = location.count(".") + 1 if location else 0
+        last_depth = min(max_depth, self._max_depth_indexed - location_depth)
+        depth = 2
+        while depth <= last_depth:
+            entry = self._descendants_index.get((location, key, depth))
+            if entry is not None:
+                return entry, depth
+            depth += 1
+        return None, float("inf")
+
+    def _links_could_match(self, node, key, max_depth):
+        """Checks if a link below `node` could lead to `key` within `max_depth`.
+
+        This is the case if a link itself is called `key` or points to a node that
+        has a descendant called `key` or further links below it.
+        The check only needs the links and the index of descendants, not a tree traversal.
+
+        """
+        location = node.v_full_name
+        prefix = location + "." if location else ""
+        links = [
+            (parent_name, name, parent_node._links[name])
+            for linking in self._root_instance._linked_by.values()
+            for parent_name, (parent_node, names) in linking.items()
+            for name in names
+        ]
+        for parent_name, name, target in links:
+            if parent_name != location and not parent_name.startswith(prefix):
+                continue
+            parent_depth = parent_name.count(".") + 1 if parent_name else 0
+            relative_depth = parent_depth - node.v_depth + 1
+            if relative_depth > max_depth:
+                continue
+            if name == key:
+                return True
+            if target.v_is_leaf or relative_depth == max_depth:
+                continue
+            target_name = target.v_full_name
+            if key in target._children:
+                return True
+            if self._index_lookup(target_name, key, max_depth - relative_depth)[0] is not None:
+                return True
+            target_prefix = target_name + "."
+            if any(
+                other == target_name or other.startswith(target_prefix) for other, _, _ in links
+            ):
+                return True
+        return False
+
     def _search(self, node, key, max_depth=float("inf"), with_links=True, crun=None):
         """Searches for an item in the tree below `node`
 
@@ -2079,6 +2233,17 @@ class NaturalNamingInterface(HasLogger):
         except pex.NotUniqueNodeError:
             pass
 
+        # Without links the index of descendants yields the same result as a tree traversal.
+        # Links can create shorter paths to a node, so the tree is only traversed if a link
+        # could lead to a node that is not deeper than the one found in the index.
+        if with_links and self._links_count:
+            _, index_depth = self._index_lookup(node.v_full_name, key, max_depth)
+            max_depth = min(max_depth, index_depth)
+            if not self._links_could_match(node, key, max_depth):
+                return self._indexed_search(node, key, max_depth)
+        else:
+            return self._indexed_search(node, key, max_depth)
+
         # Slowly traverse the entire tree
         nodes_iterator = self._iter_nodes(
             node, recursive=True, max_depth=max_depth, in_search=True, with_links=with_links
@@ -2545,14 +2710,12 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
 
     """
 
-    __slots__ = ("_children_", "_links_", "_groups_", "_leaves_", "_nn_interface", "_kids")
+    __slots__ = ("_children_", "_links_", "_nn_interface", "_kids")
 
     def __init__(self, full_name="", trajectory=None, comment=""):
         super().__init__(full_name, comment=comment, is_leaf=False)
         self._children_ = None
         self._links_ = None
-        self._groups_ = None
-        self._leaves_ = None
         self._kids = None
         if trajectory is not None:
             self._nn_interface = trajectory._nn_interface
@@ -2571,17 +2734,39 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
             self._links_ = {}
         return self._links_
 
+    def _iter_groups(self):
+        """Iterates over names and nodes of the groups (but not links) below this group"""
+        # Groups and leaves are not kept in dictionaries of their own to save memory,
+        # they are taken from the children instead.
+        if self._children_ is None:
+            return iter(())
+        links = self._links_ or ()
+        return (
+            (name, child)
+            for name, child in self._children_.items()
+            if not child._is_leaf and name not in links
+        )
+
+    def _iter_leaves(self):
+        """Iterates over names and nodes of the leaves (but not links) below this group"""
+        if self._children_ is None:
+            return iter(())
+        links = self._links_ or ()
+        return (
+            (name, child)
+            for name, child in self._children_.items()
+            if child._is_leaf and name not in links
+        )
+
     @property
     def _groups(self):
-        if self._groups_ is None:
-            self._groups_ = {}
-        return self._groups_
+        """New dictionary of the groups below this group"""
+        return dict(self._iter_groups())
 
     @property
     def _leaves(self):
-        if self._leaves_ is None:
-            self._leaves_ = {}
-        return self._leaves_
+        """New dictionary of the leaves below this group"""
+        return dict(self._iter_leaves())
 
     @property
     def kids(self):
@@ -2721,16 +2906,14 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
         if not self.v_comment == "":
             debug_tree.v_comment = self.v_comment
 
-        for leaf_name in self._leaves:
-            leaf = self._leaves[leaf_name]
+        for leaf_name, leaf in self._iter_leaves():
             setattr(debug_tree, leaf_name, leaf)
 
         for link_name in self._links:
             linked_node = self._links[link_name]
             setattr(debug_tree, link_name, f"Link to `{linked_node.v_full_name}`")
 
-        for group_name in self._groups:
-            group = self._groups[group_name]
+        for group_name, group in self._iter_groups():
             setattr(debug_tree, group_name, group._debug())
 
         return debug_tree
@@ -2851,19 +3034,19 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
 
     def f_leaves(self):
         """Returns the number of immediate leaves of the group"""
-        return len(self._leaves)
+        return sum(1 for _ in self._iter_leaves())
 
     def f_has_leaves(self):
         """Checks if node has leaves or not"""
-        return len(self._leaves) != 0
+        return any(True for _ in self._iter_leaves())
 
     def f_groups(self):
         """Returns the number of immediate groups of the group"""
-        return len(self._groups)
+        return sum(1 for _ in self._iter_groups())
 
     def f_has_groups(self):
         """Checks if node has groups or not"""
-        return len(self._groups) != 0
+        return any(True for _ in self._iter_groups())
 
     def __contains__(self, item):
         """Equivalent to calling :func:`~pypet.naturalnaming.NNGroupNode.f_contains`.
@@ -3331,32 +3514,40 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
 
         :param copy:
 
-            Whether the group's original dictionary or a shallow copy is returned.
-            If you want the real dictionary please do not modify it at all!
+            Deprecated, the groups are not stored in a dictionary of their own
+            and a new dictionary is returned in any case.
+            Passing ``copy=False`` emits a DeprecationWarning.
 
         :returns: Dictionary of nodes
 
         """
-        if copy:
-            return self._groups.copy()
-        else:
-            return self._groups
+        if not copy:
+            warnings.warn(
+                "`copy=False` is deprecated, the groups are not stored in a dictionary "
+                "of their own, so a new dictionary is returned.",
+                category=DeprecationWarning,
+            )
+        return self._groups
 
     def f_get_leaves(self, copy=True):
         """Returns a dictionary of all leaves hanging immediately below this group.
 
         :param copy:
 
-            Whether the group's original dictionary or a shallow copy is returned.
-            If you want the real dictionary please do not modify it at all!
+            Deprecated, the leaves are not stored in a dictionary of their own
+            and a new dictionary is returned in any case.
+            Passing ``copy=False`` emits a DeprecationWarning.
 
         :returns: Dictionary of nodes
 
         """
-        if copy:
-            return self._leaves.copy()
-        else:
-            return self._leaves
+        if not copy:
+            warnings.warn(
+                "`copy=False` is deprecated, the leaves are not stored in a dictionary "
+                "of their own, so a new dictionary is returned.",
+                category=DeprecationWarning,
+            )
+        return self._leaves
 
     def f_get_links(self, copy=True):
         """Returns a link dictionary.
@@ -3444,6 +3635,7 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
             )
 
         traj = self._nn_interface._root_instance
+        traj.f_wait_for_async_stores()
         storage_service = traj.v_storage_service
 
         storage_service.store(
@@ -3475,6 +3667,7 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
 
         """
         traj = self._nn_interface._root_instance
+        traj.f_wait_for_async_stores()
         storage_service = traj.v_storage_service
 
         storage_service.store(
@@ -3522,6 +3715,7 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
         """
 
         traj = self._nn_interface._root_instance
+        traj.f_wait_for_async_stores()
         storage_service = traj.v_storage_service
 
         storage_service.load(
@@ -3564,6 +3758,7 @@ class NNGroupNode(NNTreeNode, KnowsTrajectory):
         """
 
         traj = self._nn_interface._root_instance
+        traj.f_wait_for_async_stores()
         storage_service = traj.v_storage_service
 
         storage_service.load(
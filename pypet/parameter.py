@@ -313,6 +313,24 @@ class BaseParameter(NNLeafNode):
 
         return comparisons.nested_equal(val1, val2)
 
+    def _hash_value(self, val):
+        """Returns a hash of a value that agrees with :func:`_equal_values`.
+
+        Values that the parameter considers equal must have the same hash.
+        The trajectory uses this to spot duplicate parameter space points in linear time
+        when merging. Equality of values with the same hash is still checked with
+        :func:`_equal_values`.
+
+        In this BaseParameter class values are hashed with
+        :func:`~pypet.utils.comparisons.nested_hash`. If you implement a different
+        equality comparison in your subclass, you need to implement a matching hash
+        as well. Otherwise duplicate points are searched for by comparing all pairs.
+
+        :raises: TypeError: If the value cannot be hashed.
+
+        """
+        return comparisons.nested_hash(val)
+
     def _values_of_same_type(self, val1, val2):
         """Checks if two values agree in type.
 
@@ -1075,10 +1093,18 @@ class Parameter(BaseParameter):
         Checks if the data values are supported by the parameter and if the values are of the same
         type as the default value.
 
+        One dimensional numpy arrays hold items of a single type, so only their first item
+        needs to be checked.
+
         """
-        data_list = []
+        homogeneous = (
+            type(explore_iterable) is np.ndarray
+            and explore_iterable.ndim == 1
+            and explore_iterable.dtype != object
+        )
+        data_list = list(explore_iterable) if homogeneous else []
 
-        for val in explore_iterable:
+        for val in data_list[:1] if homogeneous else explore_iterable:
             if not self.f_supports(val):
                 raise TypeError(f"{val!r} is of not supported type {type(val)}.")
 
@@ -1088,7 +1114,8 @@ class Parameter(BaseParameter):
                     f"new type is {type(val)} vs old type {type(self._default)}."
                 )
 
-            data_list.append(val)
+            if not homogeneous:
+                data_list.append(val)
 
         if len(data_list) == 0:
             raise ValueError("Cannot explore an empty list!")
@@ -1381,6 +1408,11 @@ class SparseParameter(ArrayParameter):
         else:
             return super()._equal_values(val1, val2)
 
+    def _hash_value(self, val):
+        """Matrices serializing to the same value contain the same data and thus
+        have the same :func:`~pypet.utils.comparisons.nested_hash`."""
+        return comparisons.nested_hash(val)
+
     @staticmethod
     def _is_supported_matrix(data):
         """Checks if a data is csr, csc, bsr, or dia Scipy sparse matrix"""
@@ -184,6 +184,15 @@ WRAP_MODE_NETLOCK = "NETLOCK"
 """ Lock multiprocessing mode over a network """
 WRAP_MODE_NETQUEUE = "NETQUEUE"
 """ Queue multiprocessing mode over a network """
+WRAP_MODE_SHARDED = "SHARDED"
+"""Every process stores data into its own shard file, shards are merged afterwards"""
+
+PICKLE_PROTOCOL = 5
+"""Pickle protocol used to send data to other processes and for resume snapshots.
+
+Protocol 5 allows to send large buffers like numpy arrays out-of-band.
+
+"""
 
 
 ############ Loading Constants ###########################
@@ -230,10 +239,16 @@ LIST = "LIST"
 """ Stores a list of different things, in order to avoid reopening and closing of the hdf5 file."""
 SINGLE_RUN = "SINGLE_RUN"
 """ Stores a single run"""
+RUN_INFORMATION = "RUN_INFORMATION"
+""" Updates the rows of single runs in the `runs` overview table"""
 PREPARE_MERGE = "PREPARE_MERGE"
 """ Updates a trajectory before it is going to be merged"""
+MERGE_SHARDS = "MERGE_SHARDS"
+""" Merges shard files of a trajectory into the trajectory"""
 BACKUP = "BACKUP"
 """ Backs up a trajectory"""
+CONSOLIDATE = "CONSOLIDATE"
+""" Copies data linked from other files during merging into the file of a trajectory"""
 DELETE = "DELETE"
 """ Removes an item from hdf5 file"""
 DELETE_LINK = "DELETE_LINK"
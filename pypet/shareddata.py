@@ -54,6 +54,7 @@ class StorageContextManager(HasLogger):
 
     def close_store(self):
         """Closes store manually not needed if used with `with`"""
+        self._traj.f_wait_for_async_stores()
         service = self._traj.v_storage_service
         if not service.is_open:
             raise RuntimeError("The storage service is not open, please open via `f_open_storage`.")
@@ -61,6 +62,7 @@ class StorageContextManager(HasLogger):
 
     def open_store(self):
         """Opens store manually not needed if used with `with`"""
+        self._traj.f_wait_for_async_stores()
         service = self._traj.v_storage_service
         if service.is_open:
             raise RuntimeError("Your service is already open, there is no need to re-open it.")
@@ -68,6 +70,7 @@ class StorageContextManager(HasLogger):
 
     def flush_store(self):
         """Flushes data to the storage can be called at any time when storage is open."""
+        self._traj.f_wait_for_async_stores()
         service = self._traj.v_storage_service
         if not service.is_open:
             raise RuntimeError("The storage service is not open, please open via `f_open_storage`.")
@@ -302,6 +305,7 @@ class SharedData(HasLogger):
     @property
     def _storage_service(self):
         self._store_parent()
+        self.traj.f_wait_for_async_stores()
         return self.traj.v_storage_service
 
 
@@ -6,9 +6,11 @@ Contains the standard :class:`~pypet.storageservice.HDF5StorageSerivce`.
 
 import hashlib
 import itertools as itools
+import multiprocessing as multip
 import os
 import time
 import warnings
+from multiprocessing.util import Finalize
 
 import tables as pt
 
@@ -27,6 +29,7 @@ from pypet._version import __version__ as VERSION
 from pypet.parameter import ObjectTable, Parameter
 from pypet.pypetlogging import DisableAllLogging, HasLogger
 from pypet.utils.helpful_functions import racedirs
+from pypet.utils.sharedmemory import dump_shared, load_shared, unlink_blocks
 
 
 class StorageService:
@@ -138,6 +141,56 @@ class PTItemMock:
         self._v_attrs = DictWrap(dictionary)
 
 
+def _configure_parallel_reader(filename, trajectory_name, encoding):
+    """Opens a read-only storage service in a reader process of the pool"""
+    with DisableAllLogging():
+        service = HDF5StorageService(filename=filename, encoding=encoding)
+    service._srvc_opening_routine("r", kwargs=dict(trajectory_name=trajectory_name))
+    service._keep_open = True
+    _parallel_load_leaves.service = service
+    # Close the file as soon as the reader process exits
+    Finalize(service, _close_parallel_reader, args=(service,), exitpriority=10)
+
+
+def _close_parallel_reader(service):
+    """Closes the file of a reader process"""
+    service._keep_open = False
+    service._srvc_closing_routine(True)
+
+
+def _parallel_load_leaves(jobs):
+    """Loads the data of several leaves in a reader process.
+
+    :param jobs: List of tuples ``(job_id, hdf5_path, full_name, load_flags)``
+
+    :return:
+
+        List of tuples ``(job_id, dump, blocks)``, `dump` is the pickled load dictionary
+        of the leaf whose large arrays are transferred via shared memory, see
+        :func:`~pypet.utils.sharedmemory.dump_shared`, and `blocks` are the names of the
+        created shared memory blocks. `dump` is `None` if the leaf cannot be loaded by the
+        reader and needs to be loaded by the main process instead.
+
+    """
+    service = _parallel_load_leaves.service
+    results = []
+    for job_id, hdf5_path, full_name, load_flags in jobs:
+        dump, blocks = None, []
+        try:
+            hdf5_group = service._hdf5file.get_node(hdf5_path)
+            load_dict = service._prm_load_leaf_data(full_name, hdf5_group, load_flags)
+            if load_dict is not None:
+                dump, _, pickler = dump_shared(
+                    load_dict, HDF5StorageService.SHARED_MEMORY_THRESHOLD, out_of_band=False
+                )
+                blocks = pickler.blocks
+        except Exception:
+            # The main process will try again and report errors properly
+            dump = None
+        results.append((job_id, dump, blocks))
+    return results
+
+
 class HDF5StorageService(StorageService, HasLogger):
     """Storage Service to handle the storage of a trajectory/parameters/results into hdf5 files.
 
@@ -476,6 +529,12 @@ class HDF5StorageService(StorageService, HasLogger):
     LEAF = "SRVC_LEAF"
     """ Whether an hdf5 node is a leaf node"""
 
+    # Parallel loading constants
+    PARALLEL_LOAD_CHUNKSIZE = 128
+    """ Maximum number of leaves handed to a reader process at once"""
+    SHARED_MEMORY_THRESHOLD = 2**20
+    """ Arrays with at least this many bytes are returned from readers via shared memory"""
+
     def __init__(
         self,
         filename=None,
@@ -576,6 +635,10 @@ class HDF5StorageService(StorageService, HasLogger):
         self._mode = None
         self._keep_open = False
 
+        self._deferred_leaf_loads = None  # Leaves whose data is loaded by reader processes
+
+        self._external_stores = {}  # Files opened to resolve external links of merged data
+
         if trajectory is not None and not trajectory.v_stored:
             self._srvc_set_config(trajectory=trajectory)
 
@@ -841,6 +904,11 @@ class HDF5StorageService(StorageService, HasLogger):
 
                 :param force: Force load in case there is a pypet version mismatch
 
+                :param nworkers:
+
+                    Number of reader processes decoding leaf data in parallel.
+                    `None` or `1` loads everything within the current process.
+
                 You can specify how to load the parameters, derived parameters and results
                 as follows:
 
@@ -1027,6 +1095,34 @@ class HDF5StorageService(StorageService, HasLogger):
 
                     Whether to delete the other trajectory after merging.
 
+                :param other_filename:
+
+                    Name of the file of the other trajectory, `None` for the current file.
+
+                :param link_nodes:
+
+                    Whether to create external links to the nodes in the file of the other
+                    trajectory instead of copying them.
+
+            * :const:`pypet.pypetconstants.CONSOLIDATE` ('CONSOLIDATE')
+
+                Replaces all external links created by merging with ``link_nodes=True``
+                by copies of the linked data.
+
+                :param stuff_to_store: ``None``
+
+            * :const:`pypet.pypetconstants.MERGE_SHARDS` ('MERGE_SHARDS')
+
+                Merges shard files written in ``'SHARDED'`` wrap mode into the current
+                trajectory. All nodes found in a shard but not in the current file
+                are copied, the overview tables of the shards are ignored.
+
+                :param stuff_to_store: ``None``
+
+                :param shard_filenames: List of names of the shard files
+
+                :param delete_shards: Whether to delete the shard files after merging
+
             * :const:`pypet.pypetconstants.BACKUP` ('BACKUP')
 
                 :param stuff_to_store: Trajectory to be backed up
@@ -1079,6 +1175,13 @@ class HDF5StorageService(StorageService, HasLogger):
 
                 :param store_final: If final meta info should be stored
 
+            * :const:`pypet.pypetconstants.RUN_INFORMATION` ('RUN_INFORMATION')
+
+                Updates the rows of single runs in the `runs` overview table,
+                e.g. to mark them as completed.
+
+                :param stuff_to_store: List of run information dictionaries of the single runs
+
             * :const:`pypet.pypetconstants.LEAF`
 
                 Stores a parameter or result
@@ -1285,6 +1388,12 @@ class HDF5StorageService(StorageService, HasLogger):
             if msg == pypetconstants.MERGE:
                 self._trj_merge_trajectories(*args, **kwargs)
 
+            elif msg == pypetconstants.MERGE_SHARDS:
+                self._trj_merge_shards(*args, **kwargs)
+
+            elif msg == pypetconstants.CONSOLIDATE:
+                self._trj_consolidate()
+
             elif msg == pypetconstants.BACKUP:
                 self._trj_backup_trajectory(stuff_to_store, *args, **kwargs)
 
@@ -1297,6 +1406,9 @@ class HDF5StorageService(StorageService, HasLogger):
             elif msg == pypetconstants.SINGLE_RUN:
                 self._srn_store_single_run(stuff_to_store, *args, **kwargs)
 
+            elif msg == pypetconstants.RUN_INFORMATION:
+                self._trj_update_run_table(stuff_to_store)
+
             elif msg in pypetconstants.LEAF:
                 self._prm_store_parameter_or_result(stuff_to_store, *args, **kwargs)
 
@@ -1360,6 +1472,56 @@ class HDF5StorageService(StorageService, HasLogger):
 
             self.load(msg, item, *args, **kwargs)
 
+    def _srvc_load_deferred_leaves(self, nworkers):
+        """Loads the data of all deferred leaves with a pool of reader processes.
+
+        The tree itself has already been built by the current process, the readers only
+        decode the data and return it, large arrays are passed via shared memory.
+        Leaves the readers cannot handle are loaded by the current process.
+
+        """
+        deferred = self._deferred_leaf_loads
+        self._deferred_leaf_loads = None
+        nleaves = len(deferred)
+        nworkers = min(nworkers, nleaves)
+        self._logger.info(f"Loading data of {nleaves} leaves with {nworkers} reader processes.")
+
+        chunksize = max(1, min(HDF5StorageService.PARALLEL_LOAD_CHUNKSIZE, nleaves // nworkers))
+        jobs = [
+            (job_id, hdf5_path, full_name, load_flags)
+            for job_id, (_, hdf5_path, full_name, load_flags) in enumerate(deferred)
+        ]
+        chunks = [jobs[irun : irun + chunksize] for irun in range(0, nleaves, chunksize)]
+
+        # Readers are spawned and not forked to not inherit the state
+        # of the HDF5 library and the file opened by the current process
+        context = multip.get_context("spawn")
+        with context.Pool(
+            nworkers,
+            initializer=_configure_parallel_reader,
+            initargs=(self._filename, self._trajectory_name, self._encoding),
+        ) as pool:
+            for results in pool.imap_unordered(_parallel_load_leaves, chunks):
+                try:
+                    for job_id, dump, _ in results:
+                        instance, hdf5_path, _, _ = deferred[job_id]
+                        if dump is None:
+                            self._prm_load_parameter_or_result(
+                                instance,
+                                load_data=pypetconstants.LOAD_DATA,
+                                _hdf5_group=self._hdf5file.get_node(hdf5_path),
+                            )
+                        else:
+                            # Arrays are copied out of shared memory and the blocks are freed
+                            load_dict, _ = load_shared(dump, copy=True)
+                            self._prm_reconstruct_from_dict(instance, load_dict)
+                finally:
+                    # Free all shared memory that has not been consumed due to errors
+                    for _, _, blocks in results:
+                        unlink_blocks(blocks)
+            pool.close()
+            pool.join()
+
     def _srvc_check_hdf_properties(self, traj):
         """Reads out the properties for storing new data into the hdf5file
 
@@ -1597,6 +1759,9 @@ class HDF5StorageService(StorageService, HasLogger):
                 )
                 self._logger.debug(errmsg)
 
+            for external_store in self._external_stores.values():
+                external_store.close()
+            self._external_stores = {}
             self._hdf5store.close()
             if self._hdf5file.isopen:
                 self._logger.error("Could not close HDF5 file!")
@@ -1682,6 +1847,27 @@ class HDF5StorageService(StorageService, HasLogger):
 
         return result_dict
 
+    def _trj_link_filename(self, other_filename):
+        """Returns the filename used as target of external links to `other_filename`.
+
+        The path is relative to the directory of the current file if possible.
+        HDF5 separates the file from the node by `:/`, if the path contains it
+        `None` is returned.
+
+        """
+        link_filename = os.path.abspath(other_filename)
+        try:
+            relative_filename = os.path.relpath(
+                link_filename, os.path.dirname(os.path.abspath(self.filename))
+            )
+        except ValueError:
+            # On Windows there is no relative path between different drives
+            relative_filename = link_filename
+        for candidate in (relative_filename, link_filename):
+            if ":/" not in candidate:
+                return candidate
+        return None
+
     def _trj_merge_trajectories(
         self,
         other_trajectory_name,
@@ -1689,6 +1875,7 @@ class HDF5StorageService(StorageService, HasLogger):
         move_nodes=False,
         delete_trajectory=False,
         other_filename=None,
+        link_nodes=False,
     ):
         """Merges another trajectory into the current trajectory (as in self._trajectory_name).
 
@@ -1696,6 +1883,12 @@ class HDF5StorageService(StorageService, HasLogger):
         :param rename_dict: Dictionary with old names (keys) and new names (values).
         :param move_nodes: Whether to move hdf5 nodes or copy them
         :param delete_trajectory: Whether to delete the other trajectory
+        :param other_filename: File of the other trajectory, `None` for the current file
+        :param link_nodes:
+
+            Whether to create external links to the nodes in the other file instead of
+            copying them. Only the link is stored in the current file, targets are
+            given relative to the directory of the current file if possible.
 
         """
         if other_filename is None or other_filename == self.filename:
@@ -1703,9 +1896,27 @@ class HDF5StorageService(StorageService, HasLogger):
             other_file = self._hdf5file
             other_is_different = False
         else:
-            other_file = pt.open_file(filename=other_filename, mode="r+")
+            if link_nodes:
+                link_filename = self._trj_link_filename(other_filename)
+                if link_filename is None:
+                    self._logger.warning(
+                        f"The file `{other_filename}` cannot be addressed by an external "
+                        f"link because its path contains `:/`, I will copy the nodes of "
+                        f"`{other_trajectory_name}` instead."
+                    )
+                    link_nodes = False
+            # Linked files are never modified
+            mode = "r" if link_nodes else "r+"
+            other_file = pt.open_file(filename=other_filename, mode=mode)
             other_is_different = True
 
+        if link_nodes and not other_is_different:
+            self._logger.warning(
+                "Nodes can only be linked to other files, I will copy the nodes "
+                f"of `{other_trajectory_name}` within the current file."
+            )
+            link_nodes = False
+
         try:
             if "/" + other_trajectory_name not in other_file:
                 raise ValueError(
@@ -1727,8 +1938,16 @@ class HDF5StorageService(StorageService, HasLogger):
                 # Get the data from the other trajectory
                 old_node = other_file.get_node(old_location)
 
-                # Now move or copy the data
-                if move_nodes:
+                # Now link, move, or copy the data
+                if link_nodes:
+                    new_parent_dot_location = ".".join(split_name[:-1])
+                    new_parent, _ = self._all_create_or_get_groups(new_parent_dot_location)
+                    self._hdf5file.create_external_link(
+                        where=new_parent,
+                        name=new_short_name,
+                        target=f"{link_filename}:{old_node._v_pathname}",
+                    )
+                elif move_nodes:
                     self._hdf5file.move_node(
                         where=old_node,
                         newparent=new_parent_location,
@@ -1760,6 +1979,122 @@ class HDF5StorageService(StorageService, HasLogger):
                 other_file.flush()
                 other_file.close()
 
+    def _trj_consolidate(self):
+        """Replaces all external links below the current trajectory by the linked data.
+
+        The linked nodes are copied recursively from the other files and keep the name
+        of the link they replace. The other files are not modified.
+
+        """
+        external_links = []
+        groups = [self._trajectory_group]
+        while groups:
+            group = groups.pop()
+            for child in group._v_links.values():
+                if isinstance(child, pt.link.ExternalLink):
+                    external_links.append(child)
+            groups.extend(group._v_groups.values())
+
+        self._logger.info(f"Copying the data of {len(external_links)} external link(s).")
+        for link in external_links:
+            parent = link._v_parent
+            name = link._v_name
+            linked_node = self._all_resolve_external_link(link)
+            link._f_remove()
+            self._hdf5file.copy_node(
+                where=linked_node, newparent=parent, newname=name, recursive=True
+            )
+            self._node_processing_timer.signal_update()
+
+    def _trj_merge_shards(self, shard_filenames, delete_shards=False):
+        """Merges shard files of the current trajectory into the current file.
+
+        Only the highest node of every branch that is missing in the current file
+        is copied via :func:`~pypet.storageservice.HDF5StorageService._trj_merge_trajectories`.
+        The summary tables of the shards are merged as well, in case of
+        `purge_duplicate_comments` comments already found in the current file are removed
+        from the copied nodes.
+
+        :param shard_filenames: List of shard files
+        :param delete_shards: Whether to delete the shard files afterwards
+
+        """
+        for shard_filename in shard_filenames:
+            rename_dict = {}
+            summaries = {}
+            with pt.open_file(shard_filename, mode="r") as shard_file:
+                shard_group = shard_file.get_node("/" + self._trajectory_name)
+                self._trj_find_missing_nodes(shard_group, "", rename_dict)
+                for table_name in ("results_summary", "derived_parameters_summary"):
+                    if "overview" in shard_group and table_name in shard_group.overview:
+                        summaries[table_name] = shard_group.overview._f_get_child(table_name).read()
+
+            if rename_dict:
+                self._logger.info(
+                    f"Merging {len(rename_dict)} node(s) from shard `{shard_filename}`."
+                )
+                self._trj_merge_trajectories(
+                    self._trajectory_name, rename_dict, other_filename=shard_filename
+                )
+                self._trj_merge_shard_summaries(summaries, rename_dict)
+
+            if delete_shards:
+                os.remove(shard_filename)
+
+    def _trj_merge_shard_summaries(self, summaries, rename_dict):
+        """Adds the rows of shard summary tables to the current summary tables.
+
+        Comments of copied nodes already summarized in the current file are purged
+        if desired.
+
+        """
+        for table_name, rows in summaries.items():
+            if table_name not in self._overview_group:
+                continue
+            table = self._overview_group._f_get_child(table_name)
+            hexdigests = set(table.col("hexdigest"))
+            new_rows = []
+            for irow, row in enumerate(rows):
+                if row["hexdigest"] not in hexdigests:
+                    hexdigests.add(row["hexdigest"])
+                    new_rows.append(irow)
+                elif self._purge_duplicate_comments:
+                    full_name = row["location"].decode("utf-8") + "." + row["name"].decode("utf-8")
+                    if not any(
+                        full_name == name or full_name.startswith(name + ".")
+                        for name in rename_dict
+                    ):
+                        # The node was not copied, so it is not a duplicate
+                        continue
+                    where = self._trajectory_group._v_pathname + "/" + full_name.replace(".", "/")
+                    if where in self._hdf5file:
+                        node = self._hdf5file.get_node(where)
+                        if HDF5StorageService.COMMENT in node._v_attrs:
+                            delattr(node._v_attrs, HDF5StorageService.COMMENT)
+            if new_rows:
+                table.append(rows[new_rows])
+                table.flush()
+
+    def _trj_find_missing_nodes(self, shard_group, location, missing):
+        """Adds all nodes below `shard_group` not found in the current file to `missing`.
+
+        Groups found in both files are searched recursively,
+        leaves are never merged into each other.
+
+        """
+        for child in shard_group._f_iter_nodes():
+            name = child._v_name
+            if not location and name == "overview":
+                continue
+            child_location = location + "." + name if location else name
+            where = self._trajectory_group._v_pathname + "/" + child_location.replace(".", "/")
+            if where not in self._hdf5file:
+                missing[child_location] = child_location
+            elif isinstance(child, pt.Group) and not self._all_get_from_attrs(
+                child, HDF5StorageService.LEAF
+            ):
+                self._trj_find_missing_nodes(child, child_location, missing)
+
     def _trj_prepare_merge(self, traj, changed_parameters, old_length):
         """Prepares a trajectory for merging.
 
@@ -1789,32 +2124,26 @@ class HDF5StorageService(StorageService, HasLogger):
             except pt.NoSuchNodeError:
                 pass  # We are fine and the node did not exist in the first place
 
-        # Increase the run table by the number of new runs
+        # Extract parameter summaries of the new runs
         run_table = getattr(self._overview_group, "runs")
         actual_rows = run_table.nrows
-        self._trj_fill_run_table(traj, actual_rows, len(traj))
-
-        # Extract parameter summary and if necessary create new explored parameter tables
-        # in the result groups
+        explored_parameters = list(traj._explored_parameters.values())
         for idx in range(old_length, len(traj)):
-            run_name = traj.f_idx_to_run(idx)
-            run_info = traj.f_get_run_information(run_name)
-            run_info["name"] = run_name
+            run_info = traj.f_get_run_information(idx, copy=False)
 
             traj._set_explored_parameters_to_idx(idx)
 
-            run_summary = self._srn_summarize_explored_parameters(
-                list(traj._explored_parameters.values())
-            )
-
-            run_info["parameter_summary"] = run_summary
-
-            self._all_add_or_modify_row(
-                run_name, run_info, run_table, index=idx, flags=(HDF5StorageService.MODIFY_ROW,)
+            run_info["parameter_summary"] = self._srn_summarize_explored_parameters(
+                explored_parameters
             )
+            if idx < actual_rows:
+                traj._updated_run_information.add(idx)
 
         traj.f_restore_default()
 
+        # Increase the run table by the number of new runs, all rows are written at once
+        self._trj_fill_run_table(traj, actual_rows, len(traj))
+
     ######################## Loading a Trajectory #################################################
 
     def _trj_load_trajectory(
@@ -1830,6 +2159,7 @@ class HDF5StorageService(StorageService, HasLogger):
         with_run_information,
         with_meta_data,
         force,
+        nworkers=None,
     ):
         """Loads a single trajectory from a given file.
 
@@ -1860,6 +2190,13 @@ class HDF5StorageService(StorageService, HasLogger):
 
         :param force: Force load in case there is a pypet version mismatch
 
+        :param nworkers:
+
+            Number of reader processes. If larger than 1, the tree is still built in
+            the current process, but the data of leaves is read and decompressed by a pool of
+            processes with their own read-only file handles.
+            Large arrays are passed back via shared memory.
+
         You can specify how to load the parameters, derived parameters and results
         as follows:
 
@@ -1945,6 +2282,36 @@ class HDF5StorageService(StorageService, HasLogger):
             self._logger.info(f"Checked meta data of trajectory `{traj.v_name}`.")
             return
 
+        if nworkers is not None and nworkers > 1:
+            self._deferred_leaf_loads = []
+        try:
+            self._trj_load_branches(
+                traj,
+                as_new,
+                load_parameters,
+                load_derived_parameters,
+                load_results,
+                load_other_data,
+                recursive,
+                max_depth,
+            )
+            if self._deferred_leaf_loads:
+                self._srvc_load_deferred_leaves(nworkers)
+        finally:
+            self._deferred_leaf_loads = None
+
+    def _trj_load_branches(
+        self,
+        traj,
+        as_new,
+        load_parameters,
+        load_derived_parameters,
+        load_results,
+        load_other_data,
+        recursive,
+        max_depth,
+    ):
+        """Loads the subbranches below the trajectory node"""
         maximum_display_other = 10
         counter = 0
 
@@ -2212,6 +2579,7 @@ class HDF5StorageService(StorageService, HasLogger):
                     _hdf5_group = self._hdf5file.get_node(
                         where=self._trajectory_group, name=hdf5_group_name
                     )
+                    _hdf5_group = self._all_resolve_external_link(_hdf5_group)
                 except pt.NoSuchNodeError:
                     self._logger.error(
                         f"Cannot find `{traj_node.v_full_name}` the hdf5 node `{hdf5_group_name}` does not exist!"
@@ -2228,7 +2596,7 @@ class HDF5StorageService(StorageService, HasLogger):
             if current_depth > max_depth:
                 return
             # First load along the branch
-            _hdf5_group = getattr(_hdf5_group, name)
+            _hdf5_group = self._all_resolve_external_link(getattr(_hdf5_group, name))
 
             self._tree_load_nodes_dfs(
                 traj_node,
@@ -2248,7 +2616,7 @@ class HDF5StorageService(StorageService, HasLogger):
 
         if current_depth <= max_depth:
             # Then load recursively all data in the last group and below
-            _hdf5_group = getattr(_hdf5_group, final_group_name)
+            _hdf5_group = self._all_resolve_external_link(getattr(_hdf5_group, final_group_name))
             self._tree_load_nodes_dfs(
                 traj_node,
                 load_data=load_data,
@@ -2289,6 +2657,21 @@ class HDF5StorageService(StorageService, HasLogger):
 
     #################################### Storing a Trajectory ####################################
 
+    @staticmethod
+    def _trj_make_run_row(info_dict):
+        """Creates a row of the `run` overview table from a run information dictionary"""
+        return (
+            info_dict["idx"],
+            info_dict["name"],
+            info_dict["time"],
+            info_dict["timestamp"],
+            info_dict["finish_timestamp"],
+            info_dict["runtime"],
+            info_dict["parameter_summary"],
+            info_dict["short_environment_hexsha"],
+            info_dict["completed"],
+        )
+
     def _trj_fill_run_table(self, traj, start, stop):
         """Fills the `run` overview table with information.
 
@@ -2296,27 +2679,13 @@ class HDF5StorageService(StorageService, HasLogger):
 
         """
 
-        def _make_row(info_dict):
-            row = (
-                info_dict["idx"],
-                info_dict["name"],
-                info_dict["time"],
-                info_dict["timestamp"],
-                info_dict["finish_timestamp"],
-                info_dict["runtime"],
-                info_dict["parameter_summary"],
-                info_dict["short_environment_hexsha"],
-                info_dict["completed"],
-            )
-            return row
-
         runtable = getattr(self._overview_group, "runs")
 
         rows = []
         updated_run_information = traj._updated_run_information
         for idx in range(start, stop):
             info_dict = traj._run_information[traj._single_run_ids[idx]]
-            rows.append(_make_row(info_dict))
+            rows.append(self._trj_make_run_row(info_dict))
             updated_run_information.discard(idx)
 
         if rows:
@@ -2328,7 +2697,7 @@ class HDF5StorageService(StorageService, HasLogger):
         indices = []
         for idx in updated_run_information:
             info_dict = traj.f_get_run_information(idx, copy=False)
-            rows.append(_make_row(info_dict))
+            rows.append(self._trj_make_run_row(info_dict))
             indices.append(idx)
 
         if rows:
@@ -2336,6 +2705,15 @@ class HDF5StorageService(StorageService, HasLogger):
 
         traj._updated_run_information = set()
 
+    def _trj_update_run_table(self, run_information_list):
+        """Updates the rows of single runs in the `run` overview table"""
+        runtable = getattr(self._overview_group, "runs")
+        runtable.modify_coordinates(
+            [info_dict["idx"] for info_dict in run_information_list],
+            [self._trj_make_run_row(info_dict) for info_dict in run_information_list],
+        )
+        runtable.flush()
+
     def _trj_store_meta_data(self, traj):
         """Stores general information about the trajectory in the hdf5file.
 
@@ -2726,6 +3104,7 @@ class HDF5StorageService(StorageService, HasLogger):
                     hdf5_group = self._hdf5file.get_node(
                         where=self._trajectory_group, name=hdf5_location
                     )
+                    hdf5_group = self._all_resolve_external_link(hdf5_group)
             except pt.NoSuchNodeError:
                 self._logger.debug(
                     f"Cannot store `{traj_node.v_name}` the parental hdf5 node with path `{hdf5_location}` does "
@@ -2783,7 +3162,7 @@ class HDF5StorageService(StorageService, HasLogger):
 
             traj_node = traj_node._children[name]
 
-            hdf5_group = getattr(hdf5_group, name)
+            hdf5_group = self._all_resolve_external_link(getattr(hdf5_group, name))
 
         # Store final group and recursively everything below it
         if current_depth <= max_depth:
@@ -2861,6 +3240,7 @@ class HDF5StorageService(StorageService, HasLogger):
                 continue
 
             name = hdf5_group._v_name
+            hdf5_group = self._all_resolve_external_link(hdf5_group)
             is_leaf = self._all_get_from_attrs(hdf5_group, HDF5StorageService.LEAF)
             in_trajectory = name in parent_traj_node._children
 
@@ -3013,13 +3393,17 @@ class HDF5StorageService(StorageService, HasLogger):
 
             # If the node does not exist in the hdf5 file create it
             if not hasattr(parent_hdf5_group, name):
+                self._all_check_not_linked(parent_hdf5_group, traj_node.v_full_name)
                 newly_created = True
                 new_hdf5_group = self._hdf5file.create_group(
                     where=parent_hdf5_group, name=name, filters=self._all_get_filters()
                 )
             else:
                 newly_created = False
-                new_hdf5_group = getattr(parent_hdf5_group, name)
+                new_hdf5_group = self._all_resolve_external_link(getattr(parent_hdf5_group, name))
+                if not (store_data == pypetconstants.STORE_DATA_SKIPPING and traj_node._stored):
+                    # Stored nodes are skipped anyway, all others may write to the hdf5 node
+                    self._all_check_not_linked(new_hdf5_group, traj_node.v_full_name)
 
             if traj_node.v_is_leaf:
                 self._prm_store_parameter_or_result(
@@ -3252,7 +3636,41 @@ class HDF5StorageService(StorageService, HasLogger):
         """Returns an HDF5 node by the path specified in `name`"""
         path_name = name.replace(".", "/")
         where = f"/{self._trajectory_name}/{path_name}"
-        return self._hdf5file.get_node(where=where)
+        return self._all_resolve_external_link(self._hdf5file.get_node(where=where))
+
+    def _all_resolve_external_link(self, node):
+        """Returns the node an external link points to, all other nodes are returned as they are.
+
+        External links are created if trajectories are merged with `link_nodes=True`.
+        The linked files are opened read-only, since they belong to other trajectories,
+        and stay open until the current file is closed.
+
+        """
+        if not isinstance(node, pt.link.ExternalLink):
+            return node
+        # Only the last `:/` separates the file from the node, the filename may contain it, too
+        filename, _, target = node.target.rpartition(":/")
+        if not os.path.isabs(filename):
+            filename = os.path.join(os.path.dirname(os.path.abspath(self._filename)), filename)
+        filename = os.path.normpath(filename)
+        external_store = self._external_stores.get(filename)
+        if external_store is None:
+            external_store = HDFStore(filename, mode="r")
+            self._external_stores[filename] = external_store
+        return external_store._handle.get_node("/" + target)
+
+    def _all_check_not_linked(self, hdf5_node, full_name):
+        """Raises a TypeError if `hdf5_node` was reached via an external link.
+
+        Linked data belongs to the file of another trajectory and must not be modified.
+
+        """
+        if hdf5_node._v_file is not self._hdf5file:
+            raise TypeError(
+                f"Cannot modify `{full_name}`, its data is linked from the file "
+                f"`{hdf5_node._v_file.filename}` of another trajectory. "
+                "Please call `f_consolidate()` first to copy the linked data."
+            )
 
     @staticmethod
     def _all_get_from_attrs(ptitem, name):
@@ -3718,7 +4136,8 @@ class HDF5StorageService(StorageService, HasLogger):
             )
             return new_hdf5_group, True
         else:
-            new_hdf5_group = parent_hdf5_group._f_get_child(name)
+            new_hdf5_group = self._all_resolve_external_link(parent_hdf5_group._f_get_child(name))
+            self._all_check_not_linked(new_hdf5_group, name)
             return new_hdf5_group, False
 
     def _all_create_or_get_groups(self, key, start_hdf5_group=None):
@@ -4720,6 +5139,7 @@ class HDF5StorageService(StorageService, HasLogger):
             _hdf5_group = self._hdf5file.get_node(where=where, name=node_name)
 
         if delete_only is None:
+            # Removing an external link leaves the linked data untouched
             if instance.v_is_group and not recursive and len(_hdf5_group._v_children) != 0:
                 raise TypeError(
                     f"You cannot remove the group `{instance.v_full_name}`, it has children, please "
@@ -4730,6 +5150,9 @@ class HDF5StorageService(StorageService, HasLogger):
             if not instance.v_is_leaf:
                 raise ValueError("You can only choose `delete_only` mode for leafs.")
 
+            _hdf5_group = self._all_resolve_external_link(_hdf5_group)
+            self._all_check_not_linked(_hdf5_group, instance.v_full_name)
+
             if isinstance(delete_only, str):
                 delete_only = [delete_only]
 
@@ -5182,6 +5605,18 @@ class HDF5StorageService(StorageService, HasLogger):
         instance_flags.update(load_flags)
         load_flags = instance_flags
 
+        if (
+            self._deferred_leaf_loads is not None
+            and load_only is None
+            and load_except is None
+            and _hdf5_group._v_file is self._hdf5file
+        ):
+            # The data is read later on by a pool of reader processes
+            self._deferred_leaf_loads.append(
+                (instance, _hdf5_group._v_pathname, full_name, load_flags)
+            )
+            return
+
         self._prm_load_into_dict(
             full_name=full_name,
             load_dict=load_dict,
@@ -5206,6 +5641,10 @@ class HDF5StorageService(StorageService, HasLogger):
                     f"of `{full_name}` anyway."
                 )
 
+        self._prm_reconstruct_from_dict(instance, load_dict)
+
+    def _prm_reconstruct_from_dict(self, instance, load_dict):
+        """Hands the loaded data over to a parameter or result"""
         # Finally tell the parameter or result to load the data, if there was any ;-)
         if load_dict:
             try:
@@ -5214,12 +5653,42 @@ class HDF5StorageService(StorageService, HasLogger):
                     # Lock parameter as soon as data is loaded
                     instance.f_lock()
             except:
-                self._logger.error(f"Error while reconstructing data of leaf `{full_name}`.")
+                self._logger.error(
+                    f"Error while reconstructing data of leaf `{instance.v_full_name}`."
+                )
                 raise
 
         # Signal completed node loading
         self._node_processing_timer.signal_update()
 
+    def _prm_load_leaf_data(self, full_name, hdf5_group, load_flags):
+        """Reads all data of a leaf without the leaf instance at hand.
+
+        Used by the reader processes of a parallel load.
+
+        :return:
+
+            Dictionary with the data or `None` if the leaf contains shared data
+            which cannot be created without the corresponding instance.
+
+        """
+        for node in hdf5_group._f_walknodes():
+            load_type = self._all_get_from_attrs(node, HDF5StorageService.STORAGE_TYPE)
+            if isinstance(load_type, str) and load_type.startswith(HDF5StorageService.SHARED_DATA):
+                return None
+
+        load_dict = {}
+        self._prm_load_into_dict(
+            full_name=full_name,
+            load_dict=load_dict,
+            hdf5_group=hdf5_group,
+            instance=None,
+            load_only=None,
+            load_except=None,
+            load_flags=load_flags,
+        )
+        return load_dict
+
     def _prm_read_dictionary(self, leaf, full_name):
         """Loads data that was originally a dictionary when stored
 
@@ -5300,6 +5769,12 @@ class HDF5StorageService(StorageService, HasLogger):
         try:
             pathname = pd_node._v_pathname
             pandas_store = self._hdf5store
+            if pd_node._v_file is not self._hdf5file:
+                # The node is linked from another file
+                for external_store in self._external_stores.values():
+                    if external_store._handle is pd_node._v_file:
+                        pandas_store = external_store
+                        break
             pandas_data = pandas_store.get(pathname)
             return pandas_data
         except:
@@ -5496,3 +5971,154 @@ class HDF5StorageService(StorageService, HasLogger):
                 kwargs = {}
             result = what(*args, **kwargs)
             return result
+
+
+class ShardedStorageServiceView(StorageService, HasLogger):
+    """Read-only view over an HDF5 file and the shard files written in ``'SHARDED'``
+    wrap mode.
+
+    Allows to load a trajectory whose runs are still spread over several shards,
+    i.e. before the shards were merged into the main file.
+    Data of the main file takes precedence over data of the shards.
+
+    :param filename: Name of the main HDF5 file
+
+    :param shard_filenames:
+
+        List of shard files. Leave ``None`` to use all shards of the trajectory
+        loaded first found in the default shard folder next to `filename`.
+
+    :param kwargs: Further arguments passed to every :class:`HDF5StorageService`
+
+    """
+
+    SHARD_FOLDER_SUFFIX = "_shards"
+    """Suffix of the default shard folder added to the name of the main file"""
+
+    def __init__(self, filename, shard_filenames=None, **kwargs):
+        self._set_logger()
+        self._filename = filename
+        self._shard_filenames = shard_filenames
+        self._kwargs = kwargs
+        self._service = HDF5StorageService(filename=filename, **kwargs)
+
+    @staticmethod
+    def get_shard_folder(filename):
+        """Returns the default shard folder of an HDF5 file"""
+        return os.path.splitext(filename)[0] + ShardedStorageServiceView.SHARD_FOLDER_SUFFIX
+
+    @staticmethod
+    def get_shard_filename(filename, trajectory_name, idx):
+        """Returns the name of the `idx`-th shard file of a trajectory"""
+        return os.path.join(
+            ShardedStorageServiceView.get_shard_folder(filename),
+            "%s_shard_%04d.hdf5" % (trajectory_name, idx),
+        )
+
+    @property
+    def filename(self):
+        """Name of the main file"""
+        return self._filename
+
+    @property
+    def multiproc_safe(self):
+        """The view is not multiprocessing safe"""
+        return False
+
+    def _get_shard_services(self, trajectory_name):
+        """Returns one storage service per shard of a trajectory"""
+        shard_filenames = self._shard_filenames
+        if shard_filenames is None:
+            idx = 0
+            shard_filenames = []
+            while os.path.isfile(self.get_shard_filename(self._filename, trajectory_name, idx)):
+                shard_filenames.append(
+                    self.get_shard_filename(self._filename, trajectory_name, idx)
+                )
+                idx += 1
+        return [
+            HDF5StorageService(filename=shard_filename, **self._kwargs)
+            for shard_filename in shard_filenames
+        ]
+
+    def _find_services(self, trajectory_name, full_name):
+        """Returns all services with a file containing the node `full_name`"""
+        where = "/" + trajectory_name
+        if full_name:
+            where += "/" + full_name.replace(".", "/")
+        services = []
+        for service in [self._service] + self._get_shard_services(trajectory_name):
+            with pt.open_file(service.filename, mode="r") as hdf5file:
+                if where in hdf5file:
+                    services.append(service)
+        return services
+
+    def store(self, *args, **kwargs):
+        """Not implemented"""
+        raise NotImplementedError(
+            "A sharded view does not support storing, store data via a "
+            "storage service of the main file."
+        )
+
+    def load(self, msg, stuff_to_load, *args, **kwargs):
+        """Loads a particular item from the main file or the shards.
+
+        Trajectories are loaded from the main file first, afterwards
+        the data of every shard is added. Leaves and groups are loaded from the first
+        file they are found in, branches from all files containing them.
+
+        For a description of the messages and arguments see
+        :func:`~pypet.storageservice.HDF5StorageService.load`.
+
+        :raises: DataNotInStorageError if data to be loaded cannot be found in any file
+
+        """
+        if msg == pypetconstants.TRAJECTORY:
+            self._load_trajectory(stuff_to_load, *args, **kwargs)
+
+        elif msg == pypetconstants.LIST:
+            for input_tuple in stuff_to_load:
+                item_args = input_tuple[2] if len(input_tuple) > 2 else args
+                item_kwargs = input_tuple[3] if len(input_tuple) > 3 else kwargs
+                self.load(input_tuple[0], input_tuple[1], *item_args, **item_kwargs)
+
+        else:
+            if msg == pypetconstants.TREE:
+                branch_name = args[0] if args else kwargs["branch_name"]
+                if stuff_to_load.v_full_name:
+                    full_name = stuff_to_load.v_full_name + "." + branch_name
+                else:
+                    full_name = branch_name
+            else:
+                full_name = stuff_to_load.v_full_name
+
+            services = self._find_services(kwargs["trajectory_name"], full_name)
+            if not services:
+                raise pex.DataNotInStorageError(
+                    f"Could not find `{full_name}` in `{self._filename}` or its shards."
+                )
+            if msg != pypetconstants.TREE:
+                services = services[:1]
+            for service in services:
+                service.load(msg, stuff_to_load, *args, **kwargs)
+
+    def _load_trajectory(self, traj, *args, **kwargs):
+        """Loads the trajectory from the main file and adds all data of the shards"""
+        self._service.load(pypetconstants.TRAJECTORY, traj, *args, **kwargs)
+        if kwargs.get("as_new", False):
+            # Only parameters can be loaded as new, these are never sharded
+            return
+
+        shard_kwargs = kwargs.copy()
+        shard_kwargs.update(
+            dict(
+                trajectory_name=traj.v_name,
+                trajectory_index=None,
+                load_parameters=pypetconstants.LOAD_NOTHING,
+                with_run_information=False,
+                with_meta_data=False,
+            )
+        )
+        for service in self._get_shard_services(traj.v_name):
+            self._logger.info(f"Loading shard `{service.filename}`.")
+            service.load(pypetconstants.TRAJECTORY, traj, *args, **shard_kwargs)
@@ -1,24 +1,28 @@
 import logging
+import multiprocessing as multip
 import os
 import platform
 import random
 
 from pypet import pypetconstants
-from pypet.environment import Environment
+from pypet.environment import Environment, MultiprocContext
+from pypet.storageservice import ShardedStorageServiceView
 from pypet.tests.integration.environment_test import (
     EnvironmentTest,
     ResultSortTest,
     TestOtherHDF5Settings2,
     multiply,
 )
-from pypet.tests.testutils.data import add_params, create_param_dict
+from pypet.tests.testutils.data import TrajectoryComparator, add_params, create_param_dict
 from pypet.tests.testutils.ioutils import (
+    get_log_config,
     make_temp_dir,
     make_trajectory_name,
     parse_args,
     run_suite,
     unittest,
 )
+from pypet.trajectory import Trajectory, load_trajectory
 
 try:
     import psutil
@@ -143,6 +147,25 @@ class MultiprocPoolSortQueueTest(ResultSortTest):
 #         self.url = None
 
 
+@unittest.skipIf(zmq is None, "Cannot be run without zmq")
+class MultiprocPoolSortNetQueueTest(ResultSortTest):
+    tags = (
+        "integration",
+        "hdf5",
+        "environment",
+        "multiproc",
+        "netqueue",
+        "pool",
+    )
+
+    def set_mode(self):
+        super().set_mode()
+        self.mode = pypetconstants.WRAP_MODE_NETQUEUE
+        self.multiproc = True
+        self.ncores = 4
+        self.use_pool = True
+
+
 class MultiprocPoolSortLockTest(ResultSortTest):
     tags = (
         "integration",
@@ -413,6 +436,56 @@ class MultiprocFrozenPoolPipeTest(EnvironmentTest):
         self.niceness = check_nice(10)
 
 
+class MultiprocPoolQueueSharedMemoryTest(EnvironmentTest):
+    tags = "integration", "hdf5", "environment", "multiproc", "queue", "pool", "shared_memory"
+
+    def set_mode(self):
+        super().set_mode()
+        self.mode = pypetconstants.WRAP_MODE_QUEUE
+        self.multiproc = True
+        self.ncores = 4
+        self.use_pool = True
+        self.niceness = check_nice(4)
+        self.shared_memory_threshold = 1000
+
+
+@unittest.skipIf(platform.system() == "Windows", "Pipes cannot be pickled!")
+class MultiprocNoPoolPipeSharedMemoryTest(EnvironmentTest):
+    tags = "integration", "hdf5", "environment", "multiproc", "pipe", "nopool", "shared_memory"
+
+    def set_mode(self):
+        super().set_mode()
+        self.mode = pypetconstants.WRAP_MODE_PIPE
+        self.multiproc = True
+        self.ncores = 3
+        self.use_pool = False
+        self.niceness = check_nice(4)
+        self.shared_memory_threshold = 1000
+
+
+class MultiprocPoolShardedTest(EnvironmentTest):
+    tags = "integration", "hdf5", "environment", "multiproc", "sharded", "pool"
+
+    def set_mode(self):
+        super().set_mode()
+        self.mode = pypetconstants.WRAP_MODE_SHARDED
+        self.multiproc = True
+        self.ncores = 4
+        self.use_pool = True
+        self.niceness = check_nice(4)
+
+
+class MultiprocNoPoolSortShardedTest(ResultSortTest):
+    tags = "integration", "hdf5", "environment", "multiproc", "sharded", "nopool"
+
+    def set_mode(self):
+        super().set_mode()
+        self.mode = pypetconstants.WRAP_MODE_SHARDED
+        self.multiproc = True
+        self.ncores = 3
+        self.use_pool = False
+
+
 class MultiprocFrozenPoolLocalTest(EnvironmentTest):
     tags = "integration", "hdf5", "environment", "multiproc", "local", "pool", "freeze_input"
 
@@ -523,6 +596,113 @@ class CapTest(EnvironmentTest):
         self.env = env
 
 
+def store_shard_result(traj, idx):
+    traj.f_add_result("shard_test.r%d" % idx, idx, comment="Result of a shard")
+    traj.f_store_item("shard_test.r%d" % idx)
+
+
+@unittest.skipIf(platform.system() == "Windows", "Requires forking!")
+class ShardedViewTest(TrajectoryComparator):
+    tags = "integration", "hdf5", "environment", "multiproc", "sharded"
+
+    def test_view_and_consolidation(self):
+        filename = make_temp_dir(os.path.join("experiments", "tests", "HDF5", "sharded.hdf5"))
+        traj = Trajectory(make_trajectory_name(self), filename=filename, add_time=False)
+        traj.f_add_parameter("x", 0, comment="Some parameter")
+        traj.f_store()
+
+        with MultiprocContext(
+            traj,
+            wrap_mode=pypetconstants.WRAP_MODE_SHARDED,
+            use_manager=False,
+            nshards=2,
+            consolidate_shards=False,
+        ) as context:
+            procs = [
+                multip.Process(target=store_shard_result, args=(traj, idx)) for idx in range(4)
+            ]
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.join()
+            shard_filenames = context.shard_filenames
+        self.assertEqual(len(shard_filenames), 2)
+        self.assertTrue(all(os.path.isfile(shard) for shard in shard_filenames))
+
+        main_traj = load_trajectory(name=traj.v_name, filename=filename, load_all=2)
+        self.assertNotIn("shard_test", main_traj.results)
+
+        view = ShardedStorageServiceView(filename)
+        view_traj = load_trajectory(name=traj.v_name, storage_service=view, load_all=2)
+        for idx in range(4):
+            self.assertEqual(view_traj.results.shard_test["r%d" % idx], idx)
+
+        tree_traj = load_trajectory(name=traj.v_name, storage_service=view, load_all=0)
+        tree_traj.f_load_child("results.shard_test", recursive=True, load_data=2)
+        self.assertEqual(len(tree_traj.results.shard_test.f_get_children()), 4)
+
+        context.consolidate()
+        self.assertFalse(any(os.path.isfile(shard) for shard in shard_filenames))
+
+        main_traj = load_trajectory(name=traj.v_name, filename=filename, load_all=2)
+        self.compare_trajectories(main_traj, view_traj)
+
+
+@unittest.skipIf(platform.system() == "Windows", "Requires forking!")
+class StorageMetricsTest(TrajectoryComparator):
+    tags = "integration", "hdf5", "environment", "multiproc", "metrics"
+
+    def check_metrics(self, wrap_mode, writer=True):
+        filename = make_temp_dir(os.path.join("experiments", "tests", "HDF5", "metrics.hdf5"))
+        env = Environment(
+            trajectory=make_trajectory_name(self),
+            filename=filename,
+            log_config=get_log_config(),
+            multiproc=True,
+            ncores=2,
+            use_pool=True,
+            wrap_mode=wrap_mode,
+            storage_metrics=True,
+        )
+        traj = env.v_trajectory
+        traj.f_add_parameter("x", 1)
+        traj.f_add_parameter("y", 2)
+        traj.f_explore({"x": list(range(4))})
+        env.run(multiply)
+        env.disable_logging()
+
+        newtraj = load_trajectory(name=traj.v_name, filename=filename, load_all=2)
+        metrics = newtraj.results.storage_metrics[env.name]
+        self.assertEqual(list(metrics.runs.index), list(range(4)))
+        self.assertTrue((metrics.runs["nstores.SINGLE_RUN"] == 1).all())
+        self.assertTrue((metrics.runs["store_time.SINGLE_RUN"] >= 0).all())
+        self.assertEqual(metrics.summary.loc["workers", "nstores.SINGLE_RUN"], 4)
+        if writer:
+            self.assertEqual(metrics.summary.loc["writer", "nstores.SINGLE_RUN"], 4)
+        return metrics
+
+    def test_lock(self):
+        metrics = self.check_metrics(pypetconstants.WRAP_MODE_LOCK, writer=False)
+        self.assertTrue((metrics.runs["nlocks"] >= 1).all())
+
+    def test_queue(self):
+        self.check_metrics(pypetconstants.WRAP_MODE_QUEUE)
+
+    def test_pipe(self):
+        metrics = self.check_metrics(pypetconstants.WRAP_MODE_PIPE)
+        self.assertTrue((metrics.runs["bytes_serialized"] > 0).all())
+        self.assertGreaterEqual(metrics.summary.loc["writer", "nflushes"], 1)
+
+    def test_local(self):
+        metrics = self.check_metrics(pypetconstants.WRAP_MODE_LOCAL, writer=False)
+        self.assertEqual(metrics.summary.loc["writer", "nstores.LIST"], 4)
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue(self):
+        metrics = self.check_metrics(pypetconstants.WRAP_MODE_NETQUEUE)
+        self.assertTrue((metrics.runs["bytes_serialized"] > 0).all())
+
+
 if __name__ == "__main__":
     opt_args = parse_args()
     run_suite(**opt_args)
@@ -11,6 +11,7 @@ from pypet.environment import Environment
 from pypet.storageservice import HDF5StorageService
 from pypet.trajectory import Trajectory, load_trajectory
 from pypet.utils.explore import cartesian_product
+from pypet.utils.resultsequence import ResultSequence
 
 try:
     import psutil
@@ -127,6 +128,7 @@ class EnvironmentTest(TrajectoryComparator):
         self.mode = "LOCK"
         self.multiproc = False
         self.gc_interval = None
+        self.shared_memory_threshold = None
         self.ncores = 1
         self.use_pool = True
         self.use_scoop = False
@@ -265,6 +267,7 @@ class EnvironmentTest(TrajectoryComparator):
             wrap_mode=self.mode,
             use_pool=self.use_pool,
             gc_interval=self.gc_interval,
+            shared_memory_threshold=self.shared_memory_threshold,
             freeze_input=self.freeze_input,
             fletcher32=self.fletcher32,
             complevel=self.complevel,
@@ -478,6 +481,10 @@ class EnvironmentTest(TrajectoryComparator):
             Environment(automatic_storing=False, continuable=True, continue_folder=tmp)
         with self.assertRaises(ValueError):
             Environment(port="www.nosi.de", wrap_mode="LOCK")
+        env4 = Environment(log_config=None, filename=self.filename)
+        env4.f_add_streaming_postprocessing(lambda traj, result: None)
+        with self.assertRaises(ValueError):
+            env4.f_run_map(multiply_args, [1])
 
     def test_run(self):
         self.traj.f_add_parameter("TEST", "test_run")
@@ -1014,6 +1021,24 @@ class ResultSortTest(TrajectoryComparator):
 
         self.compare_trajectories(self.traj, newtraj)
 
+    def test_results_with_memory_limit(self):
+
+        ###Explore
+        self.explore(self.traj)
+
+        # Writes all results to disk
+        self.env._result_memory_limit = 0
+        results = self.env.f_run(multiply)
+        self.assertIsInstance(results, ResultSequence)
+        self.assertEqual(results.spilled, len(self.traj))
+        self.are_results_in_order(results)
+        self.assertEqual(len(results), len(self.traj))
+
+        self.traj.f_load_skeleton()
+        self.traj.f_load_items(self.traj.f_to_dict().keys(), only_empties=True)
+        for idx, res in results:
+            self.assertEqual(self.traj.res.runs[idx].z, res)
+
     def test_graceful_exit(self):
 
         ###Explore
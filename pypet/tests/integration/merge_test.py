@@ -3,11 +3,13 @@ import os
 import time
 
 import numpy as np
+import tables as pt
 from scipy.stats import pearsonr
 
 from pypet import merge_all_in_folder, pypetconstants
 from pypet.environment import Environment
 from pypet.parameter import Parameter
+from pypet.storageservice import HDF5StorageService
 from pypet.tests.integration.environment_test import ResultSortTest, my_run_func, my_set_func
 from pypet.tests.testutils.data import (
     TrajectoryComparator,
@@ -242,6 +244,28 @@ class MergeTest(TrajectoryComparator):
         ]
         self.merge_basic_only_adding_more_trials(True, slow_merge=True)
 
+    def test_merge_basic_with_separate_files_only_adding_more_trials_link_data(self):
+        self.filenames = [
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "link_merge2.hdf5")),
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "link_merge3.hdf5")),
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "link_merge4.hdf5")),
+        ]
+        self.merge_basic_only_adding_more_trials(True, link_data=True)
+
+    def test_merge_link_data_with_separator_in_filename(self):
+        # The relative targets of the external links do not contain the `:/` separator
+        self.filenames = [
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "odd:", "link_merge2.hdf5")),
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "odd_link_merge3.hdf5")),
+            make_temp_dir(os.path.join("experiments", "tests", "HDF5", "odd_link_merge4.hdf5")),
+        ]
+        self.merge_basic_only_adding_more_trials(True, link_data=True)
+
+        # Files whose path cannot be expressed without the separator are not linked
+        service = HDF5StorageService(filename=self.filenames[1])
+        self.assertIsNone(service._trj_link_filename(self.filenames[0]))
+        self.assertEqual(service._trj_link_filename(self.filenames[2]), "odd_link_merge4.hdf5")
+
     def test_merge_basic_within_same_file_only_adding_more_trials_copy_nodes_test_backup(self):
         self.filenames = [
             make_temp_dir(os.path.join("experiments", "tests", "HDF5", "merge1_more_trials.hdf5")),
@@ -259,7 +283,7 @@ class MergeTest(TrajectoryComparator):
         self.merge_basic_only_adding_more_trials(False, True)
 
     def merge_basic_only_adding_more_trials(
-        self, copy_nodes=False, delete_traj=False, slow_merge=False
+        self, copy_nodes=False, delete_traj=False, slow_merge=False, link_data=False
     ):
 
         self.envs = []
@@ -313,6 +337,7 @@ class MergeTest(TrajectoryComparator):
             delete_other_trajectory=delete_traj,
             trial_parameter="trial",
             slow_merge=slow_merge,
+            link_data=link_data,
         )
 
         merged_traj.f_load(
@@ -324,6 +349,37 @@ class MergeTest(TrajectoryComparator):
 
         self.compare_trajectories(merged_traj, self.trajs[2])
 
+        if link_data:
+            self.assertGreater(self.count_external_links(self.filenames[0]), 0)
+            # Linked data belongs to the other file and must not be modified
+            linked_result = merged_traj.f_get("rrororo33o333o3o3oo3")
+            linked_result.f_set(42)
+            modified = os.path.getmtime(self.filenames[1])
+            self.assertRaises(TypeError, merged_traj.f_store_item, linked_result, overwrite=True)
+            self.assertRaises(
+                TypeError,
+                merged_traj.res.gg.f_store_child,
+                linked_result.v_name,
+                store_data=pypetconstants.OVERWRITE_DATA,
+            )
+            self.assertEqual(os.path.getmtime(self.filenames[1]), modified)
+            merged_traj.f_consolidate().result()
+            self.assertEqual(self.count_external_links(self.filenames[0]), 0)
+            os.remove(self.filenames[1])
+
+            merged_traj.f_load(
+                load_parameters=pypetconstants.OVERWRITE_DATA,
+                load_derived_parameters=pypetconstants.OVERWRITE_DATA,
+                load_results=pypetconstants.OVERWRITE_DATA,
+                load_other_data=pypetconstants.OVERWRITE_DATA,
+            )
+            self.compare_trajectories(merged_traj, self.trajs[2])
+
+    @staticmethod
+    def count_external_links(filename):
+        with pt.open_file(filename, mode="r") as hdf5file:
+            return sum(isinstance(node, pt.link.ExternalLink) for node in hdf5file.walk_nodes("/"))
+
     def merge_basic_only_adding_more_trials_with_backup(self, copy_nodes):
 
         self.envs = []
@@ -804,6 +860,58 @@ class TestConsecutiveMerges(TrajectoryComparator):
         self.assertEqual(len(merge_traj), total_len)
         self.check_if_z_is_correct(merge_traj)
 
+    def test_merge_all_in_folder_with_readers(self):
+
+        self.filename = make_temp_dir(
+            os.path.join("experiments", "tests", "HDF5", "readers", "test.hdf5")
+        )
+
+        path, _ = os.path.split(self.filename)
+
+        ntrajs = 4
+        total_len = 0
+        for irun in range(ntrajs):
+            new_filename = os.path.join(path, f"test{irun}.hdf5")
+            self.envs.append(self._make_env(irun, filename=new_filename))
+            self.trajs.append(self.envs[-1].v_traj)
+            self.trajs[-1].f_add_parameter("x", 0)
+            self.trajs[-1].f_add_parameter("y", 0)
+            self.explore(self.trajs[-1])
+            total_len += len(self.trajs[-1])
+
+        for irun in range(ntrajs):
+            self.envs[irun].f_run(multiply)
+
+        merge_traj = merge_all_in_folder(path, backup=False, nworkers=2)
+        merge_traj.f_load(load_data=2)
+
+        self.assertEqual(len(merge_traj), total_len)
+        self.check_if_z_is_correct(merge_traj)
+
+    def test_merge_many_from_generator(self):
+
+        ntrajs = 4
+        for irun in range(ntrajs):
+            self.envs.append(self._make_env(irun))
+            self.trajs.append(self.envs[-1].v_traj)
+            self.trajs[-1].f_add_parameter("x", 0)
+            self.trajs[-1].f_add_parameter("y", 0)
+            self.explore(self.trajs[-1])
+
+        for irun in range(ntrajs):
+            self.envs[irun].f_run(multiply)
+
+        merge_traj = self.trajs[0]
+
+        total_len = 0
+        for traj in self.trajs:
+            total_len += len(traj)
+        merge_traj.f_merge_many(traj for traj in self.trajs[1:])
+
+        merge_traj.f_load(load_data=2)
+        self.assertEqual(len(merge_traj), total_len)
+        self.check_if_z_is_correct(merge_traj)
+
     def test_merge_many(self):
 
         ntrajs = 4
@@ -81,6 +81,38 @@ def postproc_with_iter_args(traj, results, idx):
         return {}, ([7, 8],), {"w": [9, 10]}
 
 
+def stream_postproc(traj, result, idx):
+    assert idx == 42
+    run_idx, z = result
+    x = traj.f_get("x").f_get_range()[run_idx]
+    y = traj.f_get("y").f_get_range()[run_idx]
+    assert z == x * y + 22
+    if run_idx == 1:
+        return {"x": [1, 2], "y": [1, 2]}
+    if run_idx == 4:
+        traj.f_expand({"x": [2, 3], "y": [0, 1]})
+
+
+class BatchSampler:
+    """Proposes batches of two points and keeps two batches in flight"""
+
+    def __init__(self, nbatches):
+        self.nbatches = nbatches
+        self.asked = 0
+        self.in_flight = 0
+        self.told = []
+
+    def ask(self):
+        if self.asked < self.nbatches and self.in_flight < 2:
+            self.asked += 1
+            self.in_flight += 1
+            return {"x": [self.asked, self.asked], "y": [1, 2]}
+
+    def tell(self, results):
+        self.in_flight -= 1
+        self.told.append(results)
+
+
 def mypipelin_with_iter_args(traj):
 
     traj.f_add_parameter("x", 1, comment="1st")
@@ -219,6 +251,101 @@ class TestPostProc(TrajectoryComparator):
         env1.f_disable_logging()
         env2.f_disable_logging()
 
+    def test_streaming_postprocessing(self):
+
+        filename = "testpostprocstream.hdf5"
+        env1 = self.make_environment(filename, "k1")[0]
+        env2 = self.make_environment(filename, "k2", log=False)[0]
+
+        traj1 = env1.v_trajectory
+        traj2 = env2.v_trajectory
+
+        for traj in (traj1, traj2):
+            traj.f_add_parameter("x", 1, comment="1st")
+            traj.f_add_parameter("y", 1, comment="2nd")
+
+        exp_dict2 = {"x": [1, 2, 3, 4, 1, 2, 2, 3], "y": [1, 2, 3, 4, 1, 2, 0, 1]}
+
+        traj2.f_explore(exp_dict2)
+
+        exp_dict1 = {"x": [1, 2, 3, 4], "y": [1, 2, 3, 4]}
+
+        traj1.f_explore(exp_dict1)
+
+        env2.f_run(Multiply(), 22)
+
+        env1.f_add_streaming_postprocessing(stream_postproc, 42)
+
+        res1 = env1.f_run(Multiply(), 22)
+
+        self.assertEqual(len(res1), 8)
+        self.are_results_in_order(res1)
+
+        traj1.f_load(load_data=2)
+        traj2.f_load(load_data=2)
+
+        self.compare_trajectories(traj1, traj2)
+
+        env1.f_disable_logging()
+        env2.f_disable_logging()
+
+    def test_sampler(self):
+
+        filename = "testpostprocsampler.hdf5"
+        env1 = self.make_environment(filename, "k1")[0]
+        env2 = self.make_environment(filename, "k2", log=False)[0]
+
+        traj1 = env1.v_trajectory
+        traj2 = env2.v_trajectory
+
+        for traj in (traj1, traj2):
+            traj.f_add_parameter("x", 1, comment="1st")
+            traj.f_add_parameter("y", 1, comment="2nd")
+
+        traj2.f_explore({"x": [1, 1, 2, 2, 3, 3, 4, 4], "y": [1, 2, 1, 2, 1, 2, 1, 2]})
+
+        env2.f_run(Multiply(), 22)
+
+        sampler = BatchSampler(4)
+        res1 = env1.f_run_sampler(sampler, Multiply(), 22)
+
+        self.assertEqual(len(res1), 8)
+        self.are_results_in_order(res1)
+        self.assertEqual(len(sampler.told), 4)
+        for results in sampler.told:
+            self.assertEqual(len(results), 2)
+            (idx1, z1), (idx2, z2) = results
+            self.assertEqual(idx1 + 1, idx2)
+            self.assertEqual(z2 - z1, idx1 // 2 + 1)
+
+        traj1.f_load(load_data=2)
+        traj2.f_load(load_data=2)
+
+        self.compare_trajectories(traj1, traj2)
+
+        env1.f_disable_logging()
+        env2.f_disable_logging()
+
+    def test_sampler_with_explored_trajectory(self):
+
+        filename = "testpostprocsamplerexplored.hdf5"
+        env = self.make_environment(filename, "k1")[0]
+        traj = env.v_trajectory
+        traj.f_add_parameter("x", 1, comment="1st")
+        traj.f_add_parameter("y", 1, comment="2nd")
+        traj.f_explore({"x": [1, 2, 3], "y": [1, 1, 1]})
+
+        sampler = BatchSampler(2)
+        res = env.f_run_sampler(sampler, Multiply(), 22)
+
+        self.assertEqual(len(res), 7)
+        self.are_results_in_order(res)
+        # Only the runs proposed by the sampler are told
+        told_indices = [[idx for idx, _ in results] for results in sampler.told]
+        self.assertEqual(told_indices, [[3, 4], [5, 6]])
+
+        env.f_disable_logging()
+
     def test_pipeline(self):
 
         filename = "testpostprocpipe.hdf5"
@@ -294,6 +421,19 @@ class TestMPPostProc(TestPostProc):
         self.env_kwargs = {"multiproc": True, "ncores": 3, "add_time": True}
 
 
+class TestMPPoolPostProc(TestPostProc):
+    tags = "integration", "hdf5", "environment", "postproc", "multiproc", "pool"
+
+    def setUp(self):
+        self.env_kwargs = {
+            "multiproc": True,
+            "ncores": 2,
+            "use_pool": True,
+            "freeze_input": False,
+            "add_time": True,
+        }
+
+
 class TestMPImmediatePostProcLock(TestPostProc):
     tags = "integration", "hdf5", "environment", "postproc", "multiproc", "lock"
 
@@ -10,7 +10,7 @@ except ImportError:
 import logging
 
 from pypet import pypetconstants
-from pypet.environment import Environment
+from pypet.environment import RESUME_JOURNAL, Environment
 from pypet.parameter import Parameter
 from pypet.tests.testutils.data import (
     TrajectoryComparator,
@@ -28,6 +28,7 @@ from pypet.tests.testutils.ioutils import (
 )
 from pypet.trajectory import Trajectory
 from pypet.utils.explore import cartesian_product
+from pypet.utils.resumejournal import ResumeJournal
 
 
 class CustomParameter(Parameter):
@@ -63,7 +64,9 @@ class ContinueTest(TrajectoryComparator):
         simple_kwarg = 13.0
         env.f_run(simple_calculations, simple_arg, simple_kwarg=simple_kwarg)
 
-    def make_environment(self, idx, filename, continuable=True, delete_continue=False):
+    def make_environment(
+        self, idx, filename, continuable=True, delete_continue=False, resume_snapshot=True
+    ):
 
         # self.filename = '../../experiments/tests/HDF5/test.hdf5'
         self.logfolder = make_temp_dir(os.path.join("experiments", "tests", "Log"))
@@ -79,6 +82,7 @@ class ContinueTest(TrajectoryComparator):
             continuable=continuable,
             continue_folder=self.cnt_folder,
             delete_continue=delete_continue,
+            resume_snapshot=resume_snapshot,
             large_overview_tables=True,
         )
 
@@ -110,53 +114,25 @@ class ContinueTest(TrajectoryComparator):
 
     def _remove_nresults(self, traj, nresults, continue_folder):
 
-        result_tuple_list = []
-
-        n = 0
-        for filename in os.listdir(continue_folder):
-            _, ext = os.path.splitext(filename)
-
-            if ext != ".rcnt":
-                continue
+        journal = ResumeJournal(os.path.join(continue_folder, RESUME_JOURNAL))
 
-            n += 1
+        environment_record = None
+        result_records = []
+        for data in journal.replay():
+            kind, record = dill.loads(data)
+            if kind == "environment":
+                environment_record = data
+            else:
+                result_records.append((record, data))
 
-            cnt_file = open(os.path.join(continue_folder, filename), "rb")
-            try:
-                result = dill.load(cnt_file)
-                cnt_file.close()
-                result_tuple_list.append(result)
-            except Exception:
-                # delete broken files
-                logging.getLogger().exception(
-                    "Could not open continue snapshot file `%s`." % filename
-                )
-                cnt_file.close()
-                os.remove(filename)
+        self.assertIsNotNone(environment_record)
+        self.assertGreaterEqual(len(result_records), nresults)
 
-        self.assertGreaterEqual(n, nresults)
-
-        result_tuple_list = sorted(result_tuple_list, key=lambda x: x[0])
-        timestamp_list = [x[1]["finish_timestamp"] for x in result_tuple_list]
-        timestamp_list = timestamp_list[-nresults:]
-
-        for timestamp in timestamp_list:
-            filename = os.path.join(
-                continue_folder, f"result_{repr(timestamp).replace('.', '_')}.rcnt"
-            )
-            os.remove(filename)
-
-        result_tuple_list = []
-        for filename in os.listdir(continue_folder):
-            _, ext = os.path.splitext(filename)
-
-            if ext != ".rcnt":
-                continue
-
-            cnt_file = open(os.path.join(continue_folder, filename), "rb")
-            result = dill.load(cnt_file)
-            cnt_file.close()
-            result_tuple_list.append(result)
+        # Remove the last finished results from the journal
+        result_records = sorted(result_records, key=lambda x: x[0][1]["finish_timestamp"])
+        result_records = result_records[:-nresults]
+        journal.compact([environment_record] + [data for _, data in result_records])
+        result_tuple_list = [record for record, _ in result_records]
 
         name_set = set([x[1]["name"] for x in result_tuple_list])
         removed = 0
@@ -218,6 +194,61 @@ class ContinueTest(TrajectoryComparator):
 
         self.assertEqual(len(self.trajs[1]), len(results))
 
+    def test_continueing_without_snapshot(self):
+        self.filenames = [make_temp_dir("test_continueing_without_snapshot.hdf5"), 0]
+
+        self.envs = []
+        self.trajs = []
+
+        for irun, filename in enumerate(self.filenames):
+            if isinstance(filename, int):
+                filename = self.filenames[filename]
+
+            self.make_environment(irun, filename, resume_snapshot=False)
+
+        self.param_dict = {}
+        create_param_dict(self.param_dict)
+
+        for irun in range(len(self.filenames)):
+            add_params(self.trajs[irun], self.param_dict)
+
+        self.explore(self.trajs[0])
+        self.explore(self.trajs[1])
+
+        for irun in range(len(self.filenames)):
+            self.make_run(self.envs[irun])
+
+        traj_name = self.trajs[1].v_name
+        continue_folder = os.path.join(self.cnt_folder, self.trajs[1].v_name)
+
+        journal = ResumeJournal(os.path.join(continue_folder, RESUME_JOURNAL))
+        kind, resume_dict = dill.loads(next(journal.replay()))
+        self.assertEqual(kind, "environment")
+        self.assertNotIn("trajectory", resume_dict)
+
+        # Only the `runs` overview table of the HDF5 file tells that runs are missing
+        traj = self.envs[1].v_trajectory
+        for idx in range(len(traj) - 3, len(traj)):
+            traj.f_get_run_information(idx, copy=False)["completed"] = 0
+            traj._updated_run_information.add(idx)
+        traj.f_store(only_init=True)
+
+        self.envs[1].v_current_idx = 0
+        results = self.envs[1].resume(trajectory_name=traj_name)
+        self.trajs[1] = self.envs[1].v_trajectory
+
+        for irun in range(len(self.filenames)):
+            self.trajs[irun].f_load(
+                load_parameters=pypetconstants.OVERWRITE_DATA,
+                load_derived_parameters=pypetconstants.OVERWRITE_DATA,
+                load_results=pypetconstants.OVERWRITE_DATA,
+                load_other_data=pypetconstants.OVERWRITE_DATA,
+            )
+
+        self.compare_trajectories(self.trajs[0], self.trajs[1])
+        self.assertEqual(len(self.trajs[1]), len(results))
+        self.assertEqual(sorted(x[0] for x in results), list(range(len(self.trajs[1]))))
+
     def test_continueing_remove_completed(self):
         self.filenames = [make_temp_dir("test_continueing_remove_completed.hdf5")]
 
@@ -358,7 +389,14 @@ class ContinueMPTest(ContinueTest):
         env.f_run(multiply)
 
     def make_environment(
-        self, idx, filename, continuable=True, delete_continue=False, add_time=True, trajectory=None
+        self,
+        idx,
+        filename,
+        continuable=True,
+        delete_continue=False,
+        add_time=True,
+        trajectory=None,
+        resume_snapshot=True,
     ):
         # self.filename = '../../experiments/tests/HDF5/test.hdf5'
         self.logfolder = make_temp_dir(os.path.join("experiments", "tests", "Log"))
@@ -377,6 +415,7 @@ class ContinueMPTest(ContinueTest):
             continuable=continuable,
             continue_folder=self.cnt_folder,
             delete_continue=delete_continue,
+            resume_snapshot=resume_snapshot,
             multiproc=True,
             purge_duplicate_comments=False,
             ncores=2,
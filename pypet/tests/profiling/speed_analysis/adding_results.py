@@ -0,0 +1,37 @@
+"""Micro-benchmark measuring how many results per second can be added to a trajectory.
+
+Results are added below run groups, i.e. to `results.runs.run_XXXXXXXX`,
+the way single runs would add their data. The number of results can be passed
+as first command line argument (default 1,000,000), the number of results per
+run group as second (default 10).
+
+"""
+
+import sys
+import time
+
+from pypet import Trajectory
+
+
+def add_results(traj, nresults, results_per_run):
+    nruns = nresults // results_per_run
+    for irun in range(nruns):
+        run_name = traj.f_wildcard("$", irun)
+        for jres in range(results_per_run):
+            traj.f_add_result(f"runs.{run_name}.group.z{jres}", irun, comment="A result")
+    return nruns * results_per_run
+
+
+def main():
+    nresults = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    results_per_run = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    traj = Trajectory("adding", add_time=False)
+    start = time.time()
+    added = add_results(traj, nresults, results_per_run)
+    total = time.time() - start
+    print(f"Added {added} results in {total:.2f}s, {added / total:.0f} adds/sec")
+
+
+if __name__ == "__main__":
+    main()
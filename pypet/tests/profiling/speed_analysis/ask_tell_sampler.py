@@ -0,0 +1,105 @@
+"""Benchmark comparing a generational loop with the ask/tell sampler of the environment.
+
+A trivial fitness function is evaluated for generations of individuals without storing
+data during the runs. The loop expands the trajectory and calls `run` for every
+generation, like example 19b. The sampler proposes the generations via
+`run_sampler` and keeps two of them in flight.
+The numbers of generations can be passed as command line arguments.
+
+"""
+
+import os
+import random
+import shutil
+import sys
+import time
+
+from pypet import Environment
+
+POPSIZE = 100
+
+
+def fitness(traj):
+    return traj.x * traj.y
+
+
+def make_generation():
+    return {
+        "x": [random.random() for _ in range(POPSIZE)],
+        "y": [random.random() for _ in range(POPSIZE)],
+    }
+
+
+class GenerationSampler:
+    def __init__(self, ngen):
+        self.ngen = ngen
+        self.generation = 0
+        self.in_flight = 0
+        self.best = 0.0
+
+    def ask(self):
+        if self.in_flight < 2 and self.generation < self.ngen:
+            self.generation += 1
+            self.in_flight += 1
+            return make_generation()
+
+    def tell(self, results):
+        self.in_flight -= 1
+        self.best = max(self.best, max(value for _, value in results))
+
+
+def make_environment(folder):
+    env = Environment(
+        trajectory="sampling",
+        filename=os.path.join(folder, "sampling.hdf5"),
+        add_time=False,
+        automatic_storing=False,
+        log_config=None,
+        report_progress=False,
+    )
+    env.traj.f_add_parameter("x", 0.0)
+    env.traj.f_add_parameter("y", 0.0)
+    return env
+
+
+def get_loop_runtime(ngen, folder):
+    env = make_environment(folder)
+    traj = env.traj
+    start = time.time()
+    for _ in range(ngen):
+        traj.f_expand(make_generation())
+        results = env.run(fitness)
+        max(value for _, value in results[-POPSIZE:])
+    total = time.time() - start
+    env.disable_logging()
+    return total
+
+
+def get_sampler_runtime(ngen, folder):
+    env = make_environment(folder)
+    start = time.time()
+    results = env.run_sampler(GenerationSampler(ngen), fitness)
+    total = time.time() - start
+    env.disable_logging()
+    assert len(results) == ngen * POPSIZE
+    return total
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [10, 50]
+    folder = os.path.join(os.getcwd(), "tmp", "ask_tell_sampler")
+    for ngen in sizes:
+        shutil.rmtree(folder, ignore_errors=True)
+        total = get_loop_runtime(ngen, folder)
+        print(f"{ngen} generations with a loop over `run`: {total:.2f}s")
+        shutil.rmtree(folder, ignore_errors=True)
+        total = get_sampler_runtime(ngen, folder)
+        print(f"{ngen} generations with `run_sampler`: {total:.2f}s")
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
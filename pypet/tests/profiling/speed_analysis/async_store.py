@@ -0,0 +1,67 @@
+"""Benchmark comparing synchronous and asynchronous storage of items during single runs.
+
+Every run alternates between computing and storing an array, so asynchronous
+storage can overlap writing with the next computation. The number of runs and the
+array size in MB can be passed as first and second command line argument.
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from pypet import Environment
+
+
+def job(traj, use_async):
+    for irun in range(5):
+        data = np.random.rand(traj.size // 8)
+        for _ in range(10):
+            data = np.sqrt(data + 1.0)
+        traj.f_add_result(f"runs.$.z{irun}", data, comment="An array")
+        if use_async:
+            traj.f_store_item_async(f"runs.$.z{irun}")
+        else:
+            traj.f_store_item(f"runs.$.z{irun}")
+
+
+def get_runtime(wrap_mode, use_async, nruns, size):
+    filename = os.path.join("tmp", "hdf5", "async_store.hdf5")
+
+    with Environment(
+        filename=filename,
+        log_levels=50,
+        report_progress=False,
+        overwrite_file=True,
+        log_stdout=False,
+        multiproc=True,
+        ncores=2,
+        use_pool=True,
+        wrap_mode=wrap_mode,
+    ) as env:
+        traj = env.v_traj
+        traj.f_add_parameter("size", size)
+        traj.f_add_parameter("x", 0)
+        traj.f_explore({"x": list(range(nruns))})
+
+        start = time.time()
+        env.f_run(job, use_async)
+        total = time.time() - start
+
+    os.remove(filename)
+    return total
+
+
+def main():
+    nruns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size = int(float(sys.argv[2]) * 2**20) if len(sys.argv) > 2 else 8 * 2**20
+    for wrap_mode in ("LOCK", "QUEUE"):
+        for use_async in (False, True):
+            total = get_runtime(wrap_mode, use_async, nruns, size)
+            print(f"{wrap_mode} with async={use_async}: {total:.2f}s, {nruns / total:.1f} runs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark measuring the time to build and analyse large exploration grids.
+
+A cartesian product of three parameters, two of them linked, is built with
+`cartesian_product` once from python lists and once from numpy arrays. Afterwards the
+unique points of the product of the two numpy ranges repeated twice are searched with
+`find_unique_points`. The numbers of values per dimension can be passed as command
+line arguments, the grids contain their third power of points.
+
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from pypet import Parameter, cartesian_product, find_unique_points
+
+
+def get_runtimes(nvalues):
+    lists = {
+        "x": list(range(nvalues)),
+        "y": [float(x) for x in range(nvalues**2)],
+        "z": [float(x) for x in range(nvalues**2)],
+    }
+    start = time.time()
+    cartesian_product(lists, ("x", ("y", "z")))
+    list_time = time.time() - start
+
+    arrays = {key: np.array(values) for key, values in lists.items()}
+    start = time.time()
+    grid = cartesian_product(arrays, ("x", ("y", "z")), as_arrays=True)
+    array_time = time.time() - start
+
+    params = []
+    for key in ("x", "y"):
+        param = Parameter(key, grid[key][0])
+        param._explore(np.concatenate([grid[key], grid[key]]))
+        params.append(param)
+    start = time.time()
+    unique_elements = find_unique_points(params, lazy=True)
+    unique_time = time.time() - start
+    assert len(unique_elements) == nvalues**3
+    return list_time, array_time, unique_time
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [50, 100]
+    for nvalues in sizes:
+        list_time, array_time, unique_time = get_runtimes(nvalues)
+        print(
+            f"{nvalues**3} points: cartesian product of lists {list_time:.2f}s, "
+            f"of arrays {array_time:.2f}s, finding unique points {unique_time:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
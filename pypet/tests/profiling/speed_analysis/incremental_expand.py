@@ -0,0 +1,56 @@
+"""Benchmark measuring the time to repeatedly expand a trajectory.
+
+A trajectory is expanded by 1000 runs at a time, either with python lists of floats or
+with numpy arrays of ``numpy.float64`` values. The total time and the time of the first
+and the last tenth of the expansions are reported, which should be similar since the
+cost of an expansion only depends on the number of added runs.
+The numbers of expansions can be passed as command line arguments.
+
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from pypet import Trajectory
+
+RUNS = 1000
+
+
+def get_runtime(nexpansions, use_numpy):
+    traj = Trajectory("expanding", add_time=False)
+    if use_numpy:
+        traj.f_add_parameter("x", np.float64(0.0))
+        make_range = lambda value: np.full(RUNS, value)
+    else:
+        traj.f_add_parameter("x", 0.0)
+        make_range = lambda value: [value] * RUNS
+    traj.f_explore({"x": make_range(0.0)})
+    times = []
+    for irun in range(nexpansions):
+        start = time.time()
+        traj.f_expand({"x": make_range(float(irun))})
+        times.append(time.time() - start)
+    assert len(traj) == (nexpansions + 1) * RUNS
+    tenth = max(nexpansions // 10, 1)
+    return sum(times), sum(times[:tenth]), sum(times[-tenth:])
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [100, 1000]
+    for nexpansions in sizes:
+        for use_numpy in (False, True):
+            total, first, last = get_runtime(nexpansions, use_numpy)
+            kind = "numpy arrays" if use_numpy else "lists"
+            print(
+                f"{nexpansions} expansions with {kind}: {total:.2f}s, "
+                f"first tenth {first:.2f}s, last tenth {last:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
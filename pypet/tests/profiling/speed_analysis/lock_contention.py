@@ -0,0 +1,85 @@
+"""Benchmark measuring lock contention of concurrent loads in LOCK and NETLOCK wrapping.
+
+Several processes load data via a `LockWrapper` around a storage service that
+simulates reading from disk by sleeping. Loads with an exclusive lock are
+serialized, whereas loads with a `ReadWriteLock` or `LockerClient` acquired in shared
+mode can overlap. The number of processes and loads per process can be passed
+as first and second command line argument.
+
+"""
+
+import multiprocessing as mp
+import sys
+import time
+
+from pypet.tests.testutils.ioutils import get_random_port_url
+from pypet.utils.mpwrappers import LockerClient, LockerServer, LockWrapper, ReadWriteLock
+
+LOAD_TIME = 0.01
+
+
+class SleepingStorageService:
+    """Storage service that takes some time to load data"""
+
+    def __init__(self):
+        self.is_open = False
+
+    def load(self, msg, stuff_to_load, *args, **kwargs):
+        time.sleep(LOAD_TIME)
+
+
+class ExclusiveLock:
+    """Hides shared acquisition of a lock, so every load locks exclusively"""
+
+    def __init__(self, lock):
+        self.lock = lock
+
+    def acquire(self):
+        return self.lock.acquire()
+
+    def release(self):
+        self.lock.release()
+
+
+def load_items(wrapper, nloads):
+    for iload in range(nloads):
+        wrapper.load("LEAF", iload)
+
+
+def get_runtime(lock, nprocs, nloads):
+    wrapper = LockWrapper(SleepingStorageService(), lock)
+    processes = [mp.Process(target=load_items, args=(wrapper, nloads)) for _ in range(nprocs)]
+    start = time.time()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return time.time() - start
+
+
+def main():
+    nprocs = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    nloads = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    url = get_random_port_url()
+    server = mp.Process(target=LockerServer(url).run)
+    server.start()
+    locks = {
+        "Exclusive Lock": ExclusiveLock(mp.Lock()),
+        "ReadWriteLock": ReadWriteLock(),
+        "Exclusive LockerClient": ExclusiveLock(LockerClient(url)),
+        "Shared LockerClient": LockerClient(url),
+    }
+    for name, lock in locks.items():
+        total = get_runtime(lock, nprocs, nloads)
+        print(
+            f"{name} with {nprocs} processes: {total:.2f}s, {nprocs * nloads / total:.0f} loads/sec"
+        )
+    done_client = LockerClient(url)
+    done_client.send_done()
+    done_client.finalize()
+    server.join()
+
+
+if __name__ == "__main__":
+    main()
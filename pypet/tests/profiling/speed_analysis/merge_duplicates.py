@@ -0,0 +1,56 @@
+"""Benchmark measuring duplicate detection when merging trajectories.
+
+Two trajectories with two explored parameters share half of their parameter space points.
+Duplicates are found by hashing the points, or, for a parameter type without a hash,
+by comparing all pairs of points. The numbers of runs can be passed as command line arguments.
+
+"""
+
+import sys
+import time
+
+from pypet import Parameter, Trajectory
+
+
+class UnhashableParameter(Parameter):
+    """Parameter with custom equality but without a matching hash"""
+
+    def _equal_values(self, val1, val2):
+        return super()._equal_values(val1, val2)
+
+
+def make_trajectory(name, nruns, offset, param_type):
+    traj = Trajectory(name, add_time=False)
+    traj.f_add_parameter(param_type, "x", 0)
+    traj.f_add_parameter(param_type, "y", 0.0)
+    xs = list(range(offset, offset + nruns))
+    traj.f_explore({"x": xs, "y": [x / 10.0 for x in xs]})
+    traj._make_reversed_wildcards()
+    return traj
+
+
+def get_runtime(nruns, param_type):
+    traj1 = make_trajectory("traj1", nruns, 0, param_type)
+    traj2 = make_trajectory("traj2", nruns, nruns // 2, param_type)
+    start = time.time()
+    used_runs, _ = traj1._merge_parameters(traj2, remove_duplicates=True)
+    total = time.time() - start
+    assert len(used_runs) == nruns - nruns // 2
+    return total
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [100, 1000, 10000, 100000]
+    for nruns in sizes:
+        total = get_runtime(nruns, Parameter)
+        print(f"Hashing with {nruns} runs each: {total:.3f}s")
+        if nruns <= 1000:
+            total = get_runtime(nruns, UnhashableParameter)
+            print(f"Comparing all pairs with {nruns} runs each: {total:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
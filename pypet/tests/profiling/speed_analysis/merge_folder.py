@@ -0,0 +1,73 @@
+"""Benchmark measuring the merging of all trajectories in a folder.
+
+Several trajectories with results are stored in separate files and merged
+via `merge_all_in_folder`. Reported are the runtime, the peak memory allocated by the
+merging process, which is dominated by the IO buffers of PyTables, and the memory
+still allocated after merging. Trajectories are loaded once by the merging process
+and once by a pool of reader processes.
+The number of files and runs per file can be passed as first and second command line argument.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pypet import Environment, merge_all_in_folder
+
+
+def multiply(traj):
+    traj.f_add_result("z", traj.x * traj.y, comment="Product of x and y")
+
+
+def make_folder(folder, nfiles, nruns):
+    for ifile in range(nfiles):
+        env = Environment(
+            trajectory=f"traj{ifile}",
+            filename=os.path.join(folder, f"traj{ifile:04d}.hdf5"),
+            log_config=None,
+            add_time=False,
+        )
+        traj = env.v_traj
+        traj.f_add_parameter("x", 0)
+        traj.f_add_parameter("y", 0)
+        traj.f_explore(
+            {"x": list(range(ifile * nruns, (ifile + 1) * nruns)), "y": list(range(nruns))}
+        )
+        env.f_run(multiply)
+        env.f_disable_logging()
+
+
+def get_runtime(nfiles, nruns, nworkers):
+    folder = tempfile.mkdtemp()
+    try:
+        make_folder(folder, nfiles, nruns)
+        tracemalloc.start()
+        start = time.time()
+        merged = merge_all_in_folder(folder, backup=False, nworkers=nworkers)
+        total = time.time() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(merged) == nfiles * nruns
+    finally:
+        shutil.rmtree(folder)
+    return total, peak, current
+
+
+def main():
+    nfiles = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    nruns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    for nworkers in (None, 2):
+        total, peak, current = get_runtime(nfiles, nruns, nworkers)
+        print(
+            f"Merging {nfiles} files with {nruns} runs each and {nworkers} reader processes: "
+            f"{total:.2f}s, peak memory {peak / 2**20:.1f} MiB, "
+            f"after merging {current / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark comparing merging by copying data with merging by external links.
+
+Two trajectories with large array results are stored in separate files.
+The second one is merged into the first one, once by copying all results
+and once with `link_data=True`. Reported are the runtime of the merge and the size
+of the file of the merged trajectory, as well as the runtime of `f_consolidate`.
+The number of runs and the size of the result array of a single run in MiB
+can be passed as first and second command line argument.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from pypet import Environment
+
+
+def store_array(traj, nbytes):
+    traj.f_add_result("data", np.random.rand(nbytes // 8), comment="Random data")
+
+
+def make_trajectory(folder, idx, nruns, nbytes):
+    env = Environment(
+        trajectory=f"traj{idx}",
+        filename=os.path.join(folder, f"traj{idx}.hdf5"),
+        log_config=None,
+        add_time=False,
+    )
+    traj = env.v_traj
+    traj.f_add_parameter("x", 0)
+    traj.f_explore({"x": list(range(idx * nruns, (idx + 1) * nruns))})
+    env.f_run(store_array, nbytes)
+    env.f_disable_logging()
+    return traj
+
+
+def merge(nruns, nbytes, link_data):
+    folder = tempfile.mkdtemp()
+    try:
+        traj = make_trajectory(folder, 0, nruns, nbytes)
+        other = make_trajectory(folder, 1, nruns, nbytes)
+        start = time.time()
+        traj.f_merge(other, backup=False, link_data=link_data)
+        total = time.time() - start
+        size = os.path.getsize(traj.v_storage_service.filename)
+        consolidate = None
+        if link_data:
+            start = time.time()
+            traj.f_consolidate().result()
+            consolidate = time.time() - start
+    finally:
+        shutil.rmtree(folder)
+    return total, size, consolidate
+
+
+def main():
+    nruns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    nbytes = int(float(sys.argv[2]) * 2**20) if len(sys.argv) > 2 else 10 * 2**20
+    for link_data in (False, True):
+        total, size, consolidate = merge(nruns, nbytes, link_data)
+        print(
+            f"Merging {nruns} runs with link_data={link_data}: {total:.2f}s, "
+            f"merged file {size / 2**20:.1f} MiB"
+        )
+        if consolidate is not None:
+            print(f"Consolidating: {consolidate:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
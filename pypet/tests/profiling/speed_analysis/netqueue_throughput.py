@@ -0,0 +1,63 @@
+"""Benchmark measuring the throughput of the NETQUEUE transport on the local machine.
+
+Several client processes send small storage requests to a `QueuingServer`
+that hands them over to a storage service doing nothing.
+The number of clients and items per client can be passed as first and
+second command line argument.
+
+"""
+
+import multiprocessing as mp
+import sys
+import time
+
+from pypet.tests.testutils.ioutils import get_random_port_url
+from pypet.utils.mpwrappers import QueueStorageServiceSender, QueuingClient, QueuingServer
+
+
+class NullStorageService:
+    """Storage service that throws all data away"""
+
+    def __init__(self):
+        self.is_open = False
+
+    def store(self, msg, stuff_to_store, *args, **kwargs):
+        pass
+
+
+def send_items(url, nitems):
+    client = QueuingClient(url)
+    sender = QueueStorageServiceSender(client)
+    for irun in range(nitems):
+        sender.store("LEAF", irun, trajectory_name="throughput")
+    client.finalize()
+
+
+def main():
+    nclients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    nitems = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    url = get_random_port_url()
+    server = mp.Process(target=QueuingServer(url, NullStorageService(), 100, None).run)
+    server.start()
+
+    start = time.time()
+    clients = [mp.Process(target=send_items, args=(url, nitems)) for _ in range(nclients)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    total = time.time() - start
+
+    done_client = QueuingClient(url)
+    done_client.send_done()
+    done_client.finalize()
+    server.join()
+    print(
+        f"Sent {nclients * nitems} items from {nclients} clients in {total:.2f}s, "
+        f"{nclients * nitems / total:.0f} items/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark measuring the memory used for values returned by the run function.
+
+Every run returns an array of 100000 floats. The results are either kept in a list or
+spilled to disk beyond a memory limit of 10 MB (``result_memory_limit``). The peak memory
+allocated during the runs is traced and the time to iterate over all results is reported.
+The numbers of runs can be passed as command line arguments.
+
+"""
+
+import os
+import shutil
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from pypet import Environment
+
+
+def make_array(traj):
+    return np.ones(100000) * traj.x
+
+
+def get_usage(nruns, folder, result_memory_limit):
+    env = Environment(
+        trajectory="spilling",
+        filename=os.path.join(folder, "spilling.hdf5"),
+        add_time=False,
+        result_memory_limit=result_memory_limit,
+        log_config=None,
+        report_progress=False,
+    )
+    traj = env.traj
+    traj.f_add_parameter("x", 0)
+    traj.f_explore({"x": list(range(nruns))})
+    tracemalloc.start()
+    start = time.time()
+    results = env.run(make_array)
+    run_time = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    env.disable_logging()
+    start = time.time()
+    for idx, value in results:
+        assert value[0] == idx
+    iter_time = time.time() - start
+    return peak / 1e6, run_time, iter_time
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [100, 1000]
+    folder = os.path.join(os.getcwd(), "tmp", "result_spilling")
+    for nruns in sizes:
+        for result_memory_limit in (None, 10 * 1024**2):
+            shutil.rmtree(folder, ignore_errors=True)
+            peak, run_time, iter_time = get_usage(nruns, folder, result_memory_limit)
+            print(
+                f"{nruns} runs with result_memory_limit={result_memory_limit}: "
+                f"peak {peak:.1f}MB, running {run_time:.2f}s, iterating {iter_time:.2f}s"
+            )
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
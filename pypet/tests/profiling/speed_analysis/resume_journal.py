@@ -0,0 +1,93 @@
+"""Benchmark measuring the overhead of resumable experiments.
+
+A trivial run function is executed with `resumable=True`, so almost all of the time
+is spent on storing the results and writing the resume data.
+Afterwards the finished experiment is resumed, which replays all resume data.
+The trajectory carries a large array and a large pickled parameter and is either kept as
+a snapshot in the resume data or stored to and loaded from the HDF5 file
+(``resume_snapshot=False``). The startup time until the first run begins is reported, too.
+The numbers of runs can be passed as command line arguments.
+
+"""
+
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from pypet import Environment, PickleParameter
+
+first_run = []
+
+
+def square(traj):
+    if not first_run:
+        first_run.append(time.time())
+    return traj.x**2
+
+
+def get_runtimes(nruns, folder, resume_snapshot):
+    filename = os.path.join(folder, "resume.hdf5")
+    resume_folder = os.path.join(folder, "resume")
+    env = Environment(
+        trajectory="resume",
+        filename=filename,
+        add_time=False,
+        resumable=True,
+        resume_folder=resume_folder,
+        delete_resume=False,
+        resume_snapshot=resume_snapshot,
+        log_config=None,
+        report_progress=False,
+    )
+    traj = env.traj
+    traj.f_add_parameter("weights", np.random.rand(5000000))
+    traj.f_add_parameter(
+        PickleParameter, "table", [{"idx": idx, "name": str(idx)} for idx in range(200000)]
+    )
+    traj.f_add_parameter("x", 0)
+    traj.f_explore({"x": list(range(nruns))})
+    del first_run[:]
+    start = time.time()
+    env.run(square)
+    run_time = time.time() - start
+    startup_time = first_run[0] - start
+    env.disable_logging()
+
+    env = Environment(
+        filename=filename,
+        resumable=True,
+        delete_resume=False,
+        log_config=None,
+        report_progress=False,
+    )
+    start = time.time()
+    results = env.resume(trajectory_name="resume", resume_folder=resume_folder)
+    resume_time = time.time() - start
+    env.disable_logging()
+    assert len(results) == nruns
+    return startup_time, run_time, resume_time
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [100, 1000, 5000]
+    folder = os.path.join(os.getcwd(), "tmp", "resume_journal")
+    for nruns in sizes:
+        for resume_snapshot in (True, False):
+            shutil.rmtree(folder, ignore_errors=True)
+            startup_time, run_time, resume_time = get_runtimes(nruns, folder, resume_snapshot)
+            print(
+                f"{nruns} runs with resume_snapshot={resume_snapshot}: "
+                f"startup {startup_time:.2f}s, running {run_time:.2f}s, "
+                f"resuming {resume_time:.2f}s"
+            )
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
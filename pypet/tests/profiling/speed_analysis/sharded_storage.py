@@ -0,0 +1,61 @@
+"""Benchmark comparing LOCK, QUEUE, and SHARDED wrapping for many cores.
+
+Every run adds a couple of small arrays as results.
+The number of cores and the number of runs can be passed as first and second
+command line argument.
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from pypet import Environment
+
+
+def job(traj):
+    for irun in range(10):
+        traj.f_add_result(f"$.z{irun}", np.random.rand(1000), comment="A small array")
+
+
+def get_runtime(wrap_mode, ncores, nruns):
+    filename = os.path.join("tmp", "hdf5", "sharded_storage.hdf5")
+
+    with Environment(
+        filename=filename,
+        log_levels=50,
+        report_progress=False,
+        overwrite_file=True,
+        log_stdout=False,
+        multiproc=True,
+        ncores=ncores,
+        use_pool=True,
+        wrap_mode=wrap_mode,
+        purge_duplicate_comments=False,
+        summary_tables=False,
+        small_overview_tables=False,
+    ) as env:
+        traj = env.v_traj
+        traj.f_add_parameter("x", 0)
+        traj.f_explore({"x": list(range(nruns))})
+
+        start = time.time()
+        env.f_run(job)
+        total = time.time() - start
+
+    os.remove(filename)
+    return total
+
+
+def main():
+    ncores = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    nruns = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    for wrap_mode in ("LOCK", "QUEUE", "SHARDED"):
+        total = get_runtime(wrap_mode, ncores, nruns)
+        print(f"{wrap_mode} with {ncores} cores: {total:.2f}s, {nruns / total:.0f} runs/sec")
+
+
+if __name__ == "__main__":
+    main()
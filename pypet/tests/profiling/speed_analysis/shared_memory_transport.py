@@ -0,0 +1,67 @@
+"""Benchmark comparing QUEUE and PIPE wrapping with and without shared memory transport.
+
+Every run adds a single large numpy array (by default 100 MB) as a result.
+The size in MB and the number of runs can be passed as first and second
+command line argument.
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from pypet import Environment
+
+
+def job(traj):
+    traj.f_add_result("$.array", np.ones(traj.size // 8), comment="A large array")
+
+
+def get_runtime(wrap_mode, shared_memory_threshold, size, nruns):
+    filename = os.path.join("tmp", "hdf5", "shared_memory.hdf5")
+
+    with Environment(
+        filename=filename,
+        log_levels=50,
+        report_progress=False,
+        overwrite_file=True,
+        log_stdout=False,
+        multiproc=True,
+        ncores=2,
+        use_pool=True,
+        wrap_mode=wrap_mode,
+        shared_memory_threshold=shared_memory_threshold,
+        complevel=0,
+        purge_duplicate_comments=False,
+        summary_tables=False,
+        small_overview_tables=False,
+    ) as env:
+        traj = env.v_traj
+        traj.f_add_parameter("size", size)
+        traj.f_add_parameter("x", 0)
+        traj.f_explore({"x": list(range(nruns))})
+
+        start = time.time()
+        env.f_run(job)
+        total = time.time() - start
+
+    os.remove(filename)
+    return total
+
+
+def main():
+    size = int(float(sys.argv[1]) * 2**20) if len(sys.argv) > 1 else 100 * 2**20
+    nruns = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    for wrap_mode in ("QUEUE", "PIPE"):
+        for shared_memory_threshold in (None, 2**20):
+            total = get_runtime(wrap_mode, shared_memory_threshold, size, nruns)
+            print(
+                f"{wrap_mode} with shared memory threshold {shared_memory_threshold}: "
+                f"{total:.2f}s, {nruns * size / 2.0**20 / total:.0f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
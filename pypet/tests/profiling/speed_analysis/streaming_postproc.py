@@ -0,0 +1,80 @@
+"""Benchmark comparing generational and streaming post-processing.
+
+An adaptive search evaluates generations of candidates whose runs take different amounts
+of time. With normal or immediate post-processing, the next generation is added once
+all runs or all starts of the current generation are done, so cores idle in between.
+With streaming post-processing, every finished run adds a new candidate right away.
+The number of generations can be passed as command line arguments.
+
+"""
+
+import os
+import shutil
+import sys
+import time
+
+from pypet import Environment
+
+POPULATION = 8
+NCORES = 4
+
+
+def evaluate(traj):
+    # Runs of a generation take between 0.05 and 0.4 seconds
+    time.sleep(0.05 * (1 + traj.v_idx % POPULATION))
+    return traj.x
+
+
+def next_generation(traj, result_list, nruns):
+    if len(traj) < nruns:
+        return {"x": [len(traj) + idx for idx in range(POPULATION)]}
+
+
+def next_candidate(traj, result, nruns):
+    if len(traj) < nruns:
+        return {"x": [len(traj)]}
+
+
+def get_runtime(ngenerations, folder, mode):
+    nruns = ngenerations * POPULATION
+    env = Environment(
+        trajectory="adaptive",
+        filename=os.path.join(folder, "adaptive.hdf5"),
+        add_time=False,
+        multiproc=True,
+        ncores=NCORES,
+        immediate_postproc=mode == "immediate",
+        log_config=None,
+        report_progress=False,
+    )
+    traj = env.traj
+    traj.f_add_parameter("x", 0)
+    traj.f_explore({"x": list(range(POPULATION))})
+    if mode == "streaming":
+        env.add_streaming_postprocessing(next_candidate, nruns)
+    else:
+        env.add_postprocessing(next_generation, nruns)
+    start = time.time()
+    results = env.run(evaluate)
+    total = time.time() - start
+    env.disable_logging()
+    assert len(results) == nruns
+    return total
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [5, 20]
+    folder = os.path.join(os.getcwd(), "tmp", "streaming_postproc")
+    for ngenerations in sizes:
+        for mode in ("normal", "immediate", "streaming"):
+            shutil.rmtree(folder, ignore_errors=True)
+            total = get_runtime(ngenerations, folder, mode)
+            print(f"{ngenerations} generations with {mode} post-processing: {total:.2f}s")
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
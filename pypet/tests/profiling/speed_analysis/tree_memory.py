@@ -0,0 +1,41 @@
+"""Benchmark measuring the memory used by trajectory trees of different sizes.
+
+Results are added below run groups, i.e. to `results.runs.run_XXXXXXXX`, ten per run.
+The tree sizes (number of results) can be passed as command line arguments.
+
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from pypet import Trajectory
+
+
+def get_memory(nresults, results_per_run=10):
+    gc.collect()
+    tracemalloc.start()
+    traj = Trajectory("memory", add_time=False)
+    for irun in range(nresults // results_per_run):
+        run_name = traj.f_wildcard("$", irun)
+        for jres in range(results_per_run):
+            traj.f_add_result(f"runs.{run_name}.z{jres}", irun)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traj
+    return memory
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(x) for x in sys.argv[1:]]
+    else:
+        sizes = [1000, 10000, 100000, 1000000]
+    for size in sizes:
+        memory = get_memory(size)
+        print(f"{size} results: {memory / 2.0**20:.1f} MiB, {memory / size:.0f} bytes per result")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import logging
 import multiprocessing as mp
 import os
+import queue
 import random
+import threading
 import time
+from multiprocessing import shared_memory
 
 try:
     import scoop
@@ -14,6 +17,9 @@ try:
 except ImportError:
     zmq = None
 
+import numpy as np
+
+import pypet.pypetconstants as pypetconstants
 from pypet.pypetlogging import DisableAllLogging
 from pypet.tests.testutils.data import TrajectoryComparator
 from pypet.tests.testutils.ioutils import (
@@ -24,7 +30,22 @@ from pypet.tests.testutils.ioutils import (
     unittest,
 )
 from pypet.utils.helpful_functions import is_ipv6
-from pypet.utils.mpwrappers import LockerClient, LockerServer, TimeOutLockerServer
+from pypet.utils.mpwrappers import (
+    LockerClient,
+    LockerServer,
+    LockWrapper,
+    PipeStorageServiceSender,
+    PipeStorageServiceWriter,
+    QueueStorageServiceSender,
+    QueueStorageServiceWriter,
+    QueuingClient,
+    QueuingServer,
+    QueuingServerMessageListener,
+    ReadWriteLock,
+    StorageMetrics,
+    TimeOutLockerServer,
+)
+from pypet.utils.sharedmemory import dump_shared, load_shared
 
 
 class FaultyServer(LockerServer):
@@ -315,6 +336,56 @@ class TestNetLock(TrajectoryComparator):
         self.lock_process.join()
         lock.finalize()
 
+    def test_shared_lock(self):
+        url = get_random_port_url()
+        self.start_server(url)
+        ctx = zmq.Context()
+        sck = ctx.socket(zmq.REQ)
+        sck.ipv6 = is_ipv6(url)
+        sck.connect(url)
+
+        def request(msg, client_id):
+            sck.send_string(
+                msg
+                + LockerServer.DELIMITER
+                + "test"
+                + LockerServer.DELIMITER
+                + client_id
+                + LockerServer.DELIMITER
+                + "12344"
+            )
+            return sck.recv_string()
+
+        self.assertEqual(request(LockerServer.LOCK_SHARED, "reader1"), LockerServer.GO)
+        self.assertEqual(request(LockerServer.LOCK_SHARED, "reader2"), LockerServer.GO)
+        response = request(LockerServer.LOCK_SHARED, "reader1")
+        self.assertTrue(response.startswith(LockerServer.LOCK_ERROR))
+        response = request(LockerServer.LOCK, "reader1")
+        self.assertTrue(response.startswith(LockerServer.LOCK_ERROR))
+        self.assertEqual(request(LockerServer.LOCK, "writer"), LockerServer.WAIT)
+        # New readers have to wait behind the waiting writer
+        self.assertEqual(request(LockerServer.LOCK_SHARED, "reader3"), LockerServer.WAIT)
+        self.assertEqual(request(LockerServer.UNLOCK_SHARED, "reader1"), LockerServer.RELEASED)
+        self.assertEqual(request(LockerServer.LOCK, "writer"), LockerServer.WAIT)
+        self.assertEqual(request(LockerServer.UNLOCK_SHARED, "reader2"), LockerServer.RELEASED)
+        response = request(LockerServer.UNLOCK_SHARED, "reader2")
+        self.assertTrue(response.startswith(LockerServer.RELEASE_ERROR))
+        self.assertEqual(request(LockerServer.LOCK, "writer"), LockerServer.GO)
+        self.assertEqual(request(LockerServer.LOCK_SHARED, "reader3"), LockerServer.WAIT)
+        self.assertEqual(request(LockerServer.UNLOCK, "writer"), LockerServer.RELEASED)
+        self.assertEqual(request(LockerServer.LOCK_SHARED, "reader3"), LockerServer.GO)
+        self.assertEqual(request(LockerServer.UNLOCK_SHARED, "reader3"), LockerServer.RELEASED)
+        sck.close()
+
+        lock = LockerClient(url)
+        self.assertTrue(lock.acquire_shared())
+        lock.release_shared()
+        self.assertTrue(lock.acquire())
+        lock.release()
+        lock.send_done()
+        self.lock_process.join()
+        lock.finalize()
+
     def test_single_core(self):
         url = get_random_port_url()
         filename = make_temp_dir("locker_test/score.txt")
@@ -386,6 +457,480 @@ class TestNetLock(TrajectoryComparator):
         self.lock_process.join()
 
 
+class LoadingStorageService:
+    """Mock of a storage service that checks the lock is held in shared mode while loading"""
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.is_open = False
+
+    def load(self, msg, stuff_to_load, *args, **kwargs):
+        assert self.lock._state[ReadWriteLock.READERS] > 0
+        return stuff_to_load
+
+    def store(self, msg, stuff_to_store, *args, **kwargs):
+        assert self.lock._state[ReadWriteLock.WRITER] == 1
+
+
+class TestReadWriteLock(unittest.TestCase):
+    tags = "unittest", "mpwrappers", "lock"
+
+    def acquire_in_thread(self, lock, shared=False):
+        acquired = threading.Event()
+
+        def acquire():
+            if shared:
+                lock.acquire_shared()
+            else:
+                lock.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        return thread, acquired
+
+    def test_shared_and_exclusive(self, lock=None):
+        if lock is None:
+            lock = ReadWriteLock()
+        self.assertTrue(lock.acquire_shared())
+        self.assertTrue(lock.acquire_shared())
+        writer, written = self.acquire_in_thread(lock)
+        self.assertFalse(written.wait(0.1))
+        # New readers have to wait behind the waiting writer
+        reader, read = self.acquire_in_thread(lock, shared=True)
+        self.assertFalse(read.wait(0.1))
+        lock.release_shared()
+        self.assertFalse(written.wait(0.1))
+        lock.release_shared()
+        self.assertTrue(written.wait(5))
+        writer.join()
+        self.assertFalse(read.wait(0.1))
+        lock.release()
+        self.assertTrue(read.wait(5))
+        reader.join()
+        lock.release_shared()
+        self.assertRaises(ValueError, lock.release)
+        self.assertRaises(ValueError, lock.release_shared)
+
+    def test_shared_and_exclusive_manager(self):
+        with mp.Manager() as manager:
+            self.test_shared_and_exclusive(ReadWriteLock(manager))
+
+    def test_lock_wrapper_loads_shared(self):
+        lock = ReadWriteLock()
+        wrapper = LockWrapper(LoadingStorageService(lock), lock)
+        lock.acquire_shared()
+        self.assertEqual(wrapper.load(pypetconstants.LEAF, 42), 42)
+        lock.release_shared()
+        wrapper.store(pypetconstants.LEAF, 42)
+        self.assertFalse(wrapper.is_locked)
+        self.assertEqual(list(lock._state), [0, 0, 0])
+
+
+class RecordingStorageService:
+    """Mock of a storage service that remembers all storage requests"""
+
+    def __init__(self):
+        self.is_open = False
+        self.requests = []
+
+    def store(self, msg, stuff_to_store, *args, **kwargs):
+        if msg == pypetconstants.OPEN_FILE:
+            self.is_open = True
+        elif msg == pypetconstants.CLOSE_FILE:
+            self.is_open = False
+        self.requests.append((msg, stuff_to_store, kwargs.get("trajectory_name")))
+
+
+class SharedMemoryRecordingStorageService(RecordingStorageService):
+    """Mock of a storage service that copies stored arrays and remembers shared memory blocks"""
+
+    def __init__(self, writer_list):
+        super().__init__()
+        self.writer_list = writer_list
+        self.blocks = []
+
+    def store(self, msg, stuff_to_store, *args, **kwargs):
+        if msg == pypetconstants.LEAF:
+            self.blocks.extend(block.name for block in self.writer_list[0]._shared_blocks)
+            stuff_to_store = {key: value.copy() for key, value in stuff_to_store.items()}
+        super().store(msg, stuff_to_store, *args, **kwargs)
+
+
+class TestStorageWriters(unittest.TestCase):
+    tags = "unittest", "mpwrappers", "storage_writers"
+
+    def send_stores(self, sender):
+        for irun in range(6):
+            trajectory_name = "traj_a" if irun % 2 == 0 else "traj_b"
+            sender.store(pypetconstants.LEAF, irun, trajectory_name=trajectory_name)
+        sender.send_done()
+
+    def check_requests(self, writer, service):
+        msgs = [request[0] for request in service.requests]
+        stored = [request[1:] for request in service.requests if request[0] == pypetconstants.LEAF]
+        # Everything is stored in a single batch, grouped by trajectory with one flush each
+        self.assertEqual(writer.batch_counter, 1)
+        self.assertEqual(writer.largest_batch, 7)
+        self.assertEqual(msgs.count(pypetconstants.FLUSH), 2)
+        self.assertEqual(msgs.count(pypetconstants.OPEN_FILE), 2)
+        self.assertEqual(
+            stored,
+            [
+                (0, "traj_a"),
+                (2, "traj_a"),
+                (4, "traj_a"),
+                (1, "traj_b"),
+                (3, "traj_b"),
+                (5, "traj_b"),
+            ],
+        )
+        self.assertFalse(service.is_open)
+
+    def test_queue_writer_batches(self):
+        storage_queue = queue.Queue()
+        self.send_stores(QueueStorageServiceSender(storage_queue))
+        service = RecordingStorageService()
+        writer = QueueStorageServiceWriter(service, storage_queue)
+        writer.run()
+        self.check_requests(writer, service)
+
+    def test_queue_writer_max_batch_size(self):
+        storage_queue = queue.Queue()
+        self.send_stores(QueueStorageServiceSender(storage_queue))
+        service = RecordingStorageService()
+        writer = QueueStorageServiceWriter(service, storage_queue, max_batch_size=3)
+        writer.run()
+        self.assertEqual(writer.batch_counter, 3)
+        self.assertEqual(writer.largest_batch, 3)
+        self.assertEqual(writer.operation_counter, 6)
+
+    def test_pipe_writer_batches(self):
+        receiver, sender_conn = mp.Pipe(True)
+        sender = PipeStorageServiceSender(sender_conn, threading.Lock())
+        sending = threading.Thread(target=self.send_stores, args=(sender,))
+        sending.start()
+        while not receiver.poll():
+            time.sleep(0.01)
+        # Wait until all stores are read so that they form a single batch
+        service = RecordingStorageService()
+        writer = PipeStorageServiceWriter(service, receiver, max_buffer_bytes=0)
+        while sending.is_alive():
+            writer._fill_buffer()
+        writer.run()
+        sending.join()
+        self.check_requests(writer, service)
+
+    def test_pipe_writer_drains_all_pipes(self):
+        pipes = [mp.Pipe(False) for _ in range(3)]
+        # The main process signals it is done before the workers' data is read
+        PipeStorageServiceSender(pipes[0][1], threading.Lock()).send_done()
+        for irun, pipe in enumerate(pipes[1:]):
+            sender = PipeStorageServiceSender(pipe[1], threading.Lock())
+            sender.store(pypetconstants.LEAF, irun, trajectory_name="traj_a")
+            sender.store(pypetconstants.LEAF, irun + 10, trajectory_name="traj_a")
+        service = RecordingStorageService()
+        writer = PipeStorageServiceWriter(service, [pipe[0] for pipe in pipes])
+        writer.run()
+        stored = sorted(
+            request[1] for request in service.requests if request[0] == pypetconstants.LEAF
+        )
+        self.assertEqual(stored, [0, 1, 10, 11])
+        self.assertEqual(writer.buffered_bytes, 0)
+
+    def test_pipe_writer_byte_backpressure(self):
+        receiver, sender_conn = mp.Pipe(False)
+        sender = PipeStorageServiceSender(sender_conn, threading.Lock())
+        for irun in range(5):
+            sender.store(pypetconstants.LEAF, "x" * 1000, trajectory_name="traj_a")
+        sender.send_done()
+        service = RecordingStorageService()
+        writer = PipeStorageServiceWriter(service, receiver, max_buffer_bytes=1500)
+        writer._fill_buffer()
+        # Reading stops as soon as the byte budget is exceeded
+        self.assertEqual(len(writer._buffer), 2)
+        writer.run()
+        self.assertEqual(writer.operation_counter, 5)
+        self.assertLess(writer.largest_buffered_bytes, 3000)
+
+    def check_shared_memory(self, writer_list, service):
+        stored = [request[1] for request in service.requests if request[0] == pypetconstants.LEAF]
+        self.assertEqual(len(stored), 1)
+        self.assertTrue(np.all(stored[0]["big"] == np.arange(1000.0)))
+        self.assertTrue(np.all(stored[0]["small"] == np.arange(3.0)))
+        # Only the large array was placed into shared memory and has been released
+        self.assertEqual(len(service.blocks), 1)
+        self.assertEqual(writer_list[0]._shared_blocks, [])
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=service.blocks[0])
+
+    def test_queue_shared_memory(self):
+        storage_queue = queue.Queue()
+        sender = QueueStorageServiceSender(storage_queue, shared_memory_threshold=1000)
+        data = dict(big=np.arange(1000.0), small=np.arange(3.0))
+        sender.store(pypetconstants.LEAF, data, trajectory_name="traj_a")
+        sender.send_done()
+        msg, args, kwargs = storage_queue.queue[0]
+        self.assertEqual(msg, "SHARED")
+        self.assertLess(len(args[0]), 1000)
+        writer_list = []
+        service = SharedMemoryRecordingStorageService(writer_list)
+        writer_list.append(QueueStorageServiceWriter(service, storage_queue))
+        writer_list[0].run()
+        self.check_shared_memory(writer_list, service)
+
+    def test_pipe_shared_memory(self):
+        receiver, sender_conn = mp.Pipe(False)
+        sender = PipeStorageServiceSender(
+            sender_conn, threading.Lock(), shared_memory_threshold=1000
+        )
+        data = dict(big=np.arange(1000.0), small=np.arange(3.0))
+        sender.store(pypetconstants.LEAF, data, trajectory_name="traj_a")
+        sender.send_done()
+        writer_list = []
+        service = SharedMemoryRecordingStorageService(writer_list)
+        writer_list.append(PipeStorageServiceWriter(service, receiver))
+        writer_list[0].run()
+        self.check_shared_memory(writer_list, service)
+
+    def test_out_of_band_buffers(self):
+        data = dict(big=np.arange(1000.0), small=[1, 2, 3])
+        dump, buffers, pickler = dump_shared(data)
+        self.assertIsNone(pickler)
+        self.assertEqual([buffer.nbytes for buffer in buffers], [8000])
+        self.assertLess(len(dump), 1000)
+        loaded, blocks = load_shared(dump, buffers)
+        self.assertEqual(blocks, [])
+        self.assertTrue(np.all(loaded["big"] == data["big"]))
+        self.assertEqual(loaded["small"], [1, 2, 3])
+
+    def test_load_shared_copy(self):
+        data = dict(big=np.arange(1000.0), small=np.arange(3.0))
+        dump, _, pickler = dump_shared(data, threshold=1000, out_of_band=False)
+        self.assertEqual(len(pickler.blocks), 1)
+        loaded, blocks = load_shared(dump, copy=True)
+        self.assertEqual(blocks, [])
+        self.assertTrue(np.all(loaded["big"] == data["big"]))
+        # The block is released right away since the array was copied
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=pickler.blocks[0])
+
+    def test_pipe_out_of_band_buffers(self):
+        receiver, sender_conn = mp.Pipe(False)
+        sender = PipeStorageServiceSender(sender_conn, threading.Lock())
+        data = dict(big=np.arange(1000.0), small=np.arange(3.0))
+        sender.store(pypetconstants.LEAF, data, trajectory_name="traj_a")
+        sender.send_done()
+        service = RecordingStorageService()
+        writer = PipeStorageServiceWriter(service, receiver)
+        writer.run()
+        stored = [request[1] for request in service.requests if request[0] == pypetconstants.LEAF]
+        self.assertTrue(np.all(stored[0]["big"] == data["big"]))
+        # Arrays are reconstructed from the received buffers and stay writable
+        self.assertTrue(stored[0]["big"].flags.writeable)
+        self.assertTrue(np.all(stored[0]["small"] == data["small"]))
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue_out_of_band_buffers(self):
+        url = get_random_port_url()
+        service = RecordingStorageService()
+        server = QueuingServer(url, service, 10, None)
+        serving = threading.Thread(target=server.run)
+        serving.start()
+        client = QueuingClient(url)
+        sender = QueueStorageServiceSender(client)
+        data = dict(big=np.arange(1000.0), small=np.arange(3.0))
+        sender.store(pypetconstants.LEAF, data, trajectory_name="traj_a")
+        client.send_done()
+        client.finalize()
+        serving.join()
+        stored = [request[1] for request in service.requests if request[0] == pypetconstants.LEAF]
+        self.assertTrue(np.all(stored[0]["big"] == data["big"]))
+        self.assertTrue(np.all(stored[0]["small"] == data["small"]))
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue_credit_flow_control(self):
+        url = get_random_port_url()
+        service = RecordingStorageService()
+        # A tiny queue forces the server to delay acknowledgements
+        server = QueuingServer(url, service, 2, None)
+        serving = threading.Thread(target=server.run)
+        serving.start()
+        client = QueuingClient(url, max_in_flight=5)
+        sender = QueueStorageServiceSender(client)
+        for irun in range(50):
+            sender.store(pypetconstants.LEAF, irun, trajectory_name="traj_a")
+            self.assertLessEqual(len(client._in_flight), 5)
+        sender.flush()
+        self.assertEqual(len(client._in_flight), 0)
+        self.assertEqual(client._batch, [])
+        client.send_done()
+        client.finalize()
+        serving.join()
+        stored = [request[1] for request in service.requests if request[0] == pypetconstants.LEAF]
+        self.assertEqual(stored, list(range(50)))
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue_waits_for_busy_server(self):
+        url = get_random_port_url()
+        main_queue = queue.Queue()
+        listener = QueuingServerMessageListener(url, main_queue, 1)
+        listener.KEEP_ALIVE = 0.05
+        listening = threading.Thread(target=listener.listen, daemon=True)
+        listening.start()
+        client = QueuingClient(url, max_in_flight=2)
+        # The client considers the server offline after 0.2 seconds of silence
+        client.TIMEOUT = 100
+        client.RETRIES = 2
+        for irun in range(3):
+            client.put(irun)
+        flushing = threading.Thread(target=client.flush)
+        flushing.start()
+        flushing.join(1.0)
+        # The full queue delays the acknowledgements, but `BUSY` keeps the client waiting
+        self.assertTrue(flushing.is_alive())
+        received = []
+        while flushing.is_alive() or not main_queue.empty():
+            try:
+                received.append(main_queue.get(timeout=0.1))
+            except queue.Empty:
+                pass
+        flushing.join()
+        self.assertEqual(received, [0, 1, 2])
+        self.assertEqual(len(client._in_flight), 0)
+        client.send_done()
+        client.finalize()
+        listening.join()
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue_client_deletion_does_not_flush(self):
+        # There is no server, so flushing would block and fail
+        client = QueuingClient(get_random_port_url())
+        client.put(42)
+        self.assertEqual(len(client._in_flight), 1)
+        start = time.time()
+        client.__del__()
+        self.assertLess(time.time() - start, 1.0)
+        self.assertIsNone(client._context)
+
+    @unittest.skipIf(zmq is None, "Cannot be run without zmq")
+    def test_netqueue_put_without_blocking_and_copying(self):
+        # There is no server, so no credits are returned
+        client = QueuingClient(get_random_port_url(), max_in_flight=2)
+        data = np.arange(1000.0)
+        client.put(data, block=False)
+        client.put(1, block=False)
+        client.put(2, block=False)
+        self.assertRaises(queue.Full, client.put, 3, block=False)
+        self.assertEqual(len(client._in_flight), 2)
+        self.assertEqual(len(client._batch), 1)
+        # The array is referenced, not copied, until the server acknowledges it
+        self.assertTrue(np.shares_memory(np.frombuffer(client._in_flight[0][1]), data))
+        client.__del__()
+
+    def test_pipe_sender_claims_pipe_per_process(self):
+        pipes = [mp.Pipe(False) for _ in range(2)]
+        counter = mp.Value("i", 0)
+        sender = PipeStorageServiceSender(
+            [pipe[1] for pipe in pipes], [threading.Lock(), threading.Lock()], counter
+        )
+        sender.store(pypetconstants.LEAF, 0, trajectory_name="traj_a")
+        self.assertIs(sender.conn, pipes[0][1])
+        self.assertTrue(pipes[0][0].poll())
+        # Forking is detected via the process id, the child claims the next pipe
+        sender._pid = None
+        sender.store(pypetconstants.LEAF, 1, trajectory_name="traj_a")
+        self.assertIs(sender.conn, pipes[1][1])
+        self.assertTrue(pipes[1][0].poll())
+        self.assertEqual(counter.value, 2)
+
+    def test_pipe_sender_does_not_resend_partial_frames(self):
+        class BrokenConnection:
+            def __init__(self):
+                self.headers = 0
+
+            def send(self, header):
+                self.headers += 1
+
+            def send_bytes(self, chunk):
+                raise OSError("Broken pipe")
+
+        conn = BrokenConnection()
+        lock = threading.Lock()
+        sender = PipeStorageServiceSender(conn, lock)
+        self.assertRaises(OSError, sender.store, pypetconstants.LEAF, 0, trajectory_name="traj_a")
+        # No second header is sent in the middle of the broken frame
+        self.assertEqual(conn.headers, 1)
+        self.assertFalse(lock.locked())
+        self.assertFalse(sender.is_locked)
+
+
+class TestStorageMetrics(unittest.TestCase):
+    tags = "unittest", "mpwrappers", "storage_metrics"
+
+    def test_update_sums_and_keeps_maxima(self):
+        metrics = StorageMetrics()
+        metrics.add_store_time(pypetconstants.LEAF, 0.5)
+        metrics.add("max_queue_depth", 3)
+        other = StorageMetrics()
+        other.add_store_time(pypetconstants.LEAF, 0.25)
+        other.add("max_queue_depth", 2)
+        other.add("bytes_serialized", 100)
+        metrics.update(other.pop())
+        self.assertEqual(other.to_dict(), {})
+        self.assertEqual(
+            metrics.to_dict(),
+            {
+                "nstores.LEAF": 2,
+                "store_time.LEAF": 0.75,
+                "max_queue_depth": 3,
+                "bytes_serialized": 100,
+            },
+        )
+        self.assertIn("store_time.LEAF: 0.7500", metrics.summary())
+
+    def test_sender_and_writer_metrics(self):
+        storage_queue = queue.Queue()
+        sender = QueueStorageServiceSender(storage_queue)
+        for irun in range(6):
+            sender.store(pypetconstants.LEAF, irun, trajectory_name="traj_a")
+        sender.send_done()
+        metrics = sender.pop_metrics()
+        self.assertEqual(metrics["nstores.LEAF"], 6)
+        self.assertGreaterEqual(metrics["send_time"], 0.0)
+        self.assertEqual(sender.pop_metrics(), {})
+
+        writer = QueueStorageServiceWriter(RecordingStorageService(), storage_queue)
+        writer.run()
+        metrics = writer.metrics.to_dict()
+        self.assertEqual(metrics["nstores.LEAF"], 6)
+        self.assertEqual(metrics["nflushes"], 1)
+        self.assertEqual(metrics["nbatches"], 1)
+        self.assertEqual(metrics["max_batch_size"], 7)
+        self.assertEqual(metrics["max_queue_depth"], 0)
+
+    def test_pipe_sender_counts_bytes(self):
+        receiver, sender_conn = mp.Pipe(False)
+        sender = PipeStorageServiceSender(sender_conn, threading.Lock())
+        data = np.ones(1000)
+        sender.store(pypetconstants.LEAF, data, trajectory_name="traj_a")
+        metrics = sender.pop_metrics()
+        self.assertGreater(metrics["bytes_serialized"], data.nbytes)
+        self.assertEqual(metrics["nlocks"], 1)
+        self.assertEqual(metrics["nstores.LEAF"], 1)
+        receiver.close()
+        sender_conn.close()
+
+    def test_lock_wrapper_metrics(self):
+        lock = ReadWriteLock()
+        wrapper = LockWrapper(LoadingStorageService(lock), lock)
+        wrapper.store(pypetconstants.LEAF, 0, trajectory_name="traj_a")
+        wrapper.load(pypetconstants.LEAF, 0)
+        metrics = wrapper.pop_metrics()
+        self.assertEqual(metrics["nlocks"], 2)
+        self.assertEqual(metrics["nstores.LEAF"], 1)
+        self.assertGreaterEqual(metrics["lock_wait_time"], 0.0)
+
+
 if __name__ == "__main__":
     opt_args = parse_args()
     run_suite(**opt_args)
@@ -97,6 +97,26 @@ class ParameterTest(TrajectoryComparator):
         with self.assertRaises(ValueError):
             param._explore([])
 
+    def test_exploring_with_numpy_arrays(self):
+        param = Parameter("test.npfloat", np.float64(1.0))
+        param._explore(np.arange(3.0))
+        param.f_unlock()
+        param._expand(np.arange(3.0, 5.0))
+
+        explored_range = param.f_get_range()
+        self.assertEqual(list(explored_range), [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(all(type(val) is np.float64 for val in explored_range))
+
+        param.f_unlock()
+        with self.assertRaises(TypeError):
+            param._expand(np.arange(3))
+        with self.assertRaises(ValueError):
+            param._expand(np.array([]))
+        self.assertEqual(len(param), 5)
+
+        with self.assertRaises(TypeError):
+            Parameter("test.float", 1.0)._explore(np.arange(3.0))
+
     def test_cannot_expand_and_not_explore_throwing_type_error(self):
 
         for param in self.param.values():
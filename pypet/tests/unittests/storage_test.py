@@ -1135,6 +1135,70 @@ class StorageTest(TrajectoryComparator):
 
         self.compare_trajectories(traj, traj2)
 
+    def test_store_items_async(self):
+        filename = make_temp_dir("teststoreitemsasync.hdf5")
+        traj = Trajectory(name="testtraj", filename=filename, add_time=True)
+        traj.f_add_parameter("x", 42)
+        traj.f_explore({"x": [1, 2]})
+        traj.f_store()
+
+        traj.v_max_async_bytes = 1000
+        traj.f_start_run(1, turn_into_run=True)
+        futures = []
+        for irun in range(5):
+            traj.f_add_result(f"$.big_{irun}", np.random.rand(100), comment="Async")
+            futures.append(traj.f_store_item_async(f"$.big_{irun}"))
+        self.assertLessEqual(len(traj._async_stores), 2)
+        traj.f_add_result("$.small", 42)
+        traj.f_store_items_async(["$.small"])
+        traj.f_finalize_run(clean_up=False)
+        self.assertEqual(len(traj._async_stores), 0)
+        self.assertIsNone(traj._async_executor)
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertTrue(traj.f_get("$.small")._stored)
+        traj.f_restore_default()
+
+        traj2 = load_trajectory(name=traj.v_name, filename=filename, load_all=2)
+        self.compare_trajectories(traj, traj2)
+
+        self.assertRaises(ValueError, traj.f_store_items_async, [], non_empties=True)
+
+        class FailingStorageService:
+            def store(self, *args, **kwargs):
+                raise RuntimeError("Failed")
+
+        traj.v_storage_service = FailingStorageService()
+        future = traj.f_store_item_async("x")
+        # Accessing the service does not wait for pending stores
+        self.assertIsInstance(traj.v_storage_service, FailingStorageService)
+        self.assertRaises(RuntimeError, traj.f_wait_for_async_stores)
+        self.assertIsInstance(future.exception(), RuntimeError)
+
+    def test_parallel_loading(self):
+        filename = make_temp_dir("parallel_loading.hdf5")
+        traj = Trajectory(name="TestParallel", filename=filename, add_time=True)
+
+        traj.f_add_parameter("x", 42, comment="The answer")
+        traj.f_add_parameter(ArrayParameter, "arr", np.arange(10))
+        traj.f_add_parameter(SparseParameter, "sparse", spsp.csr_matrix((100, 100)))
+        traj.f_add_result("big", np.random.rand(500, 500), comment="Shared Memory")
+        traj.f_add_result("mixed", a="b", l=[1, 2, 3], t=(1.0, 2.0), d={"x": 1})
+        traj.f_add_result("frame", pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+        for irun in range(20):
+            traj.f_add_result(f"small.res_{irun}", irun, np.ones(irun + 1))
+        traj.small.f_set_annotations(test="annotated")
+        traj.f_store()
+
+        traj_serial = load_trajectory(name=traj.v_name, filename=filename, load_data=2)
+        traj_parallel = load_trajectory(
+            name=traj.v_name, filename=filename, load_data=2, nworkers=2
+        )
+
+        self.compare_trajectories(traj_serial, traj_parallel)
+        self.compare_trajectories(traj, traj_parallel)
+        self.assertTrue(traj_parallel.f_get("x").v_locked)
+        self.assertEqual(traj_parallel.f_get("big").v_comment, "Shared Memory")
+
 
 if __name__ == "__main__":
     opt_args = parse_args()
@@ -5,6 +5,7 @@ import pickle
 import sys
 import unittest
 import warnings
+from unittest.mock import patch
 
 import numpy as np
 import scipy.sparse as spsp
@@ -218,7 +219,7 @@ class TrajectoryTest(unittest.TestCase):
         self.assertEqual(p.vars.name, p.v_name)
         self.assertEqual(p.func.get_children, p.f_get_children)
 
-        self.assertEqual(sys.getrefcount(p), 9)
+        self.assertEqual(sys.getrefcount(p), 8)
         self.traj.f_remove_child("parameters", recursive=True)
         self.assertEqual(sys.getrefcount(p), 2)
 
@@ -241,13 +242,14 @@ class TrajectoryTest(unittest.TestCase):
         self.assertEqual(len(self.traj._nn_interface._flat_leaf_storage_dict), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves_runs_sorted), 0)
+        self.assertEqual(len(self.traj._nn_interface._descendants_index), 0)
         self.assertEqual(len(self.traj._nn_interface._links_count), 0)
 
         x = []
         z = self.traj.f_add_result("fff", x)
         self.assertEqual(sys.getrefcount(x), 3)
 
-        self.assertEqual(sys.getrefcount(z), 8)
+        self.assertEqual(sys.getrefcount(z), 7)
 
         self.traj.f_remove_item("fff")
 
@@ -279,7 +281,7 @@ class TrajectoryTest(unittest.TestCase):
 
         p = self.traj.jjj
 
-        self.assertEqual(sys.getrefcount(p), 9)
+        self.assertEqual(sys.getrefcount(p), 8)
         self.traj.dpar.crun.f_remove_child("jjj", recursive=True)
         self.assertEqual(sys.getrefcount(p), 2)
 
@@ -296,6 +298,7 @@ class TrajectoryTest(unittest.TestCase):
         self.assertEqual(len(self.traj._nn_interface._flat_leaf_storage_dict), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves_runs_sorted), 0)
+        self.assertEqual(len(self.traj._nn_interface._descendants_index), 0)
         self.assertEqual(len(self.traj._nn_interface._links_count), 0)
 
         self.traj.f_add_leaf("hh", 16)
@@ -308,9 +311,9 @@ class TrajectoryTest(unittest.TestCase):
         self.assertEqual(len(self.traj._linked_by), 1)
 
         z = self.traj.f_get("hh")
-        self.assertEqual(sys.getrefcount(z), 12)
+        self.assertEqual(sys.getrefcount(z), 11)
         self.traj.jj.f_remove_link("dd")
-        self.assertEqual(sys.getrefcount(z), 9)
+        self.assertEqual(sys.getrefcount(z), 8)
 
         self.assertEqual(len(self.traj._new_links), 0)
         self.assertEqual(len(self.traj._linked_by), 0)
@@ -322,6 +325,7 @@ class TrajectoryTest(unittest.TestCase):
         self.assertEqual(len(self.traj._nn_interface._flat_leaf_storage_dict), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves), 0)
         self.assertEqual(len(self.traj._nn_interface._nodes_and_leaves_runs_sorted), 0)
+        self.assertEqual(len(self.traj._nn_interface._descendants_index), 0)
         self.assertEqual(len(self.traj._nn_interface._links_count), 0)
 
         self.assertEqual(len(self.traj._children), 0)
@@ -601,6 +605,23 @@ class TrajectoryTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.traj.f_explore(self.explore_dict)
 
+    def test_failed_expansion_restores_ranges(self):
+        old_ranges = {
+            key: self.traj.f_get(key).f_get_range() for key in self.traj._explored_parameters
+        }
+        old_length = len(self.traj)
+        expand_dict = {key: list(old_ranges[key]) for key in old_ranges}
+        # Ranges of different lengths
+        last_key = list(expand_dict.keys())[-1]
+        expand_dict[last_key].append(old_ranges[last_key][0])
+
+        with self.assertRaises(ValueError):
+            self.traj.f_expand(expand_dict)
+
+        self.assertEqual(len(self.traj), old_length)
+        for key, old_range in old_ranges.items():
+            self.assertEqual(self.traj.f_get(key).f_get_range(), old_range)
+
     def test_f_get(self):
         self.traj.v_fast_access = True
         self.traj.f_get("FloatParam", fast_access=True) == self.traj.FloatParam
@@ -844,22 +865,50 @@ class TrajectoryTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.traj.f_add_parameter("_crun", 22)
 
+    def test_cached_name_checks(self):
+        self.traj = Trajectory("resulttest2")
+        self.traj.f_add_result("mygroup.res", 42)
+        self.traj.f_add_result("res.runs.run_00000000.res", 43)
+
+        nn_interface = self.traj._nn_interface
+        self.assertIn("mygroup", nn_interface._admissible_names)
+        self.assertNotIn("res", nn_interface._admissible_names)
+        self.assertNotIn("run_00000000", nn_interface._admissible_names)
+
+        # Names that trigger warnings are checked again every time
+        for _ in range(2):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                self.traj.f_add_result("for.res", 44)
+                self.traj.results.f_remove_child("for", recursive=True)
+                self.assertEqual(len(w), 1)
+
+        with self.assertRaises(ValueError):
+            self.traj.f_add_result("mygroup." + "e" * 129)
+
+        # Shortcuts are still translated
+        self.traj.f_add_result("res.mygroup.x", 45)
+        self.assertEqual(self.traj.f_get("mygroup.x").v_full_name, "results.mygroup.x")
+
     def test_f_getting_of_children(self):
         my_groups = self.traj.par.f_get_groups()
         self.assertTrue(my_groups == self.traj.par._groups)
         self.assertTrue(my_groups is not self.traj.par._groups)
 
-        my_groups = self.traj.par.f_get_groups(copy=False)
+        # Groups and leaves are computed from the children, so there is no original dict
+        with self.assertWarns(DeprecationWarning):
+            my_groups = self.traj.par.f_get_groups(copy=False)
         self.assertTrue(my_groups == self.traj.par._groups)
-        self.assertTrue(my_groups is self.traj.par._groups)
+        self.assertTrue(my_groups is not self.traj.par._groups)
 
         my_leaves = self.traj.par.f_get_leaves()
         self.assertTrue(my_leaves == self.traj.par._leaves)
         self.assertTrue(my_leaves is not self.traj.par._leaves)
 
-        my_leaves = self.traj.par.f_get_leaves(copy=False)
+        with self.assertWarns(DeprecationWarning):
+            my_leaves = self.traj.par.f_get_leaves(copy=False)
         self.assertTrue(my_leaves == self.traj.par._leaves)
-        self.assertTrue(my_leaves is self.traj.par._leaves)
+        self.assertTrue(my_leaves is not self.traj.par._leaves)
 
         self.traj.par.k = self.traj.par
         my_links = self.traj.par.f_get_links()
@@ -1215,6 +1264,109 @@ class TrajectoryTest(unittest.TestCase):
         # with self.assertRaises(pex.NotUniqueNodeError):
         #     self.traj.f_get('depth0.findme', backwards_search=True)
 
+    def test_indexed_search_with_many_equal_names(self):
+        self.traj = Trajectory()
+        self.traj.f_add_parameter("x", 42)
+        self.traj.f_explore({"x": list(range(20))})
+
+        for irun in range(20):
+            run_name = self.traj.f_idx_to_run(irun)
+            self.traj.f_add_result(f"results.runs.{run_name}.deep.z", irun)
+            self.traj.f_add_result(f"results.runs.{run_name}.ww.hh.deep.z", irun)
+
+        nn_interface = self.traj._nn_interface
+        self.assertGreater(len(nn_interface._nodes_and_leaves["z"]), 3)
+
+        run_group = self.traj.f_get("results.runs.run_00000007")
+        found, depth = nn_interface._search(run_group, "z")
+        self.assertEqual(found.v_full_name, "results.runs.run_00000007.deep.z")
+        self.assertEqual(depth, 2)
+        self.assertEqual(self.traj.f_get("run_00000007.deep.z", fast_access=True), 7)
+
+        found, depth = nn_interface._search(run_group, "z", max_depth=1)
+        self.assertIsNone(found)
+
+        ww_group = run_group.f_get("ww")
+        self.assertEqual(ww_group.f_get("z").v_full_name, "results.runs.run_00000007.ww.hh.deep.z")
+
+        with self.assertRaises(pex.NotUniqueNodeError):
+            self.traj.results.runs.f_get("z")
+
+        # The index has to give the same results as the traversal of the tree
+        for node in self.traj.f_iter_nodes(recursive=True, predicate=lambda x: x.v_is_group):
+            for name in ("z", "deep", "hh"):
+                iterator = nn_interface._iter_nodes(
+                    node, recursive=True, in_search=True, with_links=False
+                )
+                depths = [depth for depth, key, _ in iterator if key == name]
+                if not depths:
+                    self.assertIsNone(nn_interface._search(node, name, with_links=False)[0])
+                elif depths.count(min(depths)) > 1:
+                    with self.assertRaises(pex.NotUniqueNodeError):
+                        nn_interface._search(node, name, with_links=False)
+                else:
+                    found, _ = nn_interface._search(node, name, with_links=False)
+                    self.assertEqual(found.v_depth - node.v_depth, min(depths))
+                    self.assertEqual(found.v_name, name)
+
+        self.traj.results.runs.f_get("run_00000007").f_remove_child("deep", recursive=True)
+        found, depth = nn_interface._search(run_group, "z")
+        self.assertEqual(found.v_full_name, "results.runs.run_00000007.ww.hh.deep.z")
+        self.assertEqual(depth, 4)
+
+        self.traj.f_remove_child("results", recursive=True)
+        self.assertEqual(list(nn_interface._descendants_index.keys()), [("", "x", 2)])
+
+    def test_indexed_search_with_links(self):
+        self.traj = Trajectory()
+        self.traj.f_add_parameter("x", 42)
+        self.traj.f_explore({"x": list(range(20))})
+
+        for irun in range(20):
+            run_name = self.traj.f_idx_to_run(irun)
+            self.traj.f_add_result(f"results.runs.{run_name}.deep.z", irun)
+            self.traj.f_add_result(f"results.runs.{run_name}.ww.hh.deep.z", irun)
+        nn_interface = self.traj._nn_interface
+
+        def traverse(node, name):
+            iterator = nn_interface._iter_nodes(node, recursive=True, in_search=True)
+            return [(depth, child) for depth, key, child in iterator if key == name]
+
+        def check_all_searches():
+            # The search has to give the same results as the traversal of the tree
+            for node in self.traj.f_iter_nodes(recursive=True, predicate=lambda x: x.v_is_group):
+                for name in ("z", "deep", "hh", "x", "shortcut", "ww"):
+                    found = traverse(node, name)
+                    depths = [depth for depth, _ in found]
+                    if not depths:
+                        self.assertIsNone(nn_interface._search(node, name)[0])
+                    elif depths.count(min(depths)) > 1:
+                        with self.assertRaises(pex.NotUniqueNodeError):
+                            nn_interface._search(node, name)
+                    else:
+                        result, depth = nn_interface._search(node, name)
+                        self.assertEqual(depth, min(depths))
+                        self.assertIs(result, found[depths.index(depth)][1])
+
+        # A link that cannot lead to `z` does not require a traversal of the tree
+        self.traj.f_add_link("parameters.shortcut", self.traj.f_get("x"))
+        run_group = self.traj.f_get("results.runs.run_00000007")
+        with patch.object(nn_interface, "_iter_nodes", side_effect=AssertionError):
+            found, depth = nn_interface._search(run_group, "z")
+            self.assertEqual(found.v_full_name, "results.runs.run_00000007.deep.z")
+            with self.assertRaises(pex.NotUniqueNodeError):
+                self.traj.results.runs.f_get("z")
+        check_all_searches()
+
+        # Links that create shorter paths to a node are found
+        self.traj.f_add_link(
+            "results.runs.run_00000003.ww.shortcut",
+            self.traj.f_get("results.runs.run_00000003.ww.hh.deep"),
+        )
+        self.traj.f_add_link("results.runs.run_00000005.z", self.traj.f_get("x"))
+        self.assertIs(self.traj.f_get("run_00000005").f_get("z"), self.traj.f_get("x"))
+        check_all_searches()
+
     def test_contains_item_identity(self):
 
         peterpaul = self.traj.f_get("peter.paul")
@@ -1402,6 +1554,66 @@ class GetStateFlunk(Parameter):
         return {"haha": 42}
 
 
+class ToleranceParam(Parameter):
+    """Parameter with custom equality but without a matching hash"""
+
+    def _equal_values(self, val1, val2):
+        return abs(val1 - val2) < 0.5
+
+
+class MergeDuplicatesTest(unittest.TestCase):
+    tags = "unittest", "trajectory", "merge"
+
+    def make_trajectory(self, name, xs, ys, param_type=Parameter):
+        traj = Trajectory(name, add_time=False)
+        traj.f_add_parameter(param_type, "x", 0.0)
+        traj.f_add_parameter("y", np.zeros(2))
+        traj.f_add_parameter("z", "a")
+        traj.f_explore({"x": xs, "y": [np.array(y) for y in ys]})
+        traj._make_reversed_wildcards()
+        return traj
+
+    def merge(self, xs1, ys1, xs2, ys2, param_type=Parameter, decimals=None):
+        traj1 = self.make_trajectory("traj1", xs1, ys1, param_type)
+        traj2 = self.make_trajectory("traj2", xs2, ys2, param_type)
+        used_runs, changed = traj1._merge_parameters(
+            traj2, remove_duplicates=True, duplicate_decimals=decimals
+        )
+        return traj1, used_runs, changed
+
+    def test_remove_duplicates(self):
+        traj, used_runs, changed = self.merge(
+            [1.0, 2.0, 3.0],
+            [[1, 1], [2, 2], [3, 3]],
+            [2.0, 3.0, 4.0, 1.0],
+            [[2, 2], [3, 4], [4, 4], [1, 1]],
+        )
+        self.assertEqual(used_runs, {1: 3, 2: 4})
+        self.assertEqual(set(changed), {"parameters.x", "parameters.y"})
+        self.assertEqual(list(traj.f_get("x").f_get_range()), [1.0, 2.0, 3.0, 3.0, 4.0])
+
+    def test_remove_duplicates_with_decimals(self):
+        xs1 = [0.1 + 0.2, 0.5]
+        xs2 = [0.3, 0.50001]
+        ys = [[1, 1], [2, 2]]
+        _, used_runs, _ = self.merge(xs1, ys, xs2, ys)
+        self.assertEqual(used_runs, {0: 2, 1: 3})
+        _, used_runs, _ = self.merge(xs1, ys, xs2, ys, decimals=3)
+        self.assertEqual(used_runs, {})
+
+    def test_remove_duplicates_without_hash(self):
+        with self.assertLogs("pypet.trajectory.Trajectory", level="WARNING"):
+            _, used_runs, _ = self.merge(
+                [1.0, 2.0],
+                [[1, 1], [2, 2]],
+                [1.2, 2.0, 3.0],
+                [[1, 1], [2, 3], [2, 2]],
+                param_type=ToleranceParam,
+            )
+        # Equality of the custom parameter is respected by comparing all pairs
+        self.assertEqual(used_runs, {1: 2, 2: 3})
+
+
 class TrajectoryCopyTreeTest(TrajectoryComparator):
     tags = "unittest", "trajectory", "tree_copy"
 
@@ -1497,6 +1709,37 @@ class TrajectoryCopyTreeTest(TrajectoryComparator):
         traj1._copy_from(traj2, with_links=True)
         self.assertTrue(traj1.ands.test is traj1.name)
 
+    def test_copy_keeps_lookup_dicts(self):
+        traj = Trajectory()
+        traj.f_apar("hi.my.name.is.parameter", 42, "A parameter")
+        traj.f_apar("hi.other", 43)
+        traj.f_explore({"parameter": [1, 2, 3]})
+        for irun in range(3):
+            traj.f_ares(f"runs.{traj.f_wildcard('$', irun)}.sub.z", irun)
+        traj.f_add_link("mylink", traj.f_get("hi.my"))
+        traj.hi.my.v_annotations["test"] = "ddd"
+
+        copied = traj.f_copy(copy_leaves="explored")
+
+        nn_interface = traj._nn_interface
+        copied_interface = copied._nn_interface
+        self.assertEqual(
+            {key: set(value) for key, value in nn_interface._nodes_and_leaves.items()},
+            {key: set(value) for key, value in copied_interface._nodes_and_leaves.items()},
+        )
+        self.assertEqual(nn_interface._descendants_index, copied_interface._descendants_index)
+        self.assertEqual(
+            set(nn_interface._flat_leaf_storage_dict), set(copied_interface._flat_leaf_storage_dict)
+        )
+        self.assertEqual(nn_interface._links_count, copied_interface._links_count)
+        self.assertEqual(set(traj._explored_parameters), set(copied._explored_parameters))
+
+        self.assertTrue(copied.mylink is copied.f_get("hi.my"))
+        self.assertEqual(copied.hi.my.v_annotations["test"], "ddd")
+        self.assertTrue(copied.f_get("parameter") is not traj.f_get("parameter"))
+        self.assertTrue(copied.f_get("run_00000001.z") is traj.f_get("run_00000001.z"))
+        self.assertTrue(copied.f_get("run_00000001.sub") is not traj.f_get("run_00000001.sub"))
+
     def test_not_copy_from_node(self):
         traj1 = Trajectory()
         traj1.par["hi"] = Parameter("hi.my.name.is.parameter", 42, "A parameter")
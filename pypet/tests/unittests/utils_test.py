@@ -1,4 +1,5 @@
 import copy as cp
+import os
 import pickle
 import random
 import time
@@ -7,17 +8,19 @@ from collections.abc import Mapping, Sequence, Set
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as spsp
 
 from pypet import HasSlots
 from pypet.parameter import ArrayParameter, Parameter, PickleParameter, SparseParameter
 from pypet.tests.testutils.ioutils import (
     get_root_logger,
+    make_temp_dir,
     parse_args,
     run_suite,
 )
-from pypet.utils.comparisons import nested_equal
+from pypet.utils.comparisons import nested_equal, nested_hash, round_floats
 from pypet.utils.decorators import retry
-from pypet.utils.explore import cartesian_product, find_unique_points
+from pypet.utils.explore import UniquePoints, cartesian_product, find_unique_points
 from pypet.utils.helpful_classes import IteratorChain
 from pypet.utils.helpful_functions import (
     flatten_dictionary,
@@ -26,6 +29,8 @@ from pypet.utils.helpful_functions import (
     progressbar,
     result_sort,
 )
+from pypet.utils.resultsequence import ResultSequence
+from pypet.utils.resumejournal import ResumeJournal
 
 
 class RaisesNTypeErrors:
@@ -85,6 +90,24 @@ class CartesianTest(unittest.TestCase):
             nested_equal(cartesian_dict, result_dict), f"{cartesian_dict} != {result_dict}"
         )
 
+    def test_cartesian_product_numpy_arrays(self):
+        cartesian_dict = cartesian_product(
+            {"param1": np.array([1.0, 2.0]), "param2": [(1, 2), (3, 4), (5, 6)]},
+            ("param1", "param2"),
+        )
+        self.assertIsInstance(cartesian_dict["param1"], list)
+        self.assertEqual(cartesian_dict["param1"], [1.0, 1.0, 1.0, 2.0, 2.0, 2.0])
+        self.assertIsInstance(cartesian_dict["param1"][0], np.float64)
+
+        cartesian_dict = cartesian_product(
+            {"param1": np.array([1.0, 2.0]), "param2": [(1, 2), (3, 4), (5, 6)]},
+            ("param1", "param2"),
+            as_arrays=True,
+        )
+        self.assertIsInstance(cartesian_dict["param1"], np.ndarray)
+        self.assertEqual(cartesian_dict["param1"].tolist(), [1.0, 1.0, 1.0, 2.0, 2.0, 2.0])
+        self.assertEqual(cartesian_dict["param2"], [(1, 2), (3, 4), (5, 6)] * 2)
+
 
 class ProgressBarTest(unittest.TestCase):
     tags = "unittest", "utils", "progress_bar"
@@ -193,6 +216,27 @@ class TestFindUnique(unittest.TestCase):
         self.assertTrue(len(unique_elements[0][1]) == 3)
         self.assertTrue(len(unique_elements[3][1]) == 1)
 
+    def test_find_unique_keeps_order_of_appearance(self):
+        paramA = Parameter("ggg", np.float64(1.0))
+        paramA._explore(np.array([2.0, 1.0, 2.0, 0.0, 1.0]))
+        paramB = Parameter("hhh", "a")
+        paramB._explore(["b", "a", "b", "a", "a"])
+        unique_elements = find_unique_points([paramA, paramB])
+        expected = [((2.0, "b"), [0, 2]), ((1.0, "a"), [1, 4]), ((0.0, "a"), [3])]
+        self.assertIsInstance(unique_elements, list)
+        self.assertEqual(unique_elements, expected)
+
+        unique_elements = find_unique_points([paramA, paramB], lazy=True)
+        self.assertIsInstance(unique_elements, UniquePoints)
+        self.assertEqual(unique_elements, expected)
+        self.assertEqual(unique_elements[-1], ((0.0, "a"), [3]))
+
+    def test_find_unique_does_not_merge_nans(self):
+        paramA = Parameter("ggg", np.float64(1.0))
+        paramA._explore(np.array([np.nan, 1.0, np.nan]))
+        unique_elements = find_unique_points([paramA])
+        self.assertEqual([pos_list for _, pos_list in unique_elements], [[0], [1], [2]])
+
 
 class TestDictionaryMethods(unittest.TestCase):
     tags = "unittest", "utils"
@@ -326,6 +370,50 @@ class MyDummyMapping(Mapping):
 class TestEqualityOperations(unittest.TestCase):
     tags = "unittest", "utils", "equality"
 
+    def test_nested_hash(self):
+        equal_pairs = [
+            (4, np.int8(4)),
+            (4, 4.0),
+            (-0.0, 0.0),
+            ("abc", "abc"),
+            (np.array([1, 2, 3]), np.array([1.0, 2.0, 3.0])),
+            (np.array([-0.0, 1.0]), np.array([0.0, 1.0])),
+            (np.array(["a", "b"]), np.array(["a", "b"], dtype=object)),
+            ([1, (2, 3.0)], (1, [2, 3])),
+            ({"a": np.ones(3), "b": [1, 2]}, {"b": [1, 2], "a": np.ones(3)}),
+            (spsp.csr_matrix(np.eye(3)), spsp.csc_matrix(np.eye(3))),
+            (pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1, 2]})),
+        ]
+        dummy1 = MyDummy()
+        dummy1.a = [1, 2]
+        dummy2 = MyDummy()
+        dummy2.a = [1, 2]
+        equal_pairs.append((dummy1, dummy2))
+        for a, b in equal_pairs:
+            self.assertTrue(nested_equal(a, b))
+            self.assertEqual(nested_hash(a), nested_hash(b), f"{a} and {b} hash differently")
+
+        self.assertNotEqual(nested_hash(np.array([1, 2])), nested_hash(np.array([1, 3])))
+        self.assertNotEqual(nested_hash(np.ones(2)), nested_hash(np.ones((2, 1))))
+        self.assertNotEqual(
+            nested_hash(spsp.csr_matrix(np.eye(3))), nested_hash(spsp.csr_matrix(2 * np.eye(3)))
+        )
+
+        with self.assertRaises(TypeError):
+            nested_hash(MyDummySet([1, 2]))
+        with self.assertRaises(TypeError):
+            nested_hash(MyDummyCMP(1))
+        with self.assertRaises(TypeError):
+            nested_hash([1, {2}, [3]])
+
+    def test_round_floats(self):
+        rounded = round_floats({"a": [1.234, (2.0001, "x")], "b": np.array([0.111, 0.119])}, 2)
+        self.assertTrue(
+            nested_equal(rounded, {"a": [1.23, (2.0, "x")], "b": np.array([0.11, 0.12])})
+        )
+        self.assertEqual(round_floats(np.int64(3), 2), 3)
+        self.assertIsInstance(round_floats(np.float32(1.234), 1), np.float32)
+
     def test_nested_equal(self):
         self.assertTrue(nested_equal(4, 4))
         self.assertFalse(nested_equal(4, 5))
@@ -608,6 +696,102 @@ class MatchingkwargsTest(unittest.TestCase):
         self.assertEqual(res["f"], 43)
 
 
+class ResumeJournalTest(unittest.TestCase):
+    tags = "unittest", "utils", "resume"
+
+    def setUp(self):
+        self.filename = make_temp_dir(os.path.join("journal", f"journal_{id(self)}.jnl"))
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self.records = [b"environment", b"", b"result" * 1000, b"last"]
+
+    def tearDown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def write_records(self):
+        journal = ResumeJournal(self.filename, sync_every=2)
+        for data in self.records:
+            journal.append(data)
+        journal.close()
+        return journal
+
+    def test_append_and_replay(self):
+        journal = self.write_records()
+        self.assertEqual(list(journal.replay()), self.records)
+        journal.append(b"more")
+        journal.close()
+        self.assertEqual(list(ResumeJournal(self.filename).replay()), self.records + [b"more"])
+
+    def test_replay_empty(self):
+        self.assertEqual(list(ResumeJournal(self.filename).replay()), [])
+
+    def test_torn_record_is_removed(self):
+        self.write_records()
+        size = os.path.getsize(self.filename)
+        with open(self.filename, "r+b") as journal_file:
+            journal_file.truncate(size - 2)
+        journal = ResumeJournal(self.filename)
+        self.assertEqual(list(journal.replay()), self.records[:-1])
+        journal.append(b"new")
+        journal.close()
+        self.assertEqual(list(journal.replay()), self.records[:-1] + [b"new"])
+
+    def test_corrupted_record_ends_journal(self):
+        self.write_records()
+        with open(self.filename, "r+b") as journal_file:
+            journal_file.seek(ResumeJournal.HEADER.size * 3 + len(self.records[0]) + 10)
+            journal_file.write(b"X")
+        journal = ResumeJournal(self.filename)
+        self.assertEqual(list(journal.replay()), self.records[:2])
+
+    def test_compact(self):
+        journal = self.write_records()
+        journal.append(b"pending")
+        journal.compact([b"a", b"b"])
+        self.assertEqual(list(journal.replay()), [b"a", b"b"])
+        self.assertFalse(os.path.isfile(self.filename + ".tmp"))
+        journal.append(b"c")
+        journal.close()
+        self.assertEqual(list(journal.replay()), [b"a", b"b", b"c"])
+
+
+class ResultSequenceTest(unittest.TestCase):
+    tags = "unittest", "utils", "result_sort"
+
+    def make_results(self, memory_limit):
+        results = ResultSequence(memory_limit)
+        indices = list(range(20))
+        random.shuffle(indices)
+        results.extend((idx, np.ones(100) * idx) for idx in indices)
+        return results
+
+    def check_results(self, results):
+        self.assertEqual(len(results), 20)
+        for irun, (idx, value) in enumerate(results):
+            self.assertEqual(irun, idx)
+            self.assertTrue(np.all(value == idx))
+        self.assertEqual(results[-1][0], 19)
+        self.assertEqual([idx for idx, _ in results[2:5]], [2, 3, 4])
+        with self.assertRaises(IndexError):
+            results[20]
+
+    def test_in_memory(self):
+        results = self.make_results(10**6)
+        self.assertEqual(results.spilled, 0)
+        self.check_results(results)
+
+    def test_spilling(self):
+        size = len(pickle.dumps(np.ones(100)))
+        results = self.make_results(5 * size)
+        self.assertEqual(results.spilled, 15)
+        self.assertLessEqual(results.memory_size, 5 * size)
+        self.check_results(results)
+        results.append((20, "late"))
+        self.assertEqual(results[20], (20, "late"))
+        results.close()
+        self.assertEqual(len(results), 0)
+
+
 if __name__ == "__main__":
     opt_args = parse_args()
     run_suite(**opt_args)
@@ -10,13 +10,16 @@ import datetime
 import hashlib
 import inspect
 import itertools as itools
+import os
 import sys
 import time
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 import pypet.pypetconstants as pypetconstants
 import pypet.pypetexceptions as pex
 import pypet.storageservice as storage
+import pypet.utils.comparisons as comparisons
 import pypet.utils.dynamicimports as dynamicimports
 from pypet._version import __version__ as VERSION
 from pypet.naturalnaming import (
@@ -58,6 +61,7 @@ def load_trajectory(
     wildcard_functions=None,
     with_run_information=True,
     storage_service=storage.HDF5StorageService,
+    nworkers=None,
     **kwargs,
 ):
     """Helper function that creates a novel trajectory and loads it from disk.
@@ -93,6 +97,7 @@ def load_trajectory(
         force=force,
         with_run_information=with_run_information,
         storage_service=storage_service,
+        nworkers=nworkers,
         **kwargs,
     )
     return traj
@@ -106,6 +111,19 @@ def make_run_name(idx):
         return pypetconstants.RUN_NAME_DUMMY
 
 
+def _estimate_nbytes(item):
+    """Roughly estimates the size in bytes of the data of an item to be stored"""
+    if not item.v_is_leaf or item.f_is_empty():
+        return 0
+    if item.v_is_parameter:
+        values = [item.f_get()]
+    elif hasattr(item, "f_to_dict"):
+        values = item.f_to_dict(copy=False).values()
+    else:
+        values = [item]
+    return sum(getattr(value, "nbytes", None) or sys.getsizeof(value) for value in values)
+
+
 def make_set_name(idx):
     """Creates a run set name based on ``idx``"""
     GROUPSIZE = 1000
@@ -240,6 +258,8 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
     """
 
+    ASYNC_THREAD_NAME = "pypet_async_store"  # name prefix of the thread of asynchronous stores
+
     @kwargs_api_change("dynamically_imported_classes", "dynamic_imports")
     def __init__(
         self,
@@ -316,6 +336,11 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         self._auto_load = False
         self._with_links = True
 
+        self._async_stores = deque()  # Pending asynchronous stores as (future, nbytes) pairs
+        self._async_executor = None  # Thread storing items in the background
+        self._async_pid = None  # Process of the executor, its thread does not survive forking
+        self._max_async_bytes = 100000000
+
         self._environment_hexsha = None
         self._environment_name = None
 
@@ -430,6 +455,9 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             result["_updated_run_information"] = set()
 
         result["_wildcard_cache"] = {}
+        result["_async_stores"] = deque()
+        result["_async_executor"] = None
+        result["_async_pid"] = None
         return result
 
     def __str__(self):
@@ -477,6 +505,10 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         Default is None or if a filename was provided on construction
         the :class:`~pypet.storageservice.HDF5StorageService`.
 
+        Storage services are not thread safe, call
+        :func:`~pypet.trajectory.Trajectory.f_wait_for_async_stores` before using
+        the service directly while asynchronous stores may be pending.
+
         """
         return self._storage_service
 
@@ -1026,9 +1058,9 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
         :param fail_safe:
 
-            If old ranges should be **deep-copied** in order to allow to restore
-            the original exploration if something fails during expansion.
-            Set to `False` if deep-copying your parameter ranges causes errors.
+            If the original exploration should be restored if something fails
+            during expansion. The old ranges are not copied, because expanding only appends
+            to them, so this costs nothing unless the expansion fails.
 
         :raises:
 
@@ -1064,20 +1096,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 "At least one of your explored parameters is not fully loaded, please load it."
             )
 
-        old_ranges = None
-        if fail_safe:
-            old_ranges = {}
-            for param_name in self._explored_parameters:
-                old_ranges[param_name] = self._explored_parameters[param_name].f_get_range()
-            try:
-                old_ranges = cp.deepcopy(old_ranges)
-            except Exception:
-                self._logger.error(
-                    "Cannot deepcopy old parameter ranges, if "
-                    "something fails during `f_expand` I cannot revert the "
-                    "trajectory to old settings."
-                )
-                old_ranges = None
+        old_length = len(self)
 
         try:
             count = 0
@@ -1099,8 +1118,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                     raise ValueError("The parameters to explore have not the same size!")
                 count += 1
 
-            original_length = len(self)
-            for irun in range(original_length, length):
+            for irun in range(old_length, length):
                 self._add_run_info(irun)
             self._test_run_addition(length)
 
@@ -1108,11 +1126,12 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             self._remove_exploration()
 
         except Exception:
-            if old_ranges is not None:
-                # Try to restore the original parameter exploration
-                for param_name in old_ranges:
-                    param_range = old_ranges[param_name]
+            if fail_safe:
+                # Try to restore the original parameter exploration,
+                # i.e. the first `old_length` entries of the ranges
+                for param_name in self._explored_parameters:
                     param = self._explored_parameters[param_name]
+                    param_range = list(itools.islice(param.f_get_range(copy=False), old_length))
                     param.f_unlock()
                     try:
                         param._shrink()
@@ -1279,6 +1298,21 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             node_in._annotations = new_annotations
             node_in.v_comment = node_out.v_comment
 
+        def _copy_leaf(leaf):
+            """Returns the leaf or a shallow copy of it depending on `copy_leaves`"""
+            if copy_leaves is True or (
+                copy_leaves == "explored" and leaf.v_is_parameter and leaf.v_explored
+            ):
+                return cp.copy(leaf)
+            else:
+                return leaf
+
+        def _register_leaf(new_leaf):
+            """Remembers the leaf if it is an explored parameter"""
+            if new_leaf.v_is_parameter and new_leaf.v_explored:
+                self._explored_parameters[new_leaf.v_full_name] = new_leaf
+            return new_leaf
+
         def _add_leaf(leaf):
             """Adds a leaf to the trajectory"""
             leaf_full_name = leaf.v_full_name
@@ -1291,15 +1325,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 return found_leaf
             except AttributeError:
                 pass
-            if copy_leaves is True or (
-                copy_leaves == "explored" and leaf.v_is_parameter and leaf.v_explored
-            ):
-                new_leaf = self.f_add_leaf(cp.copy(leaf))
-            else:
-                new_leaf = self.f_add_leaf(leaf)
-            if new_leaf.v_is_parameter and new_leaf.v_explored:
-                self._explored_parameters[new_leaf.v_full_name] = new_leaf
-            return new_leaf
+            return _register_leaf(self.f_add_leaf(_copy_leaf(leaf)))
 
         def _add_group(group):
             """Adds a new group to the trajectory"""
@@ -1317,6 +1343,53 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             _copy_skeleton(new_group, group)
             return new_group
 
+        def _add_child(mine, name, child):
+            """Adds the `child` directly below `mine` or returns the existing one.
+
+            Names need not be checked or resolved here because they have already been
+            validated when added to the other tree.
+
+            """
+            if name in mine._children and name not in mine._links:
+                found_child = mine._children[name]
+                if overwrite:
+                    if child.v_is_leaf:
+                        found_child.__setstate__(child.__getstate__())
+                    else:
+                        _copy_skeleton(found_child, child)
+                return found_child
+
+            group_type_name, leaf_type_name = nn_interface._determine_types(mine, name, True, False)
+            if child.v_is_leaf:
+                new_leaf = nn_interface._add_to_tree(
+                    mine, [name], leaf_type_name, group_type_name, _copy_leaf(child), None, [], {}
+                )
+                return _register_leaf(new_leaf)
+            else:
+                new_group = nn_interface._add_to_tree(
+                    mine, [name], group_type_name, group_type_name, None, None, [], {}
+                )
+                _copy_skeleton(new_group, child)
+                return new_group
+
+        def _copy_children(result, group):
+            """Copies the subtree below `group` by walking both trees in parallel"""
+            stack = [(result, group)]
+            while stack:
+                mine, other = stack.pop()
+                copied_groups.add(other.v_full_name)
+                if other._links:
+                    has_links.append(other)
+                for name, child in other._children.items():
+                    if name in other._links:
+                        if with_links:
+                            linked_nodes.append(child)
+                    else:
+                        new_child = _add_child(mine, name, child)
+                        if child.v_is_group:
+                            stack.append((new_child, child))
+
+        nn_interface = self._nn_interface
         is_run = self._is_run
         self._is_run = False  # So that we can copy Config Groups and Config Data
         try:
@@ -1327,17 +1400,18 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 if other_root is self:
                     raise RuntimeError("You cannot copy a given tree to itself!")
                 result = _add_group(node)
-                nodes_iterator = node.f_iter_nodes(recursive=True, with_links=with_links)
                 has_links = []
-                if node._links:
-                    has_links.append(node)
-                for child in nodes_iterator:
-                    if child.v_is_leaf:
-                        _add_leaf(child)
-                    else:
-                        _add_group(child)
-                        if child._links:
-                            has_links.append(child)
+                linked_nodes = []
+                copied_groups = set()
+                _copy_children(result, node)
+
+                # Linked nodes outside of the copied subtree are copied as well
+                while linked_nodes:
+                    linked_node = linked_nodes.pop()
+                    if linked_node.v_is_leaf:
+                        _add_leaf(linked_node)
+                    elif linked_node.v_full_name not in copied_groups:
+                        _copy_children(_add_group(linked_node), linked_node)
 
                 if with_links:
                     for current in has_links:
@@ -1429,12 +1503,11 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
 
         """
-        for run_idx in range(len(self)):
-            if self.f_is_completed(run_idx):
-                raise TypeError(
-                    "You cannot explore a trajectory which has been explored before, "
-                    "please use `f_expand` instead."
-                )
+        if any(runinfo["completed"] for runinfo in self._run_information.values()):
+            raise TypeError(
+                "You cannot explore a trajectory which has been explored before, "
+                "please use `f_expand` instead."
+            )
 
         added_explored_parameters = []
         try:
@@ -1547,6 +1620,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         completed, when they were started, etc.
 
         """
+        self._shutdown_async_executor()
         self._is_run = False
         self.f_set_crun(None)
         if store_meta_data:
@@ -1592,6 +1666,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         with_run_information=True,
         with_meta_data=True,
         storage_service=None,
+        nworkers=None,
         **kwargs,
     ):
         """Loads a trajectory via the storage service.
@@ -1720,6 +1795,13 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             with using no other kwargs, if you don't want to change the service
             the trajectory is currently using.
 
+        :param nworkers:
+
+            Number of processes reading and decompressing the data of parameters and
+            results in parallel. The tree itself is always built by the current process.
+            Leave `None` to load everything within the current process.
+            This only pays off for large trajectories with a lot of data to load.
+
         :param kwargs:
 
             Other arguments passed to the storage service constructor. Don't pass any
@@ -1754,6 +1836,12 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             load_results = load_data
             load_other_data = load_data
 
+        load_kwargs = {}
+        if nworkers is not None:
+            # Only passed if set, to not bother services that do not support parallel loading
+            load_kwargs["nworkers"] = nworkers
+
+        self.f_wait_for_async_stores()
         self._storage_service.load(
             pypetconstants.TRAJECTORY,
             self,
@@ -1769,6 +1857,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             with_run_information=with_run_information,
             with_meta_data=with_meta_data,
             force=force,
+            **load_kwargs,
         )
 
         # If a trajectory is newly loaded, all parameters are unlocked.
@@ -1891,10 +1980,38 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             named 'backup_XXXXX.hdf5' where 'XXXXX' is the name of your current trajectory.
 
         """
+        self.f_wait_for_async_stores()
         self._storage_service.store(
             pypetconstants.BACKUP, self, trajectory_name=self.v_name, **kwargs
         )
 
+    @not_in_run
+    def f_consolidate(self):
+        """Copies data linked from other files into the file of the current trajectory.
+
+        Replaces all external links created by merging with ``link_data=True``
+        by the linked results and derived parameters. Afterwards, the files of the merged
+        trajectories are no longer needed.
+
+        Like :func:`~pypet.trajectory.Trajectory.f_store_items_async` copying happens
+        in a background thread and all other storage operations wait until
+        it is finished, see also :func:`~pypet.trajectory.Trajectory.f_wait_for_async_stores`.
+
+        :return: A :class:`concurrent.futures.Future` yielding `None` once all data is copied
+
+        """
+        if not self._stored:
+            raise TypeError("Cannot consolidate a trajectory that has never been stored to disk.")
+        executor = self._get_async_executor()
+        future = executor.submit(
+            self._storage_service.store,
+            pypetconstants.CONSOLIDATE,
+            None,
+            trajectory_name=self.v_name,
+        )
+        self._async_stores.append((future, 0))
+        return future
+
     def _make_reversed_wildcards(self, old_length=-1):
         """Creates a full mapping from all wildcard translations to the corresponding wildcards"""
         if len(self._reversed_wildcards) > 0:
@@ -1921,17 +2038,27 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         keep_other_trajectory_info=True,
         merge_config=True,
         backup=True,
+        link_data=False,
     ):
         """Can be used to merge several `other_trajectories` into your current one.
 
         IMPORTANT `backup=True` only backs up the current trajectory not any of
         the `other_trajectories`. If you need a backup of these, do it manually.
 
+        `other_trajectories` can be any iterable, e.g. a generator that loads the trajectories
+        one after the other. Each trajectory is merged as soon as it is available,
+        and the merged trajectory is stored only once in the end.
+        Hence, the other trajectories do not need to be kept in memory all at once.
+
         Parameters as for :func:`~pypet.trajectory.Trajectory.f_merge`.
 
         """
-        other_length = len(other_trajectories)
-        self._logger.info("Merging %d trajectories into the current one." % other_length)
+        try:
+            other_length = len(other_trajectories)
+            self._logger.info("Merging %d trajectories into the current one." % other_length)
+        except TypeError:
+            other_length = None
+            self._logger.info("Merging trajectories into the current one.")
         self.f_load_skeleton()
 
         if backup:
@@ -1948,8 +2075,14 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 merge_config=merge_config,
                 backup=False,
                 consecutive_merge=True,
+                link_data=link_data,
             )
-            self._logger.log(21, "Merged %d out of %d" % (idx + 1, other_length))
+            # Release the other trajectory before the next one is loaded
+            del other
+            if other_length is None:
+                self._logger.log(21, "Merged %d trajectories" % (idx + 1))
+            else:
+                self._logger.log(21, "Merged %d out of %d" % (idx + 1, other_length))
         self._logger.info("Storing data to disk")
         self._reversed_wildcards = {}
         self.f_store()
@@ -1974,6 +2107,8 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         merge_config=True,
         consecutive_merge=False,
         slow_merge=False,
+        duplicate_decimals=None,
+        link_data=False,
     ):
         """Merges another trajectory into the current trajectory.
 
@@ -1998,7 +2133,10 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         :param remove_duplicates:
 
             Whether you want to remove duplicate parameter points.
-            Requires N1 * N2 (quadratic complexity in single runs).
+            Points are grouped by a hash of their values, so this takes linear time
+            in the number of single runs N1 + N2. Only if values of a parameter cannot be
+            hashed, e.g. custom types without ``__hash__``, all N1 * N2 pairs of points
+            are compared (quadratic complexity in single runs).
             A ValueError is raised if no runs would be merged.
 
         :param ignore_data:
@@ -2057,6 +2195,26 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             memory and stored to disk. Otherwise it is tried to directly copy the data
             from one file into another without explicitly loading the data.
 
+        :param duplicate_decimals:
+            If not ``None`` and ``remove_duplicates=True``, floats, also within numpy arrays
+            and sparse matrices, are rounded to this number of decimals before
+            parameter points are compared. Thus, points that differ only due to
+            floating point errors are considered duplicates.
+
+        :param link_data:
+
+            If ``True`` and the other trajectory is stored in a different HDF5 file,
+            the results and derived parameters of the other trajectory are not copied.
+            Instead, the HDF5 storage service creates external links to the data in the
+            other file and only updates the meta data and overview tables of the current
+            trajectory. Accordingly, merging requires hardly any additional disk space,
+            but the other file must not be moved (relative to the current file),
+            deleted, or modified. Accordingly, linked files are only opened read-only and
+            storing or overwriting linked data raises a `TypeError`.
+            Use :func:`~pypet.trajectory.Trajectory.f_consolidate`
+            to copy the linked data into the current file later on.
+            Cannot be combined with `move_data` or `delete_other_trajectory`.
+
         If you cannot directly merge trajectories within one HDF5 file, a slow merging process
         is used. Results are loaded, stored, and emptied again one after the other. Might take
         some time!
@@ -2067,6 +2225,11 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         of single runs are copied, so you don't have to worry about these.
 
         """
+        if link_data and (move_data or delete_other_trajectory):
+            raise ValueError(
+                "You cannot link data of the other trajectory if the data is "
+                "moved or the other trajectory is deleted."
+            )
         if consecutive_merge and trial_parameter is not None:
             self._logger.warning(
                 "If you do a consecutive merge and specify a trial parameter, "
@@ -2101,7 +2264,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         # to be updated
         self._logger.info("Merging the parameters")
         used_runs, changed_parameters = self._merge_parameters(
-            other_trajectory, remove_duplicates, trial_parameter, ignore_data
+            other_trajectory, remove_duplicates, trial_parameter, ignore_data, duplicate_decimals
         )
 
         ignore_data.update(set(changed_parameters))
@@ -2149,6 +2312,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         # This includes updating meta information and already storing the merged parameters
         self._logger.info("Start copying results and single run derived parameters")
         self._logger.info("Updating Trajectory information and changed parameters in storage")
+        self.f_wait_for_async_stores()
         self._storage_service.store(
             pypetconstants.PREPARE_MERGE,
             self,
@@ -2179,6 +2343,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                     move_nodes=move_data,
                     delete_trajectory=delete_other_trajectory,
                     other_filename=other_filename,
+                    link_nodes=link_data,
                 )
 
             except pex.NoSuchServiceError:
@@ -2208,7 +2373,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
         # We will merge the git commits and other config data
         if merge_config:
-            self._merge_config(other_trajectory)
+            self._merge_config(other_trajectory, store=not consecutive_merge)
 
         # Finally merging links
         self._merge_links(
@@ -2549,10 +2714,13 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                                 % (link, linking_full_name, old_linked_name, repr(exc))
                             )
 
-    def _merge_config(self, other_trajectory):
+    def _merge_config(self, other_trajectory, store=True):
         """Merges meta data about previous merges, git commits, and environment settings
         of the other trajectory into the current one.
 
+        If `store` is `False` the new config data is only added and stored
+        with the trajectory later on.
+
         """
         self._logger.info("Merging config!")
 
@@ -2565,7 +2733,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 if not self.f_contains(param.v_full_name, shortcuts=False):
                     param_list.append(self.f_add_config(param))
 
-            if param_list:
+            if param_list and store:
                 self.f_store_items(param_list)
 
             self._logger.info("Merging git commits successful!")
@@ -2579,7 +2747,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 if not self.f_contains(param.v_full_name, shortcuts=False):
                     param_list.append(self.f_add_config(param))
 
-            if param_list:
+            if param_list and store:
                 self.f_store_items(param_list)
 
             self._logger.info("Merging config successful!")
@@ -2593,7 +2761,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 if not self.f_contains(param.v_full_name, shortcuts=False):
                     param_list.append(self.f_add_config(param))
 
-            if param_list:
+            if param_list and store:
                 self.f_store_items(param_list)
 
             self._logger.info("Merging config successful!")
@@ -2675,7 +2843,12 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
             rename_dict[result_name] = new_name
 
     def _merge_parameters(
-        self, other_trajectory, remove_duplicates=False, trial_parameter_name=None, ignore_data=()
+        self,
+        other_trajectory,
+        remove_duplicates=False,
+        trial_parameter_name=None,
+        ignore_data=(),
+        duplicate_decimals=None,
     ):
         """Merges parameters from the other trajectory into the current one.
 
@@ -2821,42 +2994,10 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         for idx in range(len(other_trajectory)):
             used_runs[idx] = idx
         if remove_duplicates:
-            # We need to compare all parameter combinations in the current trajectory
-            # to all parameter combinations in the other trajectory to spot duplicate points.
-            # Quadratic Complexity!
-            for irun in range(len(other_trajectory)):
-                for jrun in range(len(self)):
-                    change = True
-
-                    # Check all marked parameters
-                    for my_param, other_param in params_to_change.values():
-                        if other_param.f_has_range():
-                            other_param._set_parameter_access(irun)
-
-                        if my_param.f_has_range():
-                            my_param._set_parameter_access(jrun)
-
-                        val1 = my_param.f_get()
-                        val2 = other_param.f_get()
-
-                        # If only one parameter differs, the parameter space point differs
-                        # and we can skip the rest of the parameters
-                        if not my_param._equal_values(val1, val2):
-                            change = False
-                            break
-
-                    # If we found one parameter space point in the current trajectory
-                    # that matches the ith point in the other, we do not need the ith
-                    # point. We can also skip comparing to the rest of the points in the
-                    # current trajectory
-                    if change:
-                        del used_runs[irun]
-                        break
-
-            # Restore changed default values
-            for my_param, other_param in params_to_change.values():
-                other_param._restore_default()
-                my_param._restore_default()
+            for irun in self._find_duplicate_runs(
+                other_trajectory, list(params_to_change.values()), duplicate_decimals
+            ):
+                del used_runs[irun]
 
         # Merge parameters into the current trajectory
         adding_length = len(used_runs)
@@ -2904,6 +3045,99 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
         return used_runs, list(params_to_change)
 
+    @staticmethod
+    def _get_parameter_points(param, length, decimals):
+        """Returns the values of a parameter in all runs, floats rounded to `decimals` if given"""
+        if param.f_has_range():
+            values = param.f_get_range(copy=False)
+        else:
+            values = itools.repeat(param.f_get(), length)
+        if decimals is not None:
+            values = (comparisons.round_floats(value, decimals) for value in values)
+        return list(values)
+
+    @staticmethod
+    def _supports_value_hashing(param):
+        """Checks if the parameter's hash is implemented along with its equality comparison"""
+        mro = type(param).__mro__
+        equal_class = next(cls for cls in mro if "_equal_values" in cls.__dict__)
+        hash_class = next(cls for cls in mro if "_hash_value" in cls.__dict__)
+        return issubclass(hash_class, equal_class)
+
+    @staticmethod
+    def _hash_points(param, *points):
+        """Hashes the values of a parameter in all runs of both trajectories.
+
+        Returns `None` if the values cannot be hashed.
+
+        """
+        if not Trajectory._supports_value_hashing(param):
+            return None
+        try:
+            return [[param._hash_value(value) for value in values] for values in points]
+        except TypeError:
+            return None
+
+    def _find_duplicate_runs(self, other_trajectory, param_pairs, decimals=None):
+        """Returns the indices of runs of the other trajectory that duplicate runs of this one.
+
+        :param param_pairs:
+
+            List of pairs of parameters of this and the other trajectory that differ
+            between the runs.
+
+        :param decimals:
+
+            If not `None`, floats are rounded to this number of decimals before comparison.
+
+        Parameter space points are grouped by a hash of the values of all hashable
+        parameters, so only points with the same hash are compared with ``_equal_values``.
+        This takes linear time, unless none of the parameters can be hashed.
+
+        """
+        my_points = []
+        other_points = []
+        my_hashes = []
+        other_hashes = []
+        for my_param, other_param in param_pairs:
+            my_values = self._get_parameter_points(my_param, len(self), decimals)
+            other_values = self._get_parameter_points(other_param, len(other_trajectory), decimals)
+            my_points.append(my_values)
+            other_points.append(other_values)
+            hashes = self._hash_points(my_param, my_values, other_values)
+            if hashes is None:
+                self._logger.warning(
+                    f"Cannot hash the values of `{my_param.v_full_name}`, "
+                    "duplicate runs are found by comparing all values."
+                )
+            else:
+                my_hashes.append(hashes[0])
+                other_hashes.append(hashes[1])
+
+        # Group the points of the current trajectory by hash
+        buckets = {}
+        for jrun, key in enumerate(zip(*my_hashes) if my_hashes else itools.repeat((), len(self))):
+            buckets.setdefault(key, []).append(jrun)
+
+        duplicates = []
+        other_keys = (
+            zip(*other_hashes) if other_hashes else itools.repeat((), len(other_trajectory))
+        )
+        for irun, key in enumerate(other_keys):
+            for jrun in buckets.get(key, ()):
+                # If only one parameter differs, the parameter space point differs
+                if all(
+                    my_param._equal_values(my_values[jrun], other_values[irun])
+                    for (my_param, _), my_values, other_values in zip(
+                        param_pairs, my_points, other_points
+                    )
+                ):
+                    # We found one point in the current trajectory
+                    # that matches the ith point in the other, we do not need the ith point
+                    duplicates.append(irun)
+                    break
+        return duplicates
+
     @not_in_run
     def f_migrate(self, new_name=None, in_store=False, new_storage_service=None, **kwargs):
         """Can be called to rename and relocate the trajectory.
@@ -3017,6 +3251,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
 
         """
+        self.f_wait_for_async_stores()
         if self._is_run:
             if self._new_nodes or self._new_links:
                 self._storage_service.store(
@@ -3292,6 +3527,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         if not self._run_started:
             return self
 
+        self._shutdown_async_executor()
         self._set_finish()
 
         if clean_up and self._is_run:
@@ -3438,6 +3674,20 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
     def v_auto_load(self, auto_load):
         self._auto_load = bool(auto_load)
 
+    @property
+    def v_max_async_bytes(self):
+        """Maximum size in bytes of data pending to be stored asynchronously.
+
+        If exceeded, :func:`~pypet.trajectory.Trajectory.f_store_items_async` blocks
+        until enough previous stores have completed. The size of data is only estimated.
+
+        """
+        return self._max_async_bytes
+
+    @v_max_async_bytes.setter
+    def v_max_async_bytes(self, max_async_bytes):
+        self._max_async_bytes = max_async_bytes
+
     @property
     def v_timestamp(self):
         """Float timestamp of creation time"""
@@ -3868,6 +4118,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
         fetched_items = self._nn_interface._fetch_items(STORE, iterator, args, kwargs)
 
         if fetched_items:
+            self.f_wait_for_async_stores()
             self._storage_service.store(
                 pypetconstants.LIST, fetched_items, trajectory_name=self.v_name
             )
@@ -3876,6 +4127,116 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 "Your storage was not successful, could not find a single item to store."
             )
 
+    def f_store_item_async(self, item, *args, **kwargs):
+        """Stores a single item in the background,
+        see also :func:`~pypet.trajectory.Trajectory.f_store_items_async`.
+
+        """
+        return self.f_store_items_async([item], *args, **kwargs)
+
+    def f_store_items_async(self, iterator, *args, **kwargs):
+        """Stores individual items to disk in a background thread and returns a future.
+
+        Works like :func:`~pypet.trajectory.Trajectory.f_store_items` but does not wait
+        until the items are written, whether this involves waiting for a lock, a queue,
+        or a pipe. Thus, your job function can continue computing meanwhile.
+        Items are stored in the order of the calls. The returned
+        :class:`concurrent.futures.Future` yields `None` once the items are stored or
+        raises the error that occurred during storage.
+
+        Do not modify the items before they are stored. If more than
+        :attr:`~pypet.trajectory.Trajectory.v_max_async_bytes` would be pending,
+        the call blocks until enough previous stores have completed.
+
+        All other storage operations, including the automatic storing at the end
+        of a single run and :func:`~pypet.trajectory.Trajectory.f_finalize_run`,
+        first wait for pending stores,
+        see also :func:`~pypet.trajectory.Trajectory.f_wait_for_async_stores`.
+
+        :param iterator: An iterable containing the parameters or results to store
+
+        :param args: Additional arguments passed to the storage service
+
+        :param kwargs: Additional keyword arguments passed to the storage service
+
+        :return: A :class:`concurrent.futures.Future`
+
+        :raises:
+
+            TypeError: If the trajectory has never been stored to disk.
+
+            ValueError: If no item could be found to be stored.
+
+        """
+        if not self._stored:
+            raise TypeError(
+                "Cannot store stuff for a trajectory that has never been "
+                "stored to disk. Please call traj.f_store(only_init=True) first."
+            )
+
+        fetched_items = self._nn_interface._fetch_items(STORE, iterator, args, kwargs)
+
+        if not fetched_items:
+            raise ValueError(
+                "Your storage was not successful, could not find a single item to store."
+            )
+
+        nbytes = sum(_estimate_nbytes(item_tuple[1]) for item_tuple in fetched_items)
+        executor = self._get_async_executor()
+        pending_bytes = sum(pending for _, pending in self._async_stores)
+        while self._async_stores and pending_bytes + nbytes > self._max_async_bytes:
+            future, pending = self._async_stores.popleft()
+            future.result()
+            pending_bytes -= pending
+
+        future = executor.submit(
+            self._storage_service.store,
+            pypetconstants.LIST,
+            fetched_items,
+            trajectory_name=self.v_name,
+        )
+        self._async_stores.append((future, nbytes))
+        return future
+
+    def f_wait_for_async_stores(self):
+        """Blocks until all items passed to
+        :func:`~pypet.trajectory.Trajectory.f_store_items_async` are stored.
+
+        :raises: The first error that occurred during storage in the background
+
+        """
+        if self._async_pid != os.getpid():
+            # Stores of the parent process are not pending in a forked child
+            self._async_stores = deque()
+        error = None
+        while self._async_stores:
+            future, _ = self._async_stores.popleft()
+            exc = future.exception()
+            if error is None:
+                error = exc
+        if error is not None:
+            raise error
+
+    def _get_async_executor(self):
+        """Returns the executor for asynchronous stores, a new one is created after forking"""
+        if self._async_executor is None or self._async_pid != os.getpid():
+            self._async_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=self.ASYNC_THREAD_NAME
+            )
+            self._async_pid = os.getpid()
+            self._async_stores = deque()
+        return self._async_executor
+
+    def _shutdown_async_executor(self):
+        """Waits for pending asynchronous stores and stops the thread of the executor"""
+        try:
+            self.f_wait_for_async_stores()
+        finally:
+            if self._async_executor is not None and self._async_pid == os.getpid():
+                self._async_executor.shutdown()
+            self._async_executor = None
+            self._async_pid = None
+
     def f_load_item(self, item, *args, **kwargs):
         """Loads a single item, see also :func:`~pypet.trajectory.Trajectory.f_load_items`"""
         self.f_load_items([item], *args, **kwargs)
@@ -3955,6 +4316,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
         fetched_items = self._nn_interface._fetch_items(LOAD, iterator, args, kwargs)
         if fetched_items:
+            self.f_wait_for_async_stores()
             self._storage_service.load(
                 pypetconstants.LIST, fetched_items, trajectory_name=self.v_name
             )
@@ -4033,6 +4395,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
                 to_delete_links.append((pypetconstants.DELETE_LINK, link_name))
                 group_link_pairs.append(elem)
         try:
+            self.f_wait_for_async_stores()
             self._storage_service.store(
                 pypetconstants.LIST, to_delete_links, trajectory_name=self.v_name
             )
@@ -4141,6 +4504,7 @@ class Trajectory(DerivedParameterGroup, ResultGroup, ParameterGroup, ConfigGroup
 
         if fetched_items:
             try:
+                self.f_wait_for_async_stores()
                 self._storage_service.store(
                     pypetconstants.LIST, fetched_items, trajectory_name=self.v_name
                 )
@@ -268,3 +268,120 @@ def nested_equal(a, b):
 
     # Ok they are really not equal
     return False
+
+
+def _hash_numeric_array(array):
+    """Hashes the shape and data of a numeric numpy array, returns `None` for other arrays.
+
+    Data is converted to 64 bit floats (or complex numbers), so arrays that compare equal
+    hash equally regardless of their dtype. Adding zero turns `-0.0` into `0.0`.
+
+    """
+    if array.dtype.kind in "biuf":
+        array = np.asarray(array, dtype=np.float64) + 0.0
+    elif array.dtype.kind == "c":
+        array = np.asarray(array, dtype=np.complex128) + 0.0
+    else:
+        return None
+    return hash((array.shape, np.ascontiguousarray(array).tobytes()))
+
+
+def nested_hash(a):
+    """Computes a hash of `a` that agrees with :func:`nested_equal`.
+
+    Objects that are equal according to :func:`nested_equal` have the same hash,
+    provided that sequences and arrays are of the same length.
+    Unequal objects may still share a hash, so equality needs to be checked for
+    objects with the same hash.
+
+    Numpy arrays and sparse matrices are hashed by their values, regardless of dtype
+    and, in case of sparse matrices, of format. Pandas data is only hashed by its shape.
+    Objects without custom equality are hashed by their attributes.
+
+    :raises: TypeError: If `a` or one of its elements cannot be hashed.
+
+    """
+    if a is None:
+        return hash(None)
+
+    if spsp.isspmatrix(a):
+        matrix = spsp.csr_matrix(a, copy=True)
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        data_hash = _hash_numeric_array(matrix.data)
+        if data_hash is None:
+            data_hash = nested_hash(matrix.data)
+        return hash(
+            (
+                matrix.shape,
+                matrix.indptr.astype(np.int64).tobytes(),
+                matrix.indices.astype(np.int64).tobytes(),
+                data_hash,
+            )
+        )
+
+    if isinstance(a, pd.DataFrame):
+        return hash((a.shape, tuple(a.columns)))
+
+    if isinstance(a, pd.Series):
+        return hash(a.shape)
+
+    if isinstance(a, np.ndarray):
+        array_hash = _hash_numeric_array(a)
+        if array_hash is None:
+            array_hash = hash((a.shape, tuple(nested_hash(x) for x in a.ravel())))
+        return array_hash
+
+    if isinstance(a, (str, bytes)):
+        return hash(a)
+
+    if isinstance(a, (Sequence, list, tuple)):
+        return hash(tuple(nested_hash(x) for x in a))
+
+    if isinstance(a, (Mapping, dict)):
+        return hash(frozenset((key, nested_hash(value)) for key, value in a.items()))
+
+    if type(a).__hash__ is object.__hash__:
+        if type(a).__eq__ is not object.__eq__ or hasattr(a, "__cmp__"):
+            raise TypeError(f"`{type(a)}` defines equality but hashes by identity.")
+        # Objects without custom equality are compared by their attributes
+        attributes = get_all_attributes(a)
+        if attributes:
+            return nested_hash(attributes)
+
+    return hash(a)
+
+
+def round_floats(a, decimals):
+    """Returns `a` with all floats rounded to `decimals`.
+
+    Handles floats within numpy arrays, sparse matrices, as well as lists, tuples,
+    and dictionaries. All other data is returned as it is.
+
+    """
+    if isinstance(a, (float, np.floating, complex, np.complexfloating)):
+        return type(a)(np.round(a, decimals))
+
+    if spsp.isspmatrix(a):
+        if a.dtype.kind in "fc":
+            a = a.copy()
+            a.data = np.round(a.data, decimals)
+        return a
+
+    if isinstance(a, np.ndarray):
+        if a.dtype.kind in "fc":
+            return np.round(a, decimals)
+        if a.dtype.kind == "O":
+            rounded = np.empty_like(a)
+            rounded.ravel()[:] = [round_floats(x, decimals) for x in a.ravel()]
+            return rounded
+        return a
+
+    if isinstance(a, (list, tuple)) and type(a) in (list, tuple):
+        return type(a)(round_floats(x, decimals) for x in a)
+
+    if type(a) is dict:
+        return {key: round_floats(value, decimals) for key, value in a.items()}
+
+    return a
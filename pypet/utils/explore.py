@@ -1,11 +1,14 @@
 """Module containing factory functions for parameter exploration"""
 
-import itertools as itools
 import logging
-from collections import OrderedDict
+from collections.abc import Sequence
 
+import numpy as np
 
-def cartesian_product(parameter_dict, combined_parameters=()):
+import pypet.pypetconstants as pypetconstants
+
+
+def cartesian_product(parameter_dict, combined_parameters=(), as_arrays=False):
     """Generates a Cartesian product of the input parameter dictionary.
 
     For example:
@@ -30,7 +33,14 @@ def cartesian_product(parameter_dict, combined_parameters=()):
         >>> print cartesian_product( {'param1': [42.0, 52.5], 'param2':['a', 'b'], 'param3' : [1,2,3]}, ('param3',('param1', 'param2')))
         {param3':[1,1,2,2,3,3],'param1' : [42.0,52.5,42.0,52.5,42.0,52.5], 'param2':['a','b','a','b','a','b']}
 
-    :returns: Dictionary with cartesian product lists.
+    :param as_arrays:
+
+        If values given as numpy arrays should be returned as numpy arrays instead of lists.
+        This avoids creating a python object for every point of large grids.
+
+    :returns:
+
+        Dictionary with cartesian product lists.
 
     """
     if not combined_parameters:
@@ -42,35 +52,58 @@ def cartesian_product(parameter_dict, combined_parameters=()):
         if isinstance(item, str):
             combined_parameters[idx] = (item,)
 
-    iterator_list = []
-    for item_tuple in combined_parameters:
-        inner_iterator_list = [parameter_dict[key] for key in item_tuple]
-        zipped_iterator = zip(*inner_iterator_list)
-        iterator_list.append(zipped_iterator)
+    value_lists = {}
+    for key, values in parameter_dict.items():
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        value_lists[key] = values
 
     result_dict = {}
     for key in parameter_dict:
         result_dict[key] = []
 
-    cartesian_iterator = itools.product(*iterator_list)
+    if not combined_parameters:
+        return result_dict
+
+    # Linked parameters are zipped, so their product dimension is the shortest of them.
+    # The grid of indices varies the last dimension fastest like `itertools.product`.
+    shape = [min(len(value_lists[key]) for key in item_tuple) for item_tuple in combined_parameters]
+    grid = np.indices(shape).reshape(len(shape), -1)
 
-    for cartesian_tuple in cartesian_iterator:
-        for idx, item_tuple in enumerate(combined_parameters):
-            for inneridx, key in enumerate(item_tuple):
-                result_dict[key].append(cartesian_tuple[idx][inneridx])
+    for idx, item_tuple in enumerate(combined_parameters):
+        for key in item_tuple:
+            result_dict[key] = _take(value_lists[key], grid[idx], as_arrays)
 
     return result_dict
 
 
-def find_unique_points(explored_parameters):
+def _take(values, positions, as_arrays):
+    """Picks the values at the given positions, a list stays a list of the very same objects"""
+    if isinstance(values, np.ndarray):
+        taken = values[positions]
+        return taken if as_arrays else list(taken)
+    # Filled one by one so numpy does not unpack values that are sequences themselves
+    object_array = np.empty(len(values), dtype=object)
+    for idx, value in enumerate(values):
+        object_array[idx] = value
+    return object_array[positions].tolist()
+
+
+def find_unique_points(explored_parameters, lazy=False):
     """Takes a list of explored parameters and finds unique parameter combinations.
 
-    If parameter ranges are hashable operates in O(N), otherwise O(N**2).
+    Numeric and hashable parameter ranges are handled in O(N) (or O(N log N) using numpy),
+    otherwise comparisons take O(N**2).
 
     :param explored_parameters:
 
         List of **explored** parameters
 
+    :param lazy:
+
+        If a :class:`~pypet.utils.explore.UniquePoints` sequence should be returned
+        that creates its items on demand instead of a list.
+
     :return:
 
         List of tuples, first entry being the parameter values, second entry a list
@@ -78,31 +111,94 @@ def find_unique_points(explored_parameters):
 
     """
     ranges = [param.f_get_range(copy=False) for param in explored_parameters]
-    zipped_tuples = list(zip(*ranges))
+    if not ranges or len(ranges[0]) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        unique_points = UniquePoints(ranges, empty, empty)
+        return unique_points if lazy else list(unique_points)
+    codes = np.column_stack(
+        [_factorize(param, param_range) for param, param_range in zip(explored_parameters, ranges)]
+    )
+    _, first_positions, inverse = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    # `np.unique` sorts the combinations, but they are returned in order of appearance
+    rank = np.empty(len(first_positions), dtype=np.intp)
+    rank[np.argsort(first_positions)] = np.arange(len(first_positions))
+    combination_of_run = rank[inverse.reshape(-1)]
+    positions = np.argsort(combination_of_run, kind="stable")
+    ends = np.cumsum(np.bincount(combination_of_run))
+    unique_points = UniquePoints(ranges, positions, ends)
+    return unique_points if lazy else list(unique_points)
+
+
+class UniquePoints(Sequence):
+    """Sequence of unique parameter combinations returned by
+    :func:`~pypet.utils.explore.find_unique_points` if `lazy` is `True`.
+
+    Every item is a tuple of the parameter values of a combination and a list of the
+    run positions sharing this combination. Combinations are ordered by their first
+    appearance. Items are created on demand, because for large explorations most of
+    the time would be spent creating millions of small lists otherwise.
+
+    """
+
+    def __init__(self, ranges, positions, ends):
+        self._ranges = ranges
+        self._positions = positions  # Run positions grouped by combination
+        self._ends = ends  # End of the group of every combination in `_positions`
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[idx] for idx in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("UniquePoints index out of range")
+        start = self._ends[item - 1] if item > 0 else 0
+        pos_list = self._positions[start : self._ends[item]].tolist()
+        val_tuple = tuple(param_range[pos_list[0]] for param_range in self._ranges)
+        return val_tuple, pos_list
+
+    def __eq__(self, other):
+        if isinstance(other, (list, UniquePoints)):
+            return len(self) == len(other) and all(x == y for x, y in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<%s with %d combinations>" % (self.__class__.__name__, len(self))
+
+
+def _factorize(param, param_range):
+    """Returns an array of integer codes that are equal for equal values of the range"""
+    if type(param_range[0]) in pypetconstants.PARAMETER_SUPPORTED_DATA:
+        values = np.asarray(param_range)
+        if values.ndim == 1 and values.dtype.kind in "biufc":
+            # NaN is not equal to itself, like in the comparison of the other values
+            return np.unique(values, return_inverse=True, equal_nan=False)[1].reshape(-1)
     try:
-        unique_elements = OrderedDict()
-        for idx, val_tuple in enumerate(zipped_tuples):
-            if val_tuple not in unique_elements:
-                unique_elements[val_tuple] = []
-            unique_elements[val_tuple].append(idx)
-        return list(unique_elements.items())
+        code_dict = {}
+        return np.fromiter(
+            (code_dict.setdefault(value, len(code_dict)) for value in param_range),
+            dtype=np.intp,
+            count=len(param_range),
+        )
     except TypeError:
         logger = logging.getLogger("pypet.find_unique")
         logger.error(
-            "Your parameter entries could not be hashed, now I am sorting slowly in O(N**2)."
+            f"The entries of `{param.v_full_name}` could not be hashed, "
+            "now I am sorting slowly in O(N**2)."
         )
-        unique_elements = []
-        for idx, val_tuple in enumerate(zipped_tuples):
-            matches = False
-            for added_tuple, pos_list in unique_elements:
-                matches = True
-                for idx2, val in enumerate(added_tuple):
-                    if not explored_parameters[idx2]._equal_values(val_tuple[idx2], val):
-                        matches = False
-                        break
-                if matches:
-                    pos_list.append(idx)
+        unique_values = []
+        codes = np.empty(len(param_range), dtype=np.intp)
+        for idx, value in enumerate(param_range):
+            for code, unique_value in enumerate(unique_values):
+                if param._equal_values(value, unique_value):
                     break
-            if not matches:
-                unique_elements.append((val_tuple, [idx]))
-        return unique_elements
+            else:
+                code = len(unique_values)
+                unique_values.append(value)
+            codes[idx] = code
+        return codes
@@ -1,6 +1,6 @@
 """Module containing wrappers for multiprocessing"""
 
-import pickle
+import multiprocessing as multip
 import queue
 from threading import ThreadError
 
@@ -13,15 +13,16 @@ import copy as cp
 import gc
 import os
 import socket
-import sys
 import time
 from collections import deque
+from multiprocessing.connection import wait
 from threading import Thread
 
 import pypet.pypetconstants as pypetconstants
 from pypet.pypetlogging import HasLogger
 from pypet.utils.decorators import retry
 from pypet.utils.helpful_functions import is_ipv6
+from pypet.utils.sharedmemory import dump_shared, load_shared, release_blocks
 
 
 class MultiprocWrapper:
@@ -51,6 +52,89 @@ class MultiprocWrapper:
     def store(self, *args, **kwargs):
         raise NotImplementedError("Implement this!")
 
+    def flush(self):
+        """Waits until all data sent so far has been received, NO-OP by default"""
+        pass
+
+    def pop_metrics(self):
+        """Returns the storage metrics collected since the last call as a dictionary.
+
+        Metrics are reset afterwards. Returns an empty dictionary if the wrapper
+        does not collect any metrics.
+
+        """
+        metrics = getattr(self, "metrics", None)
+        if metrics is None:
+            return {}
+        return metrics.pop()
+
+
+def _get_store_msg(args, kwargs):
+    """Returns the message of a storage request"""
+    if "msg" in kwargs:
+        return kwargs["msg"]
+    return args[0] if args else None
+
+
+class StorageMetrics:
+    """Collects timers and counters of storage operations.
+
+    All metrics are kept in a flat dictionary. Times are measured in seconds,
+    ``bytes_serialized`` counts the bytes pickled by pypet to send data to another process.
+    Stores are timed per message, e.g. ``store_time.SINGLE_RUN`` and ``nstores.SINGLE_RUN``.
+    Metrics starting with ``max_`` keep the maximum, all others are summed up.
+
+    Metrics of different processes or runs can be combined via
+    :func:`~pypet.utils.mpwrappers.StorageMetrics.update`.
+
+    """
+
+    MAX_PREFIX = "max_"
+
+    def __init__(self):
+        self.counters = {}
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.counters!r}>"
+
+    def add(self, name, value=1):
+        """Adds `value` to the metric `name`"""
+        if name.startswith(self.MAX_PREFIX):
+            self.counters[name] = max(self.counters.get(name, value), value)
+        else:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_store_time(self, msg, duration):
+        """Counts a storage request with message `msg` that took `duration` seconds"""
+        self.add(f"nstores.{msg}")
+        self.add(f"store_time.{msg}", duration)
+
+    def update(self, metrics):
+        """Adds all metrics of a dictionary, e.g. returned by another process"""
+        for name, value in metrics.items():
+            self.add(name, value)
+
+    def to_dict(self):
+        """Returns a copy of all metrics"""
+        return self.counters.copy()
+
+    def pop(self):
+        """Returns all metrics and resets them"""
+        counters = self.counters
+        self.counters = {}
+        return counters
+
+    def summary(self):
+        """Returns a human readable summary with one metric per line"""
+        lines = []
+        for name in sorted(self.counters):
+            value = self.counters[name]
+            if isinstance(value, float):
+                lines.append(f"{name}: {value:.4f}")
+            else:
+                lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
 
 class ZMQServer(HasLogger):
     """Generic zmq server"""
@@ -69,10 +153,13 @@ class ZMQServer(HasLogger):
     def _start(self):
         self._logger.info(f"Starting Server at `{self._url}`")
         self._context = zmq.Context()
-        self._socket = self._context.socket(zmq.REP)
+        self._socket = self._context.socket(self._get_socket_type())
         self._socket.ipv6 = is_ipv6(self._url)
         self._socket.bind(self._url)
 
+    def _get_socket_type(self):
+        return zmq.REP
+
     def _close(self):
         self._logger.info("Closing Server")
         self._socket.close()
@@ -80,22 +167,36 @@ class ZMQServer(HasLogger):
 
 
 class LockerServer(ZMQServer):
-    """Manages a database of locks"""
+    """Manages a database of locks.
+
+    Locks can be acquired exclusively (``LOCK``) or shared (``LOCK_SHARED``).
+    Several clients can hold a lock in shared mode at the same time,
+    but no client can hold it exclusively meanwhile. Clients waiting for exclusive
+    access have precedence over new shared requests, so writers are not starved by readers.
+
+    """
 
     LOCK = "LOCK"  # command for locking a lock
+    LOCK_SHARED = "LOCK_SHARED"  # command for locking a lock in shared mode
     RELEASE_ERROR = "RELEASE_ERROR"  # signals unsuccessful attempt to unlock
     MSG_ERROR = "MSG_ERROR"  # signals error in decoding client request
     UNLOCK = "UNLOCK"  # command for unlocking a lock
+    UNLOCK_SHARED = "UNLOCK_SHARED"  # command for unlocking a lock held in shared mode
     RELEASED = "RELEASED"  # signals successful unlocking
     LOCK_ERROR = "LOCK_ERROR"  # signals unsuccessful attempt to lock
     GO = "GO"  # signals successful locking and and allwos continuing of client
     WAIT = "WAIT"  # signals lock is already in use and client has to wait for release
     DELIMITER = ":::"  # delimiter to split messages
     DEFAULT_LOCK = "_DEFAULT_"  # default lock name
+    WRITER_TIMEOUT = 1.0  # waiting writers that stop asking lose their precedence after seconds
 
     def __init__(self, url="tcp://127.0.0.1:7777"):
         super().__init__(url)
         self._locks = {}  # lock DB, format 'lock_name': ('client_id', 'request_id')
+        # shared lock DB, format 'lock_name': {'client_id': ('request_id', lock_time)}
+        self._shared_locks = {}
+        # clients waiting for exclusive locks, format 'lock_name': {'client_id': request_time}
+        self._waiting_writers = {}
 
     def _pre_respond_hook(self, response):
         """Hook that can be used to temper with the server before responding
@@ -110,7 +211,7 @@ class LockerServer(ZMQServer):
     def _lock(self, name, client_id, request_id):
         """Hanldes locking of locks
 
-        If a lock is already locked sends a WAIT command,
+        If a lock is already locked or held in shared mode sends a WAIT command,
         else LOCKs it and sends GO.
 
         Complains if a given client re-locks a lock without releasing it before.
@@ -128,11 +229,114 @@ class LockerServer(ZMQServer):
                 self._logger.warning(response)
                 return response
             else:
+                self._add_waiting_writer(name, client_id)
                 return self.WAIT
         else:
-            self._locks[name] = (client_id, request_id)
+            return self._lock_if_not_shared(name, client_id, request_id)
+
+    def _new_lock_entry(self, client_id, request_id):
+        """Returns the entry of an exclusively acquired lock in the lock DB"""
+        return client_id, request_id
+
+    def _lock_if_not_shared(self, name, client_id, request_id):
+        """Locks a lock that is not held exclusively if it is not held in shared mode either"""
+        readers = self._get_readers(name)
+        if client_id in readers:
+            response = (
+                self.LOCK_ERROR
+                + self.DELIMITER
+                + f"Lock `{name}` is held in shared mode by `{client_id}` and cannot be upgraded "
+                f"(request id `{request_id}`)"
+            )
+            self._logger.warning(response)
+            return response
+        elif readers:
+            self._add_waiting_writer(name, client_id)
+            return self.WAIT
+        else:
+            self._remove_waiting_writer(name, client_id)
+            self._locks[name] = self._new_lock_entry(client_id, request_id)
             return self.GO
 
+    def _add_waiting_writer(self, name, client_id):
+        """Remembers that `client_id` waits for an exclusive lock"""
+        self._waiting_writers.setdefault(name, {})[client_id] = time.time()
+
+    def _remove_waiting_writer(self, name, client_id):
+        writers = self._waiting_writers.get(name)
+        if writers is not None:
+            writers.pop(client_id, None)
+            if not writers:
+                del self._waiting_writers[name]
+
+    def _writer_waiting(self, name):
+        """Checks if a client waits for an exclusive lock.
+
+        Clients that did not ask again within `WRITER_TIMEOUT` are forgotten.
+
+        """
+        writers = self._waiting_writers.get(name)
+        if not writers:
+            return False
+        current_time = time.time()
+        for client_id, request_time in list(writers.items()):
+            if current_time - request_time > self.WRITER_TIMEOUT:
+                del writers[client_id]
+        if not writers:
+            del self._waiting_writers[name]
+            return False
+        return True
+
+    def _get_readers(self, name):
+        """Returns the clients holding a lock in shared mode"""
+        return self._shared_locks.get(name, {})
+
+    def _lock_shared(self, name, client_id, request_id):
+        """Handles locking of locks in shared mode
+
+        If a lock is locked exclusively or a client waits for locking it exclusively,
+        sends a WAIT command, else adds the client to the lock's holders and sends GO.
+
+        Complains if a given client re-locks a lock without releasing it before.
+
+        """
+        readers = self._get_readers(name)
+        if client_id in readers or (name in self._locks and self._locks[name][0] == client_id):
+            response = (
+                self.LOCK_ERROR
+                + self.DELIMITER
+                + f"Re-request of lock `{name}` by `{client_id}` (request id `{request_id}`)"
+            )
+            self._logger.warning(response)
+            return response
+        elif name in self._locks or self._writer_waiting(name):
+            return self.WAIT
+        else:
+            self._shared_locks.setdefault(name, {})[client_id] = (request_id, time.time())
+            return self.GO
+
+    def _unlock_shared(self, name, client_id, request_id):
+        """Handles unlocking of locks held in shared mode
+
+        Complains if the client does not hold the lock in shared mode.
+
+        """
+        readers = self._get_readers(name)
+        if client_id in readers:
+            del readers[client_id]
+            if not readers:
+                del self._shared_locks[name]
+            return self.RELEASED
+        else:
+            response = (
+                self.RELEASE_ERROR
+                + self.DELIMITER
+                + f"Lock `{name}` is not held in shared mode by `{client_id}` "
+                f"(request id `{request_id}`)"
+            )
+            self._logger.error(response)
+            return response
+
     def _unlock(self, name, client_id, request_id):
         """Handles unlocking
 
@@ -191,6 +395,12 @@ class LockerServer(ZMQServer):
                 elif msg == self.UNLOCK:
                     response = self._unlock(name, client_id, request_id)
 
+                elif msg == self.LOCK_SHARED:
+                    response = self._lock_shared(name, client_id, request_id)
+
+                elif msg == self.UNLOCK_SHARED:
+                    response = self._unlock_shared(name, client_id, request_id)
+
                 elif msg == self.PING:
                     response = self.PONG
 
@@ -252,6 +462,7 @@ class TimeOutLockerServer(LockerServer):
             else:
                 current_time = time.time()
                 if current_time - lock_time < self._timeout:
+                    self._add_waiting_writer(name, client_id)
                     return self.WAIT
                 else:
                     response = (
@@ -261,12 +472,60 @@ class TimeOutLockerServer(LockerServer):
                         "timed out"
                     )
                     self._logger.info(response)
+                    self._remove_waiting_writer(name, client_id)
                     self._locks[name] = (client_id, request_id, time.time())
                     self._timeout_locks[(name, other_client_id)] = (request_id, lock_time)
                     return response
         else:
-            self._locks[name] = (client_id, request_id, time.time())
-            return self.GO
+            return self._lock_if_not_shared(name, client_id, request_id)
+
+    def _new_lock_entry(self, client_id, request_id):
+        """Stores the locking time to determine time out"""
+        return client_id, request_id, time.time()
+
+    def _get_readers(self, name):
+        """Returns the clients holding a lock in shared mode, timed out clients are removed"""
+        readers = super()._get_readers(name)
+        current_time = time.time()
+        for client_id, (request_id, lock_time) in list(readers.items()):
+            if current_time - lock_time >= self._timeout:
+                self._logger.info(
+                    f"Shared lock `{name}` by `{client_id}` (old request id `{request_id}`) timed out"
+                )
+                del readers[client_id]
+                self._timeout_locks[(name, client_id)] = (request_id, lock_time)
+        return readers
+
+    def _lock_shared(self, name, client_id, request_id):
+        """Handles locking in shared mode
+
+        An exclusive lock of a different client that timed out is removed first.
+
+        """
+        if name in self._locks:
+            other_client_id, other_request_id, lock_time = self._locks[name]
+            if other_client_id != client_id and time.time() - lock_time >= self._timeout:
+                self._logger.info(
+                    f"Lock `{name}` by `{other_client_id}` (old request id `{other_request_id}`) "
+                    "timed out"
+                )
+                del self._locks[name]
+                self._timeout_locks[(name, other_client_id)] = (other_request_id, lock_time)
+        return super()._lock_shared(name, client_id, request_id)
+
+    def _unlock_shared(self, name, client_id, request_id):
+        """Handles unlocking in shared mode"""
+        if client_id not in self._get_readers(name) and (name, client_id) in self._timeout_locks:
+            other_request_id, lock_time = self._timeout_locks[(name, client_id)]
+            timeout = time.time() - lock_time - self._timeout
+            response = (
+                self.RELEASE_ERROR
+                + self.DELIMITER
+                + f"Shared lock `{name}` timed out {timeout:f} seconds ago (client id `{client_id}`, "
+                f"old request id `{other_request_id}`)"
+            )
+            return response
+        return super()._unlock_shared(name, client_id, request_id)
 
     def _unlock(self, name, client_id, request_id):
         """Handles unlocking"""
@@ -345,10 +604,18 @@ class ReliableClient(HasLogger):
 
         NO-OP if already closed.
 
+        """
+        self._terminate()
+
+    def _terminate(self, confused=False):
+        """Closes socket and terminates context without any further communication.
+
+        If `confused`, messages that were not sent yet are discarded.
+
         """
         if self._context is not None:
             if self._socket is not None:
-                self._close_socket(confused=False)
+                self._close_socket(confused=confused)
             self._context.term()
             self._context = None
             self._poll = None
@@ -383,8 +650,10 @@ class ReliableClient(HasLogger):
 
     def __del__(self):
         # For Python 3.4 to avoid dead-lock due to wrong object clearing
-        # i.e. deleting context before socket
-        self.finalize()
+        # i.e. deleting context before socket.
+        # No data is sent, since the server may not answer during garbage collection
+        # or interpreter shutdown.
+        self._terminate(confused=True)
 
     def _req_rep(self, request):
         """Returns server response on `request_sketch`"""
@@ -465,9 +734,30 @@ class LockerClient(ReliableClient):
         Blocks until lock is available.
 
         """
+        return self._acquire(LockerServer.LOCK)
+
+    def acquire_shared(self):
+        """Acquires lock in shared mode and returns `True`
+
+        Several clients can hold the lock in shared mode at the same time.
+        Blocks while the lock is held exclusively or other clients wait for
+        exclusive access.
+
+        """
+        return self._acquire(LockerServer.LOCK_SHARED)
+
+    def release(self):
+        """Releases lock"""
+        self._release(LockerServer.UNLOCK)
+
+    def release_shared(self):
+        """Releases lock held in shared mode"""
+        self._release(LockerServer.UNLOCK_SHARED)
+
+    def _acquire(self, request):
         self.start(test_connection=False)
         while True:
-            str_response, retries = self._req_rep_retry(LockerServer.LOCK)
+            str_response, retries = self._req_rep_retry(request)
             response = str_response.split(LockerServer.DELIMITER)
             if response[0] == LockerServer.GO:
                 return True
@@ -480,10 +770,9 @@ class LockerClient(ReliableClient):
             else:
                 raise RuntimeError(f"Response `{response}` not understood")
 
-    def release(self):
-        """Releases lock"""
+    def _release(self, request):
         # self.start(test_connection=False)
-        str_response, retries = self._req_rep_retry(LockerServer.UNLOCK)
+        str_response, retries = self._req_rep_retry(request)
         response = str_response.split(LockerServer.DELIMITER)
         if response[0] == LockerServer.RELEASED:
             pass  # Everything is fine
@@ -499,13 +788,23 @@ class LockerClient(ReliableClient):
 
 
 class QueuingServerMessageListener(ZMQServer):
-    """Manages the listening requests"""
+    """Manages the listening requests.
+
+    Uses a ROUTER socket, so many clients can send data without waiting for each
+    other. Flow control is credit based: Clients may have a limited number of
+    unacknowledged items in flight. Received items are put on the queue right away,
+    but acknowledged only if the queue holds less than `queue_maxsize` items.
+    Accordingly, clients stop sending if the storage process cannot keep up.
+    Meanwhile, the waiting clients regularly receive `BUSY` replies, so they can
+    tell a busy server from one that is offline.
+
+    """
 
-    SPACE = "SPACE"  # for space in the queue
     DATA = "DATA"  # for sending data
-    SPACE_AVAILABLE = "SPACE_AVAILABLE"
-    SPACE_NOT_AVAILABLE = "SPACE_NOT_AVAILABLE"
-    STORING = "STORING"
+    ACK = "ACK"  # acknowledges received data and returns credits to the client
+    BUSY = "BUSY"  # tells clients waiting for credits that the server is still alive
+    POLL_TIMEOUT = 10  # Time in milliseconds between checks for free space in the queue
+    KEEP_ALIVE = 1.0  # Time in seconds between `BUSY` replies while the queue is full
 
     def __init__(self, url, queue, queue_maxsize):
         super().__init__(url)
@@ -513,52 +812,82 @@ class QueuingServerMessageListener(ZMQServer):
         if queue_maxsize == 0:
             queue_maxsize = float("inf")
         self.queue_maxsize = queue_maxsize
+        self._last_keep_alive = 0.0
 
-    def listen(self):
-        """Handles listening requests from the client.
+    def _get_socket_type(self):
+        return zmq.ROUTER
+
+    def _reply(self, identity, *frames):
+        self._socket.send_multipart([identity] + [str(frame).encode() for frame in frames])
 
-        There are 4 types of requests:
+    def _put_items(self, frames):
+        """Reconstructs all items of a batch and puts them on the queue"""
+        nitems = int(frames[0].bytes)
+        pos = 1
+        for _ in range(nitems):
+            nbuffers = int(frames[pos].bytes)
+            dump = frames[pos + 1].buffer
+            buffers = [frame.buffer for frame in frames[pos + 2 : pos + 2 + nbuffers]]
+            pos += 2 + nbuffers
+            data, _ = load_shared(dump, buffers)
+            self.queue.put(data)
+        return nitems
 
-        1- Check space in the queue
-        2- Tests the socket
-        3- If there is a space, it sends data
-        4- after data is sent, puts it to queue for storing
+    def _send_acks(self, unacknowledged):
+        """Acknowledges received items as long as there is space in the queue.
+
+        Otherwise, the clients waiting for acknowledgements are sent `BUSY`
+        every `KEEP_ALIVE` seconds.
 
         """
-        count = 0
-        self._start()
-        while True:
-            result = self._socket.recv_pyobj()
+        if not unacknowledged:
+            return
+        if self.queue.qsize() < self.queue_maxsize:
+            for identity, nitems in unacknowledged:
+                self._reply(identity, self.ACK, nitems)
+            unacknowledged.clear()
+        elif time.time() - self._last_keep_alive >= self.KEEP_ALIVE:
+            for identity in {identity for identity, _ in unacknowledged}:
+                self._reply(identity, self.BUSY)
+            self._last_keep_alive = time.time()
 
-            if isinstance(result, tuple):
-                request, data = result
-            else:
-                request = result
-                data = None
+    def listen(self):
+        """Handles listening requests from the clients.
 
-            if request == self.SPACE:
-                if self.queue.qsize() + count < self.queue_maxsize:
-                    self._socket.send_string(self.SPACE_AVAILABLE)
-                    count += 1
-                else:
-                    self._socket.send_string(self.SPACE_NOT_AVAILABLE)
+        There are 3 types of requests:
 
-            elif request == self.PING:
-                self._socket.send_string(self.PONG)
+        1- Tests the socket
+        2- Sends a batch of data, which is acknowledged once there is space in the queue
+        3- Signals that everything is done
 
-            elif request == self.DATA:
-                self._socket.send_string(self.STORING)
-                self.queue.put(data)
-                count -= 1
+        """
+        unacknowledged = deque()
+        self._start()
+        while True:
+            timeout = self.POLL_TIMEOUT if unacknowledged else None
+            if self._socket.poll(timeout):
+                frames = self._socket.recv_multipart(copy=False)
+                identity = frames[0].bytes
+                request = frames[1].bytes.decode()
+
+                if request == self.PING:
+                    self._reply(identity, self.PONG)
+
+                elif request == self.DATA:
+                    nitems = self._put_items(frames[2:])
+                    unacknowledged.append((identity, nitems))
+
+                elif request == self.DONE:
+                    self._send_acks(unacknowledged)
+                    self._reply(identity, ZMQServer.CLOSED)
+                    self.queue.put(("DONE", [], {}))
+                    self._close()
+                    break
 
-            elif request == self.DONE:
-                self._socket.send_string(ZMQServer.CLOSED)
-                self.queue.put(("DONE", [], {}))
-                self._close()
-                break
+                else:
+                    raise RuntimeError(f"I did not understand your request {request}")
 
-            else:
-                raise RuntimeError(f"I did not understand your request {request}")
+            self._send_acks(unacknowledged)
 
 
 class QueuingServer(HasLogger):
@@ -569,15 +898,18 @@ class QueuingServer(HasLogger):
         self._storage_service = storage_service
         self._queue_maxsize = queue_maxsize
         self._gc_interval = gc_interval
+        self.metrics = StorageMetrics()
 
     def run(self):
-        main_queue = queue.Queue(maxsize=self._queue_maxsize)
+        # The listener never blocks, it limits the queue size by delaying acknowledgements
+        main_queue = queue.Queue()
         server_message_listener = QueuingServerMessageListener(
             self._url, main_queue, self._queue_maxsize
         )
         storage_writer = QueueStorageServiceWriter(
             self._storage_service, main_queue, self._gc_interval
         )
+        storage_writer.metrics = self.metrics
 
         server_queue = Thread(target=server_message_listener.listen, args=())
         server_queue.start()
@@ -587,30 +919,149 @@ class QueuingServer(HasLogger):
 
 
 class QueuingClient(ReliableClient):
-    """Manages the returning requests"""
+    """Sends data to the :class:`~pypet.utils.mpwrappers.QueuingServer`.
 
-    def put(self, data, block=True):
-        """If there is space it sends data to server
+    Uses a DEALER socket and does not wait for a reply to every item.
+    Items are sent in batches as long as there are less than `max_in_flight`
+    items unacknowledged by the server, otherwise they are kept until
+    the server returns credits. If more than `max_in_flight` items are waiting,
+    :func:`~pypet.utils.mpwrappers.QueuingClient.put` blocks.
+    Items are sent without copying their out-of-band buffers, hence, they are
+    referenced until acknowledged and must not be modified in the meantime.
+
+    Call :func:`~pypet.utils.mpwrappers.QueuingClient.flush` to wait until all data has
+    been received by the server.
+
+    Waiting for credits may take arbitrarily long as long as the server keeps
+    replying `BUSY`. Only if the server stays silent for `TIMEOUT` times `RETRIES`
+    milliseconds, it is considered to be offline.
+
+    """
+
+    def __init__(self, url, max_in_flight=100):
+        super().__init__(url)
+        self.max_in_flight = max_in_flight
+        self._batch = []
+        self._in_flight = deque()  # Items sent, but not yet acknowledged by the server
+        self.metrics = StorageMetrics()
+
+    def __getstate__(self):
+        result_dict = super().__getstate__()
+        # Pending data is not sent by copies
+        result_dict["_batch"] = []
+        result_dict["_in_flight"] = deque()
+        result_dict["metrics"] = StorageMetrics()
+        return result_dict
+
+    def start(self, test_connection=True):
+        if self._context is None:
+            # Data of a previous connection, e.g. before forking, is not ours to send
+            self._batch = []
+            self._in_flight = deque()
+        super().start(test_connection)
 
-        If no space in the queue
+    def _start_socket(self):
+        self._socket = self._context.socket(zmq.DEALER)
+        self._socket.ipv6 = is_ipv6(self.url)
+        self._socket.connect(self.url)
+        self._poll.register(self._socket, zmq.POLLIN)
 
-        It returns the request in every 10 millisecond
+    def _receive_replies(self, block=False):
+        """Handles all replies of the server and returns the ones that are not acknowledgements
+        or keep-alive messages.
 
-        until there will be space in the queue.
+        If `block`, waits for at least one reply.
 
         """
+        replies = []
+        timeout = self.TIMEOUT * self.RETRIES if block else 0
+        received = False
+        while self._socket.poll(timeout):
+            frames = self._socket.recv_multipart()
+            reply = frames[0].decode()
+            if reply == QueuingServerMessageListener.ACK:
+                for _ in range(int(frames[1])):
+                    self._in_flight.popleft()
+            elif reply == QueuingServerMessageListener.BUSY:
+                pass  # The server is alive, but there is no space in its queue yet
+            else:
+                replies.append(reply)
+            received = True
+            timeout = 0
+        if block and not received:
+            raise RuntimeError("Server seems to be offline!")
+        return replies
+
+    def _send_batch(self):
+        """Sends as many waiting items as the credits allow"""
+        nitems = min(self.max_in_flight - len(self._in_flight), len(self._batch))
+        if nitems <= 0:
+            return
+        frames = [QueuingServerMessageListener.DATA.encode(), str(nitems).encode()]
+        for item_frames in self._batch[:nitems]:
+            frames.append(str(len(item_frames) - 1).encode())
+            frames.extend(item_frames)
+        self._socket.send_multipart(frames, copy=False)
+        self._in_flight.extend(self._batch[:nitems])
+        del self._batch[:nitems]
 
+    def put(self, data, block=True):
+        """Sends data to the server if there are enough credits, otherwise queues it.
+
+        Blocks if more than `max_in_flight` items are waiting for credits.
+        If not `block`, raises :class:`queue.Full` instead and `data` is not sent.
+
+        """
         self.start(test_connection=False)
+        if not block:
+            self._receive_replies()
+            self._send_batch()
+            if len(self._batch) + 1 >= self.max_in_flight:
+                raise queue.Full("Too many items are waiting for credits of the server.")
+        dump, buffers, _ = dump_shared(data)
+        # The buffers reference `data`, which is kept alive until acknowledged
+        self._batch.append([dump] + buffers)
+        self.metrics.add("bytes_serialized", len(dump) + sum(len(buffer) for buffer in buffers))
+        self._receive_replies()
+        self._send_batch()
+        if len(self._batch) >= self.max_in_flight:
+            start = time.perf_counter()
+            while len(self._batch) >= self.max_in_flight:
+                self._receive_replies(block=True)
+                self._send_batch()
+            self.metrics.add("send_time", time.perf_counter() - start)
+
+    def flush(self):
+        """Waits until all data has been received by the server"""
+        if self._context is None:
+            return
+        start = time.perf_counter()
+        self._send_batch()
+        while self._batch or self._in_flight:
+            self._receive_replies(block=True)
+            self._send_batch()
+        self.metrics.add("nflushes")
+        self.metrics.add("flush_time", time.perf_counter() - start)
+
+    def _req_rep(self, request):
+        """Sends `request` and waits for the server's response"""
+        self._socket.send_multipart([request.encode()])
         while True:
-            response = self._req_rep(QueuingServerMessageListener.SPACE)
-            if response == QueuingServerMessageListener.SPACE_AVAILABLE:
-                self._req_rep((QueuingServerMessageListener.DATA, data))
-                break
-            else:
-                time.sleep(0.01)
+            replies = self._receive_replies(block=True)
+            if replies:
+                return replies[0]
 
-    def _send_request(self, request):
-        return self._socket.send_pyobj(request)
+    def send_done(self):
+        """Sends all data and notifies the Server to shutdown"""
+        self.start(test_connection=False)
+        self.flush()
+        super().send_done()
+
+    def finalize(self):
+        """Sends all remaining data, closes socket and terminates context"""
+        if self._context is not None and self._socket is not None:
+            self.flush()
+        super().finalize()
 
 
 class ForkDetector(HasLogger):
@@ -641,8 +1092,8 @@ class ForkAwareQueuingClient(QueuingClient, ForkDetector):
 
     """
 
-    def __init__(self, url="tcp://127.0.0.1:22334"):
-        super().__init__(url)
+    def __init__(self, url="tcp://127.0.0.1:22334", max_in_flight=100):
+        super().__init__(url, max_in_flight)
         self._pid = None
 
     def __getstate__(self):
@@ -654,6 +1105,11 @@ class ForkAwareQueuingClient(QueuingClient, ForkDetector):
         self._detect_fork()
         super().start(test_connection)
 
+    def finalize(self):
+        """Checks for forking to not send data of the parent process"""
+        self._detect_fork()
+        super().finalize()
+
 
 class ForkAwareLockerClient(LockerClient, ForkDetector):
     """Locker Client that can detect forking of processes.
@@ -682,15 +1138,20 @@ class QueueStorageServiceSender(MultiprocWrapper, HasLogger):
     original storage service.
 
     All storage requests are send over a queue to the process running the
-    :class:`~pypet.storageservice.QdebugueueStorageServiceWriter`.
+    :class:`~pypet.storageservice.QueueStorageServiceWriter`.
+
+    If ``shared_memory_threshold`` is not ``None``, numpy arrays with at least
+    this many bytes are placed into shared memory instead of being sent over the queue.
 
     Does not support loading of data!
 
     """
 
-    def __init__(self, storage_queue=None):
+    def __init__(self, storage_queue=None, shared_memory_threshold=None):
         self.queue = storage_queue
         self.pickle_queue = True
+        self.shared_memory_threshold = shared_memory_threshold
+        self.metrics = StorageMetrics()
         self._set_logger()
 
     def __getstate__(self):
@@ -711,8 +1172,21 @@ class QueueStorageServiceSender(MultiprocWrapper, HasLogger):
         """Puts data on queue"""
         old = self.pickle_queue
         self.pickle_queue = False
+        pickler = None
+        if self.shared_memory_threshold is not None:
+            # Large arrays are put into shared memory, only the rest travels over the queue
+            # The queue pickles the message again, so buffers cannot stay out-of-band
+            dump, _, pickler = dump_shared(to_put, self.shared_memory_threshold, out_of_band=False)
+            self.metrics.add("bytes_serialized", len(dump))
+            to_put = ("SHARED", [dump], {})
         try:
+            start = time.perf_counter()
             self.queue.put(to_put, block=True)
+            self.metrics.add("send_time", time.perf_counter() - start)
+        except Exception:
+            if pickler is not None:
+                pickler.unlink_blocks()
+            raise
         finally:
             self.pickle_queue = old
 
@@ -722,12 +1196,29 @@ class QueueStorageServiceSender(MultiprocWrapper, HasLogger):
         Note that the queue will no longer be pickled if the Sender is pickled.
 
         """
+        start = time.perf_counter()
         self._put_on_queue(("STORE", args, kwargs))
+        self.metrics.add_store_time(_get_store_msg(args, kwargs), time.perf_counter() - start)
 
     def send_done(self):
         """Signals the writer that it can stop listening to the queue"""
         self._put_on_queue(("DONE", [], {}))
 
+    def flush(self):
+        """Waits until all data has been received, in case the queue sends data asynchronously"""
+        if hasattr(self.queue, "flush"):
+            self.queue.flush()
+
+    def pop_metrics(self):
+        """Returns the metrics of the sender and, if available, of the queue"""
+        metrics = self.metrics.pop()
+        if hasattr(self.queue, "metrics"):
+            queue_metrics = StorageMetrics()
+            queue_metrics.update(metrics)
+            queue_metrics.update(self.queue.metrics.pop())
+            metrics = queue_metrics.pop()
+        return metrics
+
 
 class LockAcquisition(HasLogger):
     """Abstract class to allow lock acquisition and release.
@@ -742,7 +1233,16 @@ class LockAcquisition(HasLogger):
     @retry(9, TypeError, 0.01, "pypet.retry")
     def acquire_lock(self):
         if not self.is_locked:
+            start = time.perf_counter()
             self.is_locked = self.lock.acquire()
+            self._add_lock_wait(start)
+
+    def _add_lock_wait(self, start):
+        """Counts the time waited for a lock since `start`"""
+        metrics = getattr(self, "metrics", None)
+        if metrics is not None:
+            metrics.add("nlocks")
+            metrics.add("lock_wait_time", time.perf_counter() - start)
 
     @retry(9, TypeError, 0.01, "pypet.retry")
     def release_lock(self):
@@ -757,17 +1257,63 @@ class LockAcquisition(HasLogger):
 
 
 class PipeStorageServiceSender(MultiprocWrapper, LockAcquisition):
-    def __init__(self, storage_connection=None, lock=None):
-        self.conn = storage_connection
-        self.lock = lock
+    """For multiprocessing with :const:`~pypet.pypetconstants.WRAP_MODE_PIPE`, sends
+    data over pipes to a :class:`~pypet.utils.mpwrappers.PipeStorageServiceWriter`.
+
+    :param storage_connection:
+
+        Sending end of a pipe or a list of sending ends of several pipes.
+
+    :param lock:
+
+        Lock or list of locks, one per pipe, to protect pipes shared by several processes.
+
+    :param pipe_counter:
+
+        Shared counter (e.g. ``multiprocessing.Value('i', 0)``) used by every
+        process to claim its own pipe. If several pipes are given, each process
+        sends on the pipe it claimed first. Thus, as long as there are not more
+        processes than pipes, locks are never contended.
+
+    :param shared_memory_threshold:
+
+        Numpy arrays with at least this many bytes are placed into shared memory
+        instead of being sent over the pipe. ``None`` means never.
+
+    Data is streamed in chunks without waiting for acknowledgements,
+    backpressure is provided by the pipes themselves and the writer's buffer.
+
+    """
+
+    CHUNKSIZE = 20000000  # chunks with size 20 MB
+
+    def __init__(
+        self, storage_connection=None, lock=None, pipe_counter=None, shared_memory_threshold=None
+    ):
+        if storage_connection is not None and not isinstance(storage_connection, (list, tuple)):
+            storage_connection = [storage_connection]
+        if lock is not None and not isinstance(lock, (list, tuple)):
+            lock = [lock] * (len(storage_connection) if storage_connection else 1)
+        self.conns = storage_connection
+        self.locks = lock
+        self.pipe_counter = pipe_counter
+        self.shared_memory_threshold = shared_memory_threshold
+        self.conn = None
+        self.lock = None
         self.is_locked = False
+        self._pid = None
+        self.metrics = StorageMetrics()
         self._set_logger()
 
     def __getstate__(self):
         # result = super().__getstate__()
         result = self.__dict__.copy()
+        result["conns"] = None
+        result["locks"] = None
+        result["pipe_counter"] = None
         result["conn"] = None
         result["lock"] = None
+        result["_pid"] = None
         return result
 
     def load(self, *args, **kwargs):
@@ -777,61 +1323,100 @@ class PipeStorageServiceSender(MultiprocWrapper, LockAcquisition):
             "wrapping."
         )
 
-    @retry(9, Exception, 0.01, "pypet.retry")
+    def _claim_pipe(self):
+        """Picks the pipe of the current process, a new one is claimed after forking"""
+        current_pid = os.getpid()
+        if not self.conns or current_pid == self._pid:
+            return
+        if self.pipe_counter is None:
+            index = 0
+        else:
+            with self.pipe_counter.get_lock():
+                index = self.pipe_counter.value
+                self.pipe_counter.value += 1
+        index %= len(self.conns)
+        self.conn = self.conns[index]
+        self.lock = self.locks[index]
+        self.is_locked = False
+        self._pid = current_pid
+        self._logger.debug(f"Process `{current_pid}` sends data over pipe {index}.")
+
     def _put_on_pipe(self, to_put):
-        """Puts data on queue"""
+        """Puts data on pipe.
+
+        Sending is not retried, because a partially sent frame cannot be taken back and
+        a new header in the middle of it would corrupt the writer's stream.
+
+        """
+        self._claim_pipe()
+        put_dump, buffers, pickler = dump_shared(to_put, self.shared_memory_threshold)
         self.acquire_lock()
-        self._send_chunks(to_put)
-        self.release_lock()
+        try:
+            self._send_chunks(put_dump, buffers)
+        except Exception:
+            if pickler is not None:
+                pickler.unlink_blocks()
+            raise
+        finally:
+            self.release_lock()
 
     def _make_chunk_iterator(self, to_chunk, chunksize):
         return (to_chunk[i : i + chunksize] for i in range(0, len(to_chunk), chunksize))
 
-    def _send_chunks(self, to_put):
-        put_dump = pickle.dumps(to_put)
-        data_size = sys.getsizeof(put_dump)
-        nchunks = data_size / 20000000.0  # chunks with size 20 MB
-        chunksize = int(len(put_dump) / nchunks)
-        chunk_iterator = self._make_chunk_iterator(put_dump, chunksize)
-        for chunk in chunk_iterator:
-            # print('S: sending False')
-            self.conn.send(False)
-            # print('S: sent False')
-            # print('S: sending chunk')
+    def _send_chunks(self, put_dump, buffers):
+        """Sends a header followed by the chunks of the dump and the out-of-band buffers.
+
+        The header contains the number of chunks and the sizes of the buffers.
+
+        """
+        put_dump = memoryview(put_dump)
+        nchunks = (len(put_dump) + self.CHUNKSIZE - 1) // self.CHUNKSIZE
+        self.metrics.add("bytes_serialized", len(put_dump) + sum(b.nbytes for b in buffers))
+        start = time.perf_counter()
+        self.conn.send((nchunks, [buffer.nbytes for buffer in buffers]))
+        for chunk in self._make_chunk_iterator(put_dump, self.CHUNKSIZE):
             self.conn.send_bytes(chunk)
-            # print(f'S: sent chunk {chunk[0:10]}')
-            # print('S: recv signal')
-            self.conn.recv()  # wait for signal that message was received
-            # print('S: read signal')
-        # print('S: sending True')
-        self.conn.send(True)
-        # print('S: sent True')
-        # print('S: recving last signal')
-        self.conn.recv()  # wait for signal that message was received
-        # print('S: read last signal')
-        # print('S; DONE SENDING data')
+        for buffer in buffers:
+            self.conn.send_bytes(buffer)
+        self.metrics.add("send_time", time.perf_counter() - start)
 
     def store(self, *args, **kwargs):
-        """Puts data to store on queue.
+        """Puts data to store on pipe.
 
-        Note that the queue will no longer be pickled if the Sender is pickled.
+        Note that the pipe will no longer be pickled if the Sender is pickled.
 
         """
+        start = time.perf_counter()
         self._put_on_pipe(("STORE", args, kwargs))
+        self.metrics.add_store_time(_get_store_msg(args, kwargs), time.perf_counter() - start)
 
     def send_done(self):
-        """Signals the writer that it can stop listening to the queue"""
+        """Signals the writer that it can stop listening to the pipes"""
         self._put_on_pipe(("DONE", [], {}))
 
 
 class StorageServiceDataHandler(HasLogger):
-    """Class that can store data via a storage service, needs to be sub-classed to receive data"""
+    """Class that can store data via a storage service, needs to be sub-classed to receive data.
 
-    def __init__(self, storage_service, gc_interval=None):
+    All messages that are available at once are handled as a batch. Storage requests of a batch
+    are grouped by trajectory and stored with a single flush per trajectory.
+
+    """
+
+    def __init__(self, storage_service, gc_interval=None, max_batch_size=100):
         self._storage_service = storage_service
         self._trajectory_name = ""
         self.gc_interval = gc_interval
         self.operation_counter = 0
+        if not max_batch_size:
+            # no maximum batch size
+            max_batch_size = float("inf")
+        self.max_batch_size = max_batch_size
+        self.batch_counter = 0
+        self.largest_batch = 0
+        self.largest_queue_depth = 0
+        self.metrics = StorageMetrics()
+        self._shared_blocks = []
         self._set_logger()
 
     def __repr__(self):
@@ -853,67 +1438,159 @@ class StorageServiceDataHandler(HasLogger):
             self._logger.debug(f"Garbage Collection: Found {collected} unreachable items.")
         self.operation_counter += 1
 
-    def _handle_data(self, msg, args, kwargs):
-        """Handles data and returns `True` or `False` if everything is done."""
+    def _group_batch(self, batch):
+        """Sorts the storage requests of a batch by trajectory.
+
+        Returns a dictionary with trajectory names as keys and lists of
+        `(store_msg, stuff_to_store, args, kwargs)` tuples as values as well as
+        `True` or `False` if everything is done.
+
+        """
         stop = False
-        try:
-            if msg == "DONE":
-                stop = True
-            elif msg == "STORE":
-                if "msg" in kwargs:
-                    store_msg = kwargs.pop("msg")
-                else:
-                    store_msg = args[0]
-                    args = args[1:]
-                if "stuff_to_store" in kwargs:
-                    stuff_to_store = kwargs.pop("stuff_to_store")
+        # The currently opened trajectory comes first to avoid reopening the file
+        grouped = {self._trajectory_name: []}
+        for msg, args, kwargs in batch:
+            try:
+                if msg == "DONE":
+                    stop = True
+                elif msg == "STORE":
+                    if "msg" in kwargs:
+                        store_msg = kwargs.pop("msg")
+                    else:
+                        store_msg = args[0]
+                        args = args[1:]
+                    if "stuff_to_store" in kwargs:
+                        stuff_to_store = kwargs.pop("stuff_to_store")
+                    else:
+                        stuff_to_store = args[0]
+                        args = args[1:]
+                    trajectory_name = kwargs["trajectory_name"]
+                    if trajectory_name not in grouped:
+                        grouped[trajectory_name] = []
+                    grouped[trajectory_name].append((store_msg, stuff_to_store, args, kwargs))
                 else:
-                    stuff_to_store = args[0]
-                    args = args[1:]
-                trajectory_name = kwargs["trajectory_name"]
-                if self._trajectory_name != trajectory_name:
-                    if self._storage_service.is_open:
-                        self._close_file()
-                    self._trajectory_name = trajectory_name
-                    self._open_file()
-                self._storage_service.store(store_msg, stuff_to_store, *args, **kwargs)
-                self._storage_service.store(pypetconstants.FLUSH, None)
+                    raise RuntimeError(
+                        "You queued something that was not "
+                        "intended to be queued. I did not understand message "
+                        f"`{msg}`."
+                    )
+            except Exception:
+                self._logger.exception("ERROR occurred during storing!")
+        return grouped, stop
+
+    def _store_requests(self, trajectory_name, requests):
+        """Stores all requests belonging to a single trajectory and flushes once"""
+        try:
+            if self._trajectory_name != trajectory_name:
+                if self._storage_service.is_open:
+                    self._close_file()
+                self._trajectory_name = trajectory_name
+                self._open_file()
+            for store_msg, stuff_to_store, args, kwargs in requests:
+                start = time.perf_counter()
+                try:
+                    self._storage_service.store(store_msg, stuff_to_store, *args, **kwargs)
+                except Exception:
+                    self._logger.exception("ERROR occurred during storing!")
+                    time.sleep(0.01)
+                self.metrics.add_store_time(store_msg, time.perf_counter() - start)
                 self._check_and_collect_garbage()
-            else:
-                raise RuntimeError(
-                    "You queued something that was not "
-                    "intended to be queued. I did not understand message "
-                    f"`{msg}`."
-                )
+            start = time.perf_counter()
+            self._storage_service.store(pypetconstants.FLUSH, None)
+            self.metrics.add("nflushes")
+            self.metrics.add("flush_time", time.perf_counter() - start)
         except Exception:
             self._logger.exception("ERROR occurred during storing!")
             time.sleep(0.01)
             pass  # We don't want to kill the queue process in case of an error
 
+    def _load_shared(self, dump, buffers=()):
+        """Unpickles data whose arrays may reside in shared memory"""
+        data, blocks = load_shared(dump, buffers)
+        self._shared_blocks.extend(blocks)
+        return data
+
+    def _unpack_shared(self, data):
+        """Reconstructs messages that were sent with shared memory arrays"""
+        if data is not None and data[0] == "SHARED":
+            data = self._load_shared(*data[1])
+        return data
+
+    def _release_shared_memory(self):
+        """Frees all shared memory blocks of data that has been stored"""
+        for name in release_blocks(self._shared_blocks):
+            self._logger.debug(f"Shared memory block `{name}` is still in use.")
+        self._shared_blocks = []
+
+    def _handle_batch(self, batch):
+        """Handles a batch of messages and returns `True` or `False` if everything is done."""
+        grouped, stop = self._group_batch(batch)
+        for trajectory_name, requests in grouped.items():
+            if requests:
+                self._store_requests(trajectory_name, requests)
         return stop
 
+    def _receive_batch(self):
+        """Waits for the next message and returns it together with all others available"""
+        batch = [self._receive_data()]
+        while len(batch) < self.max_batch_size:
+            data = self._receive_available_data()
+            if data is None:
+                break
+            batch.append(data)
+        queue_depth = self._get_queue_depth()
+        self.batch_counter += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.metrics.add("nbatches")
+        self.metrics.add("max_batch_size", len(batch))
+        if queue_depth is not None:
+            self.largest_queue_depth = max(self.largest_queue_depth, queue_depth)
+            self.metrics.add("queue_depth", queue_depth)
+            self.metrics.add("max_queue_depth", queue_depth)
+        self._logger.debug(
+            f"Received batch {self.batch_counter} with {len(batch)} messages, "
+            f"{queue_depth} messages are still waiting."
+        )
+        return batch
+
     def run(self):
         """Starts listening to the queue."""
         try:
             while True:
-                msg, args, kwargs = self._receive_data()
-                stop = self._handle_data(msg, args, kwargs)
+                batch = self._receive_batch()
+                stop = self._handle_batch(batch)
+                del batch
+                self._release_shared_memory()
                 if stop:
                     break
         finally:
+            self._release_shared_memory()
             if self._storage_service.is_open:
                 self._close_file()
             self._trajectory_name = ""
+            self._logger.info(
+                f"Stored {self.operation_counter} items in {self.batch_counter} batches, "
+                f"the largest batch contained {self.largest_batch} messages and at most "
+                f"{self.largest_queue_depth} messages were waiting."
+            )
 
     def _receive_data(self):
         raise NotImplementedError("Implement this!")
 
+    def _receive_available_data(self):
+        """Returns the next message if it is available right away, otherwise `None`"""
+        return None
+
+    def _get_queue_depth(self):
+        """Returns the number of messages waiting or `None` if unknown"""
+        return None
+
 
 class QueueStorageServiceWriter(StorageServiceDataHandler):
     """Wrapper class that listens to the queue and stores queue items via the storage service."""
 
-    def __init__(self, storage_service, storage_queue, gc_interval=None):
-        super().__init__(storage_service, gc_interval=gc_interval)
+    def __init__(self, storage_service, storage_queue, gc_interval=None, max_batch_size=100):
+        super().__init__(storage_service, gc_interval=gc_interval, max_batch_size=max_batch_size)
         self.queue = storage_queue
 
     @retry(9, Exception, 0.01, "pypet.retry")
@@ -922,59 +1599,229 @@ class QueueStorageServiceWriter(StorageServiceDataHandler):
         result = self.queue.get(block=True)
         if hasattr(self.queue, "task_done"):
             self.queue.task_done()
-        return result
+        return self._unpack_shared(result)
+
+    def _receive_available_data(self):
+        """Gets data from queue without waiting"""
+        try:
+            result = self.queue.get(block=False)
+        except queue.Empty:
+            return None
+        if hasattr(self.queue, "task_done"):
+            self.queue.task_done()
+        return self._unpack_shared(result)
+
+    def _get_queue_depth(self):
+        try:
+            return self.queue.qsize()
+        except NotImplementedError:
+            # Not available on all platforms
+            return None
 
 
 class PipeStorageServiceWriter(StorageServiceDataHandler):
-    """Wrapper class that listens to the queue and stores queue items via the storage service."""
+    """Wrapper class that listens to pipes and stores received items via the storage service.
 
-    def __init__(self, storage_service, storage_connection, max_buffer_size=10, gc_interval=None):
-        super().__init__(storage_service, gc_interval=gc_interval)
-        self.conn = storage_connection
-        if max_buffer_size == 0:
+    Several pipes are multiplexed with :func:`multiprocessing.connection.wait`.
+    Received data is buffered until ``max_buffer_bytes`` (size of the pickled data)
+    are reached, afterwards no more data is read from the pipes until the buffer
+    has been handed over to the storage service. ``0`` means infinite.
+
+    """
+
+    def __init__(
+        self,
+        storage_service,
+        storage_connection,
+        max_buffer_bytes=100000000,
+        gc_interval=None,
+        max_batch_size=100,
+    ):
+        super().__init__(storage_service, gc_interval=gc_interval, max_batch_size=max_batch_size)
+        if not isinstance(storage_connection, (list, tuple)):
+            storage_connection = [storage_connection]
+        self.conns = list(storage_connection)
+        if not max_buffer_bytes:
             # no maximum buffer size
-            max_buffer_size = float("inf")
-        self.max_size = max_buffer_size
+            max_buffer_bytes = float("inf")
+        self.max_buffer_bytes = max_buffer_bytes
+        self.buffered_bytes = 0
+        self.largest_buffered_bytes = 0
         self._buffer = deque()
+        self._done = None
         self._set_logger()
 
-    def _read_chunks(self):
-        chunks = []
-        stop = False
-        while not stop:
-            # print('W: recving stop')
-            stop = self.conn.recv()
-            # print(f'W: read stop = {stop}')
-            if not stop:
-                # print('W: recving chunk')
-                chunk = self.conn.recv_bytes()
-                chunks.append(chunk)
-                # print('W: read chunk')
-            # print('W: sending True')
-            self.conn.send(True)
-            # print('W: sent True')
-        # print('W: reconstructing data')
+    def _read_chunks(self, conn):
+        """Reads a single message from a pipe and returns its size and the data"""
+        nchunks, buffer_sizes = conn.recv()
+        chunks = [conn.recv_bytes() for _ in range(nchunks)]
+        buffers = []
+        for buffer_size in buffer_sizes:
+            # Writable buffers, so arrays can be reconstructed without copying
+            buffer = bytearray(buffer_size)
+            conn.recv_bytes_into(buffer)
+            buffers.append(buffer)
+        nbytes = sum(len(chunk) for chunk in chunks) + sum(buffer_sizes)
         to_load = b"".join(chunks)
         del chunks  # free unnecessary memory
         try:
-            data = pickle.loads(to_load)
+            data = self._load_shared(to_load, buffers)
         except Exception:
             # We don't want to crash the storage service if reconstruction
             # due to errors fails
             self._logger.exception("Could not reconstruct pickled data.")
             data = None
+        return nbytes, data
+
+    def _fill_buffer(self, timeout=0):
+        """Reads data from all pipes that are ready until the buffer is full.
+
+        Waits at most `timeout` seconds for the first data, `None` waits forever.
+        Returns `True` if any data was read.
+
+        """
+        received = False
+        while self.conns and self.buffered_bytes < self.max_buffer_bytes:
+            ready = wait(self.conns, timeout)
+            if not ready:
+                break
+            for conn in ready:
+                try:
+                    nbytes, data = self._read_chunks(conn)
+                except EOFError:
+                    self.conns.remove(conn)
+                    continue
+                received = True
+                if data is None:
+                    continue
+                if data[0] == "DONE":
+                    # Other pipes may still contain data, so we stop after draining them
+                    self._done = data
+                else:
+                    self._buffer.append((nbytes, data))
+                    self.buffered_bytes += nbytes
+            self.largest_buffered_bytes = max(self.largest_buffered_bytes, self.buffered_bytes)
+            timeout = 0
+        return received
+
+    def _pop_buffer(self):
+        nbytes, data = self._buffer.popleft()
+        self.buffered_bytes -= nbytes
         return data
 
+    def _pop_done(self):
+        done = self._done
+        self._done = None
+        if done is None:
+            # All pipes have been closed
+            done = ("DONE", [], {})
+        return done
+
     @retry(9, Exception, 0.01, "pypet.retry")
     def _receive_data(self):
-        """Gets data from pipe"""
-        while True:
-            while len(self._buffer) < self.max_size and self.conn.poll():
-                data = self._read_chunks()
-                if data is not None:
-                    self._buffer.append(data)
-            if len(self._buffer) > 0:
-                return self._buffer.popleft()
+        """Gets data from pipes"""
+        while not self._buffer:
+            if self._done is not None or not self.conns:
+                # Nothing more will be sent, stop as soon as all pipes are drained
+                if not self._fill_buffer(timeout=0):
+                    return self._pop_done()
+            else:
+                self._fill_buffer(timeout=None)
+        return self._pop_buffer()
+
+    def _receive_available_data(self):
+        """Gets data from pipes without waiting"""
+        if not self._buffer:
+            self._fill_buffer(timeout=0)
+        if self._buffer:
+            return self._pop_buffer()
+        if self._done is not None:
+            # All pipes are drained
+            return self._pop_done()
+        return None
+
+    def _get_queue_depth(self):
+        return len(self._buffer)
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self._logger.info(
+                f"At most {self.largest_buffered_bytes} bytes were buffered by the pipe writer."
+            )
+
+
+class ReadWriteLock:
+    """Lock for multiprocessing that can be acquired exclusively or shared.
+
+    Several processes can hold the lock in shared mode at the same time, e.g. to load data,
+    whereas exclusive acquisition, e.g. to store data, waits until all other holders released it.
+    Processes waiting for exclusive access have precedence over new shared acquisitions.
+
+    :param manager:
+
+        Optional multiprocessing manager used to create the underlying condition and state.
+        If `None` they are created via the multiprocessing module and can only be
+        shared with processes through inheritance.
+
+    """
+
+    READERS = 0  # index of the number of shared holders in the state
+    WRITER = 1  # index of the flag signaling exclusive acquisition
+    WAITING = 2  # index of the number of processes waiting for exclusive acquisition
+
+    def __init__(self, manager=None):
+        if manager is None:
+            self._condition = multip.Condition()
+            self._state = multip.RawArray("i", 3)
+        else:
+            self._condition = manager.Condition()
+            self._state = manager.list([0, 0, 0])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
+
+    def acquire(self):
+        """Acquires the lock exclusively and returns `True`, blocks until available"""
+        with self._condition:
+            self._state[self.WAITING] += 1
+            try:
+                while self._state[self.WRITER] or self._state[self.READERS]:
+                    self._condition.wait()
+            finally:
+                self._state[self.WAITING] -= 1
+            self._state[self.WRITER] = 1
+        return True
+
+    def release(self):
+        """Releases the exclusively acquired lock"""
+        with self._condition:
+            if not self._state[self.WRITER]:
+                raise ValueError("Lock released too many times")
+            self._state[self.WRITER] = 0
+            self._condition.notify_all()
+
+    def acquire_shared(self):
+        """Acquires the lock in shared mode and returns `True`
+
+        Blocks while the lock is held exclusively or processes wait for exclusive access.
+
+        """
+        with self._condition:
+            while self._state[self.WRITER] or self._state[self.WAITING]:
+                self._condition.wait()
+            self._state[self.READERS] += 1
+        return True
+
+    def release_shared(self):
+        """Releases the lock held in shared mode"""
+        with self._condition:
+            if self._state[self.READERS] <= 0:
+                raise ValueError("Shared lock released too many times")
+            self._state[self.READERS] -= 1
+            if not self._state[self.READERS]:
+                self._condition.notify_all()
 
 
 class LockWrapper(MultiprocWrapper, LockAcquisition):
@@ -982,6 +1829,10 @@ class LockWrapper(MultiprocWrapper, LockAcquisition):
     augments a storage service with a lock.
 
     The lock is acquired before storage or loading and released afterwards.
+    If the lock can be acquired in shared mode, like a
+    :class:`~pypet.utils.mpwrappers.ReadWriteLock` or a
+    :class:`~pypet.utils.mpwrappers.LockerClient`, loading only acquires it
+    shared. Thus, several processes can load data at the same time.
 
     """
 
@@ -990,6 +1841,7 @@ class LockWrapper(MultiprocWrapper, LockAcquisition):
         self.lock = lock
         self.is_locked = False
         self.pickle_lock = True
+        self.metrics = StorageMetrics()
         self._set_logger()
 
     def __getstate__(self):
@@ -1018,10 +1870,12 @@ class LockWrapper(MultiprocWrapper, LockAcquisition):
 
     def store(self, *args, **kwargs):
         """Acquires a lock before storage and releases it afterwards."""
+        start = time.perf_counter()
         try:
             self.acquire_lock()
             return self._storage_service.store(*args, **kwargs)
         finally:
+            self.metrics.add_store_time(_get_store_msg(args, kwargs), time.perf_counter() - start)
             if self.lock is not None:
                 try:
                     self.release_lock()
@@ -1034,7 +1888,19 @@ class LockWrapper(MultiprocWrapper, LockAcquisition):
         self.release_lock()
 
     def load(self, *args, **kwargs):
-        """Acquires a lock before loading and releases it afterwards."""
+        """Acquires a lock before loading and releases it afterwards.
+
+        The lock is acquired in shared mode if supported and not already held.
+
+        """
+        if not (self.is_locked or self.is_open) and hasattr(self.lock, "acquire_shared"):
+            start = time.perf_counter()
+            self.lock.acquire_shared()
+            self._add_lock_wait(start)
+            try:
+                return self._storage_service.load(*args, **kwargs)
+            finally:
+                self.lock.release_shared()
         try:
             self.acquire_lock()
             return self._storage_service.load(*args, **kwargs)
@@ -1046,18 +1912,108 @@ class LockWrapper(MultiprocWrapper, LockAcquisition):
                     self._logger.error(f"Could not release lock `{self.lock}`!")
 
 
+class ShardedStorageServiceWrapper(MultiprocWrapper, HasLogger):
+    """For multiprocessing in :const:`~pypet.pypetconstants.WRAP_MODE_SHARDED` mode,
+    lets every process store its data into its own shard.
+
+    The main process stores into the original storage service, all other processes
+    claim one of the shard services when storing for the first time.
+    Hence, processes do not need to wait for each other as long as there are
+    at least as many shards as processes. Loading is always done from the original
+    service, data stored into shards cannot be loaded before the shards are merged.
+
+    :param storage_service: The original storage service
+
+    :param shard_services: List of storage services, one per shard
+
+    :param lock: Lock protecting the original storage service
+
+    :param shard_locks: List of locks, one per shard
+
+    :param shard_counter:
+
+        Shared counter (e.g. ``multiprocessing.Value('i', 0)``) used by every
+        process to claim its own shard.
+
+    Note that the locks and the counter will no longer be pickled if the wrapper is pickled.
+
+    """
+
+    def __init__(self, storage_service, shard_services, lock, shard_locks, shard_counter):
+        self._main_wrapper = LockWrapper(storage_service, lock)
+        self._shard_wrappers = [
+            LockWrapper(shard_service, shard_lock)
+            for shard_service, shard_lock in zip(shard_services, shard_locks)
+        ]
+        self.metrics = StorageMetrics()
+        for wrapper in [self._main_wrapper] + self._shard_wrappers:
+            wrapper.pickle_lock = False
+            # All shards report to the same metrics
+            wrapper.metrics = self.metrics
+        self.shard_counter = shard_counter
+        self._main_pid = os.getpid()
+        self._pid = self._main_pid
+        self._wrapper = self._main_wrapper
+        self._set_logger()
+
+    def __getstate__(self):
+        result = super().__getstate__()
+        result["shard_counter"] = None
+        return result
+
+    def __repr__(self):
+        return "<%s wrapping Storage Service %r with %d shard(s)>" % (
+            self.__class__.__name__,
+            self._main_wrapper._storage_service,
+            len(self._shard_wrappers),
+        )
+
+    @property
+    def is_open(self):
+        return self._wrapper.is_open
+
+    def _claim_shard(self):
+        """Picks the shard of the current process, a new one is claimed after forking"""
+        current_pid = os.getpid()
+        if current_pid == self._pid:
+            return self._wrapper
+        if current_pid == self._main_pid or not self._shard_wrappers:
+            self._wrapper = self._main_wrapper
+        else:
+            with self.shard_counter.get_lock():
+                index = self.shard_counter.value
+                self.shard_counter.value += 1
+            index %= len(self._shard_wrappers)
+            self._wrapper = self._shard_wrappers[index]
+            self._logger.debug(f"Process `{current_pid}` stores data into shard {index}.")
+        self._wrapper.is_locked = False
+        self._pid = current_pid
+        return self._wrapper
+
+    def store(self, *args, **kwargs):
+        """Stores data into the shard of the current process"""
+        return self._claim_shard().store(*args, **kwargs)
+
+    def load(self, *args, **kwargs):
+        """Loads data from the original storage service"""
+        return self._main_wrapper.load(*args, **kwargs)
+
+
 class ReferenceWrapper(MultiprocWrapper):
     """Wrapper that just keeps references to data to be stored."""
 
     def __init__(self):
         self.references = {}
+        self.metrics = StorageMetrics()
 
     def store(self, msg, stuff_to_store, *args, **kwargs):
         """Simply keeps a reference to the stored data"""
+        start = time.perf_counter()
         trajectory_name = kwargs["trajectory_name"]
         if trajectory_name not in self.references:
             self.references[trajectory_name] = []
         self.references[trajectory_name].append((msg, cp.copy(stuff_to_store), args, kwargs))
+        self.metrics.add_store_time(msg, time.perf_counter() - start)
 
     def load(self, *args, **kwargs):
         """Not implemented"""
@@ -1078,6 +2034,7 @@ class ReferenceStore(HasLogger):
         self._storage_service = storage_service
         self.gc_interval = gc_interval
         self.operation_counter = 0
+        self.metrics = StorageMetrics()
         self._set_logger()
 
     def _check_and_collect_garbage(self):
@@ -1089,7 +2046,9 @@ class ReferenceStore(HasLogger):
     def store_references(self, references):
         """Stores references to disk and may collect garbage."""
         for trajectory_name in references:
+            start = time.perf_counter()
             self._storage_service.store(
                 pypetconstants.LIST, references[trajectory_name], trajectory_name=trajectory_name
             )
+            self.metrics.add_store_time(pypetconstants.LIST, time.perf_counter() - start)
         self._check_and_collect_garbage()
@@ -0,0 +1,135 @@
+"""Module containing a sequence of run results that spills to disk beyond a memory limit"""
+
+import pickle
+import tempfile
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+import pypet.pypetconstants as pypetconstants
+
+
+class ResultSequence(Sequence):
+    """Sequence of tuples of run indices and results returned by the run function.
+
+    Results are pickled as soon as they are appended. As long as the pickled results
+    need less than `memory_limit` bytes they are kept in memory, all further results
+    are written to an anonymous temporary file. Indexing and iterating unpickle the
+    results on demand, so every access returns a new copy of a result.
+
+    In contrast to a plain list, the tuples are always ordered by run index
+    regardless of the order in which they were appended.
+
+    :param memory_limit: Maximum number of bytes of pickled results kept in memory
+
+    :param folder:
+
+        Folder of the temporary file, if ``None`` the default folder
+        of the :mod:`tempfile` module is used.
+
+    """
+
+    def __init__(self, memory_limit, folder=None):
+        self._memory_limit = memory_limit
+        self._folder = folder
+        self._file = None
+        self._memory_size = 0
+        self._run_indices = array("q")
+        self._offsets = array("q")  # -1 for results kept in memory
+        self._lengths = array("q")
+        self._in_memory = {}  # Maps positions of appended results to pickled results
+        self._order = None  # Positions sorted by run index, computed on demand
+
+    @property
+    def memory_limit(self):
+        """Maximum number of bytes of pickled results kept in memory"""
+        return self._memory_limit
+
+    @property
+    def memory_size(self):
+        """Number of bytes of pickled results kept in memory"""
+        return self._memory_size
+
+    @property
+    def spilled(self):
+        """Number of results written to the temporary file"""
+        return len(self._run_indices) - len(self._in_memory)
+
+    def append(self, result):
+        """Appends a tuple of run index and result"""
+        idx, value = result
+        data = pickle.dumps(value, protocol=pypetconstants.PICKLE_PROTOCOL)
+        position = len(self._run_indices)
+        self._run_indices.append(idx)
+        self._lengths.append(len(data))
+        if self._memory_size + len(data) <= self._memory_limit:
+            self._in_memory[position] = data
+            self._offsets.append(-1)
+            self._memory_size += len(data)
+        else:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="pypet_results_", dir=self._folder)
+            self._file.seek(0, 2)
+            self._offsets.append(self._file.tell())
+            self._file.write(data)
+        self._order = None
+
+    def extend(self, results):
+        """Appends several tuples of run indices and results"""
+        for result in results:
+            self.append(result)
+
+    def close(self):
+        """Removes all results and the temporary file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._memory_size = 0
+        self._run_indices = array("q")
+        self._offsets = array("q")
+        self._lengths = array("q")
+        self._in_memory = {}
+        self._order = None
+
+    def __len__(self):
+        return len(self._run_indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[pos] for pos in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("ResultSequence index out of range")
+        if self._order is None:
+            self._order = np.argsort(self._run_indices, kind="stable")
+        position = int(self._order[item])
+        return self._run_indices[position], self._load(position)
+
+    def _load(self, position):
+        """Unpickles the result appended at `position`"""
+        if self._offsets[position] < 0:
+            data = self._in_memory[position]
+        else:
+            self._file.seek(self._offsets[position])
+            data = self._file.read(self._lengths[position])
+        return pickle.loads(data)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ResultSequence)):
+            return len(self) == len(other) and all(x == y for x, y in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __iter__(self):
+        for item in range(len(self)):
+            yield self[item]
+
+    def __repr__(self):
+        return "<%s with %d results, %d spilled to disk>" % (
+            self.__class__.__name__,
+            len(self),
+            self.spilled,
+        )
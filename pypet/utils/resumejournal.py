@@ -0,0 +1,131 @@
+"""Module containing an append-only journal of records to resume crashed experiments"""
+
+import os
+import struct
+import time
+import zlib
+
+from pypet.pypetlogging import HasLogger
+
+
+class ResumeJournal(HasLogger):
+    """Append-only file of length-prefixed and checksummed records.
+
+    Every record is written as its length and CRC-32 checksum followed by the raw bytes.
+    Records are flushed to the operating system right away, so they survive a crash
+    of the process. To survive a crash of the machine as well, the file is synced to disk
+    after `sync_every` records or if the last sync is older than `sync_interval` seconds
+    (group commit).
+
+    A record that has been written only partially or whose checksum does not match
+    ends the journal. The valid records before it are replayed and the rest
+    is removed as soon as new records are appended.
+
+    :param filename: Name of the journal file
+
+    :param sync_every: Maximum number of records appended between two syncs
+
+    :param sync_interval: Maximum time in seconds between two syncs
+
+    """
+
+    HEADER = struct.Struct("<II")  # length and CRC-32 checksum of a record
+
+    def __init__(self, filename, sync_every=100, sync_interval=1.0):
+        self._filename = filename
+        self._sync_every = sync_every
+        self._sync_interval = sync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.time()
+        self._set_logger()
+
+    @property
+    def filename(self):
+        """Name of the journal file"""
+        return self._filename
+
+    def replay(self):
+        """Yields the bytes of all valid records in the order they were appended"""
+        for data, _ in self._iter_records():
+            yield data
+
+    def append(self, data):
+        """Appends the bytes `data` as a new record"""
+        if self._file is None:
+            self._open()
+        self._file.write(self.HEADER.pack(len(data), zlib.crc32(data)))
+        self._file.write(data)
+        self._file.flush()
+        self._pending += 1
+        if (
+            self._pending >= self._sync_every
+            or time.time() - self._last_sync >= self._sync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """Syncs all appended records to disk"""
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.time()
+
+    def compact(self, records):
+        """Replaces the whole journal by the bytes in `records`.
+
+        The new journal is written to a temporary file and synced to disk
+        before it atomically replaces the old one.
+        Thus, a crash leaves either the old or the new journal.
+
+        """
+        self.close()
+        tmp_filename = self._filename + ".tmp"
+        with open(tmp_filename, "wb") as tmp_file:
+            for data in records:
+                tmp_file.write(self.HEADER.pack(len(data), zlib.crc32(data)))
+                tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_filename, self._filename)
+
+    def close(self):
+        """Syncs and closes the journal file, it is reopened by the next `append`"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        """Opens the journal for appending and removes invalid records at the end"""
+        valid_size = 0
+        for _, valid_size in self._iter_records():
+            pass
+        self._file = open(self._filename, "ab")
+        if self._file.tell() > valid_size:
+            self._logger.warning(
+                f"Removing {self._file.tell() - valid_size} byte(s) of incomplete or "
+                f"corrupted records at the end of `{self._filename}`."
+            )
+            self._file.truncate(valid_size)
+            self._file.seek(valid_size)
+        self._pending = 0
+        self._last_sync = time.time()
+
+    def _iter_records(self):
+        """Yields all valid records and the file position after each of them"""
+        if not os.path.isfile(self._filename):
+            return
+        with open(self._filename, "rb") as journal_file:
+            position = 0
+            while True:
+                header = journal_file.read(self.HEADER.size)
+                if len(header) < self.HEADER.size:
+                    break
+                length, checksum = self.HEADER.unpack(header)
+                data = journal_file.read(length)
+                if len(data) < length or zlib.crc32(data) != checksum:
+                    break
+                position += self.HEADER.size + length
+                yield data, position
@@ -0,0 +1,163 @@
+"""Module containing the transfer of large numpy arrays between processes via shared memory.
+
+Arrays are moved into :class:`multiprocessing.shared_memory.SharedMemory` blocks by the
+sending process, only small descriptors end up in the pickle dump.
+The receiving process owns the blocks afterwards and has to release them,
+either right away when loading with ``copy=True`` or via :func:`release_blocks`.
+
+"""
+
+import io
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import pypet.pypetconstants as pypetconstants
+
+
+def unlink_blocks(names):
+    """Removes the shared memory blocks with the given `names` if they still exist"""
+    for name in names:
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()
+
+
+def release_blocks(blocks):
+    """Closes and removes opened shared memory `blocks`.
+
+    Returns the names of blocks that are still referenced by arrays. Their memory is
+    unmapped once the arrays are garbage collected.
+
+    """
+    in_use = []
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            in_use.append(block.name)
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+    return in_use
+
+
+class SharedMemoryPickler(pickle.Pickler):
+    """Pickler that places large numpy arrays into shared memory blocks.
+
+    Only small descriptors of the arrays end up in the pickle dump, the
+    arrays themselves are copied once into a
+    :class:`multiprocessing.shared_memory.SharedMemory` block.
+    The names of all created blocks are kept in ``blocks``.
+
+    :param file: File-like object to write the dump to
+
+    :param threshold: Minimum size of arrays in bytes to be placed into shared memory
+
+    :param buffer_callback: Callback for out-of-band buffers, see :class:`pickle.Pickler`
+
+    """
+
+    def __init__(self, file, threshold, buffer_callback=None):
+        super().__init__(
+            file, protocol=pypetconstants.PICKLE_PROTOCOL, buffer_callback=buffer_callback
+        )
+        self.threshold = threshold
+        self.blocks = []
+
+    def persistent_id(self, obj):
+        if (
+            type(obj) is np.ndarray
+            and obj.nbytes >= self.threshold
+            and obj.nbytes > 0
+            and not obj.dtype.hasobject
+        ):
+            block = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+            self.blocks.append(block.name)
+            shared_array = np.ndarray(obj.shape, dtype=obj.dtype, buffer=block.buf)
+            shared_array[...] = obj
+            del shared_array
+            block.close()
+            return "SHARED_ARRAY", block.name, obj.shape, obj.dtype
+        return None
+
+    def unlink_blocks(self):
+        """Removes all created blocks, in case the dump cannot be sent"""
+        unlink_blocks(self.blocks)
+        self.blocks = []
+
+
+class SharedMemoryUnpickler(pickle.Unpickler):
+    """Unpickler that reconstructs arrays from shared memory blocks.
+
+    By default the arrays are views on the shared buffers, i.e. they are not copied.
+    The opened blocks are kept in ``blocks`` and need to be released
+    after the data has been used, see :func:`release_blocks`.
+    If `copy` is `True`, the arrays are copied out and every block is released right away.
+
+    """
+
+    def __init__(self, file, buffers=None, copy=False):
+        super().__init__(file, buffers=buffers)
+        self.copy = copy
+        self.blocks = []
+
+    def persistent_load(self, pid):
+        tag, name, shape, dtype = pid
+        if tag != "SHARED_ARRAY":
+            raise pickle.UnpicklingError(f"Unsupported persistent object `{tag}`.")
+        block = shared_memory.SharedMemory(name=name)
+        if not self.copy:
+            self.blocks.append(block)
+            return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        try:
+            return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+
+
+def dump_shared(obj, threshold=None, out_of_band=True):
+    """Pickles `obj` to be sent to another process.
+
+    Uses pickle protocol 5, if `out_of_band` large contiguous buffers (like numpy arrays)
+    are not copied into the dump but returned as out-of-band buffers.
+    If `threshold` is not `None`, arrays with at least `threshold` bytes are
+    placed into shared memory instead.
+
+    Returns the dump, the list of raw out-of-band buffers, and the
+    :class:`~pypet.utils.sharedmemory.SharedMemoryPickler` (or `None`).
+
+    """
+    buffers = []
+    buffer_callback = buffers.append if out_of_band else None
+    dump_file = io.BytesIO()
+    if threshold is None:
+        pickler = None
+        pickle.Pickler(
+            dump_file, protocol=pypetconstants.PICKLE_PROTOCOL, buffer_callback=buffer_callback
+        ).dump(obj)
+    else:
+        pickler = SharedMemoryPickler(dump_file, threshold, buffer_callback=buffer_callback)
+        try:
+            pickler.dump(obj)
+        except Exception:
+            pickler.unlink_blocks()
+            raise
+    return dump_file.getvalue(), [buffer.raw() for buffer in buffers], pickler
+
+
+def load_shared(dump, buffers=(), copy=False):
+    """Unpickles a dump of :func:`dump_shared`, returns the object and the opened blocks.
+
+    If `copy` is `True`, shared arrays are copied and their blocks released immediately,
+    so the returned list of blocks is empty.
+
+    """
+    unpickler = SharedMemoryUnpickler(io.BytesIO(dump), buffers=buffers, copy=copy)
+    return unpickler.load(), unpickler.blocks
@@ -1,8 +1,56 @@
+import itertools
+import multiprocessing as multip
 import os
+from collections import deque
 
 from pypet.trajectory import load_trajectory
 
 
+def _load_merge_candidate(load_kwargs):
+    """Loads a trajectory to be merged within a reader process.
+
+    The full run information is kept, so the trajectory can be pickled
+    back to the merging process.
+
+    """
+    traj = load_trajectory(**load_kwargs)
+    traj.v_full_copy = True
+    return traj
+
+
+def _iter_trajectories(all_files, nworkers, load_kwargs):
+    """Yields the trajectories found in `all_files` one after the other.
+
+    If `nworkers` is larger than 1, trajectories are loaded by a pool of reader processes.
+    At most `nworkers` trajectories are read ahead, so memory does not grow
+    with the number of files.
+
+    """
+    if nworkers is None or nworkers <= 1:
+        for full_file in all_files:
+            yield load_trajectory(filename=full_file, **load_kwargs)
+        return
+
+    # Readers are spawned to not inherit the files opened by the current process
+    context = multip.get_context("spawn")
+    with context.Pool(nworkers) as pool:
+        files = iter(all_files)
+        pending = deque(
+            pool.apply_async(_load_merge_candidate, (dict(load_kwargs, filename=full_file),))
+            for full_file in itertools.islice(files, nworkers)
+        )
+        while pending:
+            traj = pending.popleft().get()
+            full_file = next(files, None)
+            if full_file is not None:
+                pending.append(
+                    pool.apply_async(
+                        _load_merge_candidate, (dict(load_kwargs, filename=full_file),)
+                    )
+                )
+            yield traj
+
+
 def merge_all_in_folder(
     folder,
     ext=".hdf5",
@@ -16,6 +64,8 @@ def merge_all_in_folder(
     keep_other_trajectory_info=True,
     merge_config=True,
     backup=True,
+    nworkers=None,
+    link_data=False,
 ):
     """Merges all files in a given folder.
 
@@ -32,12 +82,28 @@ def merge_all_in_folder(
     :param storage_service: storage service to use, leave `None` to use the default one
     :param force: If loading should be forced.
     :param delete_other_files: Deletes files of merged trajectories
+    :param nworkers:
+
+        Number of reader processes. The trajectories are loaded one after the other
+        and merged into the first one as soon as they are available, so only the
+        trajectories currently merged or read ahead are kept in memory.
+        If larger than 1, the trajectories are loaded by a pool of
+        reader processes while the current process merges and writes the data.
+
+    :param link_data:
+
+        Whether the merged trajectory only links the data in the other files,
+        see :func:`~pypet.trajectory.Trajectory.f_merge`. Cannot be combined
+        with `delete_other_files`.
 
     All other parameters as in `f_merge_many` of the trajectory.
 
     :return: The merged traj
 
     """
+    if link_data and delete_other_files:
+        raise ValueError("You cannot delete the other files if their data is linked.")
+
     in_dir = os.listdir(folder)
     all_files = []
     # Find all files with matching extension
@@ -49,21 +115,18 @@ def merge_all_in_folder(
                 all_files.append(full_file)
     all_files = sorted(all_files)
 
-    # Open all trajectories
-    trajs = []
-    for full_file in all_files:
-        traj = load_trajectory(
-            index=-1,
-            storage_service=storage_service,
-            filename=full_file,
-            load_data=0,
-            force=force,
-            dynamic_imports=dynamic_imports,
-        )
-        trajs.append(traj)
+    load_kwargs = dict(
+        index=-1,
+        storage_service=storage_service,
+        load_data=0,
+        force=force,
+        dynamic_imports=dynamic_imports,
+    )
+    # Load the first trajectory, all others are loaded lazily during merging
+    first_traj = load_trajectory(filename=all_files[0], **load_kwargs)
+    trajs = _iter_trajectories(all_files[1:], nworkers, load_kwargs)
 
     # Merge all trajectories
-    first_traj = trajs.pop(0)
     first_traj.f_merge_many(
         trajs,
         ignore_data=ignore_data,
@@ -73,6 +136,7 @@ def merge_all_in_folder(
         keep_other_trajectory_info=keep_other_trajectory_info,
         merge_config=merge_config,
         backup=backup,
+        link_data=link_data,
     )
 
     if delete_other_files: